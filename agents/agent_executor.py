@@ -1,107 +1,108 @@
-import os
-from typing import TypedDict, List
+from typing import List
 from langchain_core.tools import tool
-from langchain_core.runnables import Runnable
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.messages import SystemMessage
-from langchain.agents import AgentExecutor, create_openai_functions_agent
-from langchain.agents.agent import RunnableAgent
-from langchain.memory import ConversationBufferMemory
-from langchain_openai import ChatOpenAI
-from tools.filter_tool import parse_conditions, load_jsonl, filter_jsonl_by_condition
+from tools.filter_tool import parse_conditions
+from tools.coupon_store import get_coupon_store
+from tools.compact_output import encode_coupon_rows
+from tools.llm_gateway import LLMGatewayCallbackHandler, limit_tool_outputs, tool_output_limit
 from tools.llm_tool import summarize_results
-from tools.query_classifier import classify_query
-from dotenv import load_dotenv
-from tools.naver_search_tool import naver_local_search
-import streamlit as st
+from tools.resources import cached_resource, get_chat_llm
+from tools.turn_cache import memoize_per_turn
 
-load_dotenv()
+# LLM / Agent / AgentExecutor 는 import 시점이 아니라 처음 쓸 때 한 번만 만들고,
+# 프로세스 안의 모든 Streamlit 세션이 공유합니다. (tools/resources.py 참고)
 
-# OpenAI API 키 설정
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    OPENAI_API_KEY = st.secrets["OPENAI_API_KEY"]
-
-# ✅ 1. LLM 세팅
-llm = ChatOpenAI(
-    model="gpt-4",
-    temperature=0,
-    api_key=OPENAI_API_KEY
-)
+# ✅ 1. LLM 세팅 → tools.resources.get_chat_llm()
 
 # ✅ 2. Tool 정의
+# 조건 추출 → 필터는 두 도구가 함께 쓰므로 한 턴 안에서는 한 번만 실행 (tools/turn_cache.py)
+@memoize_per_turn
+def _filter_rows(query: str) -> List[dict]:
+    cond = parse_conditions(query)
+    return get_coupon_store().filter(cond, with_ids=True)
+
 @tool
-def filter_coupon_data(query: str) -> List[dict]:
+def filter_coupon_data(query: str) -> str:
     """질문에서 조건을 추출하고, JSONL 데이터를 조건에 맞게 필터링합니다."""
     try:
-        cond = parse_conditions(query)
-        data = load_jsonl("data/지역사랑상품권_긍정_부정전처리_cleaned.jsonl")
-        results = filter_jsonl_by_condition(data, cond)
-        return results[:30]  # 너무 많으면 일부만 리턴
+        # 지역별로 묶은 압축 표기 (링크는 [#번호], 최종 답변에서 펼침 → tools/compact_output.py)
+        # 너무 많으면 앞의 일부만 (최대 30행, 도구 결과 토큰 상한 안에서)
+        return encode_coupon_rows(_filter_rows(query)[:30], max_tokens=tool_output_limit())
     except Exception as e:
-        return [{"error": str(e)}]
+        return f"필터링 중 오류가 발생했습니다: {str(e)}"
 
 @tool
 def summarize_coupon_results(query: str) -> str:
     """필터링된 결과 리스트를 요약하여 설명해줍니다."""
     try:
-        # 먼저 데이터를 필터링
-        results = filter_coupon_data(query)
+        # 먼저 데이터를 필터링 (같은 턴에 filter_coupon_data 를 불렀다면 그 결과 재사용)
+        results = _filter_rows(query)
         if not results:
             return "검색 결과가 없습니다."
         return summarize_results(results)
     except Exception as e:
         return f"요약 중 오류가 발생했습니다: {str(e)}"
 
-# ✅ 3. Tool 목록 정의
-tools = [
-    filter_coupon_data,
-    summarize_coupon_results,
-    naver_local_search,
-]
+# ✅ 3. Tool 목록 정의 (FAISS, pandas, httpx 등 무거운 모듈은 여기서 처음 로드)
+@cached_resource
+def get_tools() -> list:
+    from tools.naver_search_tool import naver_local_search
+    from tools.vector_search_tool import vector_search
+    from tools.merchant_store import merchant_search
+    from tools.merchant_geo import nearby_merchants
+    from tools.calculator_tool import calculator
+
+    # 모든 도구 결과는 프롬프트에 들어가기 전에 턴 예산에 맞춘 토큰 상한으로 줄임 (tools/llm_gateway.py)
+    return limit_tool_outputs([
+        filter_coupon_data,
+        vector_search,
+        summarize_coupon_results,
+        merchant_search,
+        nearby_merchants,
+        naver_local_search,
+        calculator,
+    ])
+
+
+# ✅ 4. 멀티턴 메모리는 세션별 TokenBudgetMemory(agents/conversation_memory.py)가 관리하고
+#    호출할 때 chat_history로 넘겨받습니다. (프로세스 전역 버퍼 없음)
 
+# ✅ 5~6. Runnable Agent + AgentExecutor 생성
+@cached_resource
+def get_agent_executor():
+    from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+    from langchain_core.messages import SystemMessage
+    from langchain.agents import AgentExecutor, create_openai_tools_agent
 
-# ✅ 4. 멀티턴 메모리 설정
-memory = ConversationBufferMemory(
-    memory_key="chat_history",
-    return_messages=True
-)
+    # ✅ 기본 system prompt 명시 (필수)
+    prompt = ChatPromptTemplate.from_messages([
+        SystemMessage(content="당신은 지역사랑상품권에 대해 질문을 분석하고 도구를 사용해 응답하는 AI입니다. "
+                              "도구 결과의 [#번호]는 링크 자리표시자이니 답변에 그대로 적으세요."),
+        MessagesPlaceholder(variable_name="chat_history", optional=True),
+        ("human", "{input}"),  # ✅ 문자열 input을 메시지로 변환
+        MessagesPlaceholder(variable_name="agent_scratchpad")
+    ])
 
-# ✅ 5. Runnable Agent 구성 # ✅ 기본 system prompt 명시 (필수)
-prompt = ChatPromptTemplate.from_messages([
-    SystemMessage(content="당신은 지역사랑상품권에 대해 질문을 분석하고 도구를 사용해 응답하는 AI입니다."),
-    MessagesPlaceholder(variable_name="chat_history"),
-    ("human", "{input}"),  # ✅ 문자열 input을 메시지로 변환
-    MessagesPlaceholder(variable_name="agent_scratchpad")
-])
+    # tools 형식: 서로 독립적인 도구 호출을 한 번에 여러 개 받아(parallel tool calls) 동시에 실행
+    # LLM 호출은 게이트웨이 콜백을 거쳐 토큰/비용 기록 + 턴 예산 확인 (tools/llm_gateway.py)
+    agent = create_openai_tools_agent(
+        llm=get_chat_llm().with_config(callbacks=[LLMGatewayCallbackHandler("agent")]),
+        tools=get_tools(),
+        prompt=prompt
+    )
+    return AgentExecutor(
+        agent=agent,
+        tools=get_tools(),
+        verbose=True
+    )
 
-# ✅ 수정된 agent 구성
-agent: Runnable = create_openai_functions_agent(
-    llm=llm,
-    tools=tools,
-    prompt=prompt
-)
 
-# ✅ 6. AgentExecutor 생성
-agent_executor = AgentExecutor(
-    agent=agent,
-    tools=tools,
-    memory=memory,
-    verbose=True
-)
+def __getattr__(name: str):
+    # 기존 `from agents.agent_executor import agent_executor` 코드 호환 (접근할 때 생성)
+    if name == "agent_executor":
+        return get_agent_executor()
+    if name == "tools":
+        return get_tools()
+    if name == "llm":
+        return get_chat_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# 입력값 분기 처리 함수 (LLM 호출 전)
-def route_query(query: str):
-    classification = classify_query(query)
-    
-    if classification.query_type == "internal_search":
-        return agent_executor.invoke({"input": query})
-    
-    elif classification.query_type == "external_search":
-        return {"result": f"🔍 외부 검색 예정: '{query}' → Naver API 연동 예정"}
-    
-    elif classification.query_type == "calculator":
-        return {"result": f"🧮 계산기 호출 예정: '{query}'"}
-    
-    else:
-        return {"result": "⚠️ 알 수 없는 질문 유형입니다. 다시 입력해주세요."}
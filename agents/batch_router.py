@@ -0,0 +1,177 @@
+"""여러 질문 일괄 처리 (분석용 대량 지역/지원방식 조회)
+
+질문마다 에이전트를 부르지 않고, 청크 단위로
+    1) 단순 '지역 + 지원방식' 조회는 조건이 같은 것끼리 묶어 데이터셋 한 번 훑기로 답하고
+    2) 남은 애매한 질문만 route_query 로 보내되 동시 실행 수를 제한합니다.
+결과는 청크마다 입력 순서대로 JSONL 로 내보내므로 입력 파일이 커도 메모리는 청크 크기만큼만 씁니다.
+
+    python -m agents.batch_router questions.txt -o answers.jsonl
+    python -m agents.batch_router questions.jsonl --concurrency 8   # {"id", "query"} 줄 단위 입력
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Union
+
+from agents.router_agent import _run_coroutine, route_query
+from monitoring.tracing import start_trace
+from tools.coupon_store import get_coupon_store
+from tools.fast_answer import fast_conditions, render_results
+from tools.filter_tool import parse_conditions
+from tools.semantic_cache import condition_key
+
+logger = logging.getLogger(__name__)
+
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "500"))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))
+
+# 입력 한 줄: 질문 문자열 또는 {"query", "id"?}
+BatchItem = Union[str, Dict[str, Any]]
+
+
+def _normalize_item(item: BatchItem) -> Dict[str, Any]:
+    if isinstance(item, str):
+        return {"query": item.strip()}
+    return {"id": item.get("id"), "query": str(item.get("query") or "").strip()}
+
+
+def _answer_grouped(items: List[Dict[str, Any]], conds: List[Optional[Dict]], include_results: bool):
+    """빠른 경로 질문: 조건 집합별로 묶어 filter_many 한 번으로 답함"""
+    groups: Dict[str, int] = {}
+    unique: List[Dict] = []
+    for cond in conds:
+        if cond is not None:
+            key = condition_key(cond)
+            if key not in groups:
+                groups[key] = len(unique)
+                unique.append(cond)
+    results = get_coupon_store().filter_many(unique)
+    outputs = [render_results(cond, rows) for cond, rows in zip(unique, results)]
+
+    for item, cond in zip(items, conds):
+        if cond is None:
+            continue
+        g = groups[condition_key(cond)]
+        rows = results[g]
+        item.update(path="fast", conditions=cond, count=len(rows), output=outputs[g])
+        if include_results:
+            item["results"] = rows
+    return len(unique)
+
+
+async def _answer_residual(items: List[Dict[str, Any]], semaphore: asyncio.Semaphore):
+    """애매한 질문: 같은 문장은 한 번만, 동시에 semaphore 개까지 route_query 실행"""
+    pending: Dict[str, List[Dict[str, Any]]] = {}
+    for item in items:
+        pending.setdefault(item["query"], []).append(item)
+
+    async def one(query: str):
+        async with semaphore:
+            try:
+                # route_query 는 동기 함수 (에이전트는 안에서 ainvoke) → 스레드에서 실행
+                result = await asyncio.to_thread(route_query, query)
+                answer = {"path": result["path"], "output": result["output"], "trace_id": result["trace_id"]}
+            except Exception as e:
+                logger.exception("batch query 실패: %s", query)
+                answer = {"path": "error", "error": str(e)}
+        cond = parse_conditions(query)
+        for item in pending[query]:
+            item.update(answer, conditions=cond)
+
+    await asyncio.gather(*(one(q) for q in pending))
+
+
+async def answer_chunk(chunk: List[BatchItem], concurrency: int = BATCH_LLM_CONCURRENCY,
+                       include_results: bool = False) -> List[Dict[str, Any]]:
+    """질문 한 묶음 → 입력 순서대로의 결과 목록 (청크는 차례로 처리하므로 동시 실행 수 제한도 청크 단위)"""
+    items = [{"index": None, **_normalize_item(item)} for item in chunk]
+    with start_trace("batch_chunk", size=len(items)) as span:
+        conds = [fast_conditions(item["query"]) if item["query"] else None for item in items]
+        n_groups = _answer_grouped(items, conds, include_results)
+        residual = [item for item, cond in zip(items, conds) if cond is None and item["query"]]
+        for item in items:
+            if not item["query"]:
+                item.update(path="error", error="빈 질문")
+        await _answer_residual(residual, asyncio.Semaphore(concurrency))
+        span.set(groups=n_groups, residual=len(residual))
+    return items
+
+
+def _chunks(items: Iterable[BatchItem], size: int) -> Iterator[List[BatchItem]]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _with_index(results: List[Dict[str, Any]], offset: int) -> List[Dict[str, Any]]:
+    for i, item in enumerate(results):
+        item["index"] = offset + i
+        if item.get("id") is None:
+            item.pop("id", None)
+    return results
+
+
+async def abatch_answer(items: Iterable[BatchItem], concurrency: int = BATCH_LLM_CONCURRENCY,
+                        chunk_size: int = BATCH_CHUNK_SIZE,
+                        include_results: bool = False) -> AsyncIterator[Dict[str, Any]]:
+    """이미 이벤트 루프 안에서 쓰는 일괄 처리 (API 스트리밍 응답 등)"""
+    offset = 0
+    for chunk in _chunks(items, chunk_size):
+        for item in _with_index(await answer_chunk(chunk, concurrency, include_results), offset):
+            yield item
+        offset += len(chunk)
+
+
+def batch_answer(items: Iterable[BatchItem], concurrency: int = BATCH_LLM_CONCURRENCY,
+                 chunk_size: int = BATCH_CHUNK_SIZE, include_results: bool = False) -> Iterator[Dict[str, Any]]:
+    """질문들(문자열 또는 {"id", "query"})을 청크 단위로 처리해 결과를 하나씩 내보냄"""
+    offset = 0
+    for chunk in _chunks(items, chunk_size):
+        results = _run_coroutine(answer_chunk(chunk, concurrency, include_results))
+        yield from _with_index(results, offset)
+        offset += len(chunk)
+
+
+def read_items(lines: Iterable[str]) -> Iterator[BatchItem]:
+    """텍스트(한 줄에 질문 하나) 또는 JSONL({"id", "query"}) 입력. 빈 줄/주석(#)은 건너뜀"""
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        yield json.loads(line) if line.startswith("{") else line
+
+
+def main():
+    parser = argparse.ArgumentParser(description="지역사랑상품권 질문 일괄 처리 (결과는 JSONL)")
+    parser.add_argument("input", help="질문 파일 (.txt 한 줄에 하나 또는 .jsonl), - 이면 표준 입력")
+    parser.add_argument("-o", "--output", help="결과 JSONL 경로 (기본: 표준 출력)")
+    parser.add_argument("--concurrency", type=int, default=BATCH_LLM_CONCURRENCY, help="동시 에이전트 호출 수")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE)
+    parser.add_argument("--include-results", action="store_true", help="빠른 경로 결과 행도 함께 저장")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    counts: Dict[str, int] = {}
+    try:
+        for result in batch_answer(read_items(source), args.concurrency, args.chunk_size, args.include_results):
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            counts[result["path"]] = counts.get(result["path"], 0) + 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    print(f"✅ {sum(counts.values())}건 처리: {counts}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
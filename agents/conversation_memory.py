@@ -0,0 +1,126 @@
+from functools import lru_cache
+from typing import Any, Dict, List
+
+import tiktoken
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+DEFAULT_HISTORY_TOKENS = 1500
+DEFAULT_SUMMARY_TOKENS = 200
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # 오프라인 환경에서 BPE 파일을 받지 못한 경우
+        return None
+
+
+def _approx_tokens(text: str) -> int:
+    """인코딩을 쓸 수 없을 때의 근사치 (한글 1자 ≈ 1토큰, ASCII 4자 ≈ 1토큰)"""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (len(text) - ascii_chars) + (ascii_chars + 3) // 4
+
+
+def count_tokens(text: str, model: str = "gpt-4") -> int:
+    """tiktoken 기준 토큰 수"""
+    encoding = _encoding(model)
+    if encoding is None:
+        return _approx_tokens(text)
+    return len(encoding.encode(text))
+
+
+# ✅ 세션별 토큰 예산 메모리
+class TokenBudgetMemory:
+    """세션 하나의 대화 기록을 토큰 예산 안에서 유지합니다.
+
+    예산을 넘는 오래된 턴은 버리고, 버린 질문은 짧은 요약 한 줄로 남겨 맥락을 이어갑니다.
+    """
+
+    def __init__(self, max_tokens: int = DEFAULT_HISTORY_TOKENS,
+                 summary_tokens: int = DEFAULT_SUMMARY_TOKENS, model: str = "gpt-4"):
+        self.max_tokens = max_tokens
+        self.summary_tokens = summary_tokens
+        self.model = model
+        self.messages: List[BaseMessage] = []
+        self._token_counts: List[int] = []
+        self.dropped_questions: List[str] = []
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self._token_counts)
+
+    def add_user_message(self, text: str):
+        self._add(HumanMessage(content=text))
+
+    def add_ai_message(self, text: str):
+        self._add(AIMessage(content=text))
+
+    def _add(self, message: BaseMessage):
+        self.messages.append(message)
+        self._token_counts.append(count_tokens(message.content, self.model))
+        self._trim()
+
+    def _trim(self):
+        # 가장 최근 메시지는 항상 유지
+        while len(self.messages) > 1 and self.total_tokens > self.max_tokens:
+            message = self.messages.pop(0)
+            self._token_counts.pop(0)
+            if isinstance(message, HumanMessage):
+                self.dropped_questions.append(message.content)
+        # 질문이 잘려 나간 답변이 맨 앞에 남지 않도록 정리
+        while len(self.messages) > 1 and not isinstance(self.messages[0], HumanMessage):
+            self.messages.pop(0)
+            self._token_counts.pop(0)
+
+    def _summary(self) -> str:
+        """버린 질문을 최근 것부터 요약 예산만큼 모은 한 줄"""
+        picked: List[str] = []
+        used = 0
+        for question in reversed(self.dropped_questions):
+            cost = count_tokens(question, self.model) + 1
+            if used + cost > self.summary_tokens:
+                break
+            picked.append(question)
+            used += cost
+        # 요약 예산을 넘지 않도록 오래된 질문 목록도 함께 줄임
+        self.dropped_questions = picked[::-1]
+        return "; ".join(self.dropped_questions)
+
+    def history(self) -> List[BaseMessage]:
+        """에이전트에 넘길 chat_history"""
+        summary = self._summary() if self.dropped_questions else ""
+        if not summary:
+            return list(self.messages)
+        return [SystemMessage(content=f"이전 대화에서 사용자가 물어본 내용: {summary}")] + self.messages
+
+    def clear(self):
+        self.messages.clear()
+        self._token_counts.clear()
+        self.dropped_questions.clear()
+
+    # ✅ 세션 저장소(api/session_store.py)용 직렬화
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "messages": [
+                {"role": "user" if isinstance(m, HumanMessage) else "ai", "content": m.content, "tokens": n}
+                for m, n in zip(self.messages, self._token_counts)
+            ],
+            "dropped_questions": list(self.dropped_questions),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], **kwargs) -> "TokenBudgetMemory":
+        memory = cls(**kwargs)
+        for m in data.get("messages", []):
+            message_cls = HumanMessage if m["role"] == "user" else AIMessage
+            memory.messages.append(message_cls(content=m["content"]))
+            memory._token_counts.append(m.get("tokens") or count_tokens(m["content"], memory.model))
+        memory.dropped_questions = list(data.get("dropped_questions", []))
+        # 예산이 줄었으면 다시 맞춤
+        memory._trim()
+        return memory
@@ -1,24 +1,119 @@
-from tools.query_classifier import classify_query
-from agents.agent_executor import agent_executor
-# 추후 외부검색용 에이전트, 계산기 에이전트 등도 여기에 import 예정
+import asyncio
+import contextvars
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
 
-def route_query(user_input: str):
+from tools.calculator_tool import calculate, format_number
+from tools.compact_output import expand_refs
+from tools.fast_answer import try_fast_answer
+from tools.filter_tool import extract_conditions, parse_conditions
+from tools.llm_gateway import LLMBudgetExceeded, budget_scope
+from tools.query_classifier import QueryType, classify_query
+from tools.semantic_cache import get_semantic_cache, lookup_cached_answer
+from tools.turn_cache import turn_scope
+from agents.agent_executor import get_agent_executor
+from agents.tracing_callback import TracingCallbackHandler
+from monitoring.tracing import start_trace
+
+logger = logging.getLogger(__name__)
+
+# 분류 신뢰도가 이보다 낮으면 직접 처리하지 않고 에이전트에 맡김
+ROUTE_MIN_CONFIDENCE = float(os.getenv("ROUTE_MIN_CONFIDENCE", "0.6"))
+
+BUDGET_EXCEEDED_MESSAGE = "질문을 처리하는 데 허용된 토큰/시간 한도를 넘어 답변을 마치지 못했습니다. 질문을 좁혀 다시 시도해 주세요."
+
+
+def route_query(user_input: str, chat_history: Optional[List] = None,
+                callbacks: Optional[List] = None) -> Dict[str, Any]:
+    """단순 조회는 규칙 기반으로 바로 답하고, 애매한 질문만 GPT 에이전트로 보냅니다.
+
+    반환값의 "path"는 실제로 실행된 경로("fast", "external", "calculator", "cache", "agent", "budget"),
+    "trace_id"는 이 턴의 스팬 묶음 ID, "usage"는 이 턴의 LLM 호출 수/토큰/추정 비용입니다.
+    callbacks에는 토큰/도구 진행 상황이 전달됩니다 (StreamlitStreamHandler 등).
+    """
+    with start_trace("turn", query=user_input[:200]) as turn, budget_scope() as budget:
+        result = _route(user_input, chat_history, callbacks)
+        turn.set(path=result["path"], **budget.to_dict())
+    result["trace_id"] = turn.trace_id
+    result["usage"] = budget.to_dict()
+    return result
+
+
+def _route(user_input: str, chat_history: Optional[List],
+           callbacks: Optional[List]) -> Dict[str, Any]:
+    # ✅ 1. 규칙 기반 빠른 경로 (LLM 호출 없음)
+    answer = try_fast_answer(user_input)
+    if answer is not None:
+        logger.info("route=fast query=%s", user_input)
+        return {"output": answer, "path": "fast"}
+
+    # ✅ 2. 의도 분류 결과가 확실하면 GPT 에이전트 없이 바로 처리
     classification = classify_query(user_input)
-    # print(f"[📌 분류 결과] {classification.type}")
-    print(f"[📌 분류 결과] {classification.category}")
-
-
-    # if classification.type == "internal_search":
-    if classification.category == "internal_search":
-        return internal_agent_executor.invoke({"input": user_input})
-    
-    # elif classification.type == "external_search":
-    elif classification.category == "external_search":
-        return "[🔍 외부 검색 기능] 아직 구현되지 않았습니다."
-    
-    # elif classification.type == "calculator":
-    elif classification.category == "calculator":    
-        return "[🧮 계산기 기능] 아직 구현되지 않았습니다."
-    
-    else:
-        return "[❓ 기타 질문] 해당 질문은 처리할 수 없습니다."
+    if classification.confidence >= ROUTE_MIN_CONFIDENCE:
+        routed = _dispatch(classification.query_type, user_input)
+        if routed is not None:
+            logger.info("route=%s confidence=%.2f query=%s", routed["path"], classification.confidence, user_input)
+            return routed
+
+    # ✅ 3. 표현만 다른 같은 질문이면 이전 에이전트 답변 재사용 (조건이 같을 때만)
+    # 대화 맥락에 기대는 질문("거기 맛집은?")은 같은 문장이라도 답이 다르므로, 멀티턴에서는 조건이 있는 질문만
+    cond = parse_conditions(user_input)
+    cacheable = not chat_history or any(cond.values())
+    if cacheable:
+        hit = lookup_cached_answer(user_input, cond)
+        if hit is not None:
+            logger.info("route=cache similarity=%.3f query=%s cached=%s", hit.similarity, user_input, hit.query)
+            return {"output": hit.output, "path": "cache"}
+
+    # ✅ 4. 애매한 질문은 에이전트로 (LLM/도구 스팬은 TracingCallbackHandler가 기록)
+    logger.info("route=agent query=%s", user_input)
+    inputs = {
+        "input": user_input,
+        "chat_history": chat_history or []
+    }
+    config = {"callbacks": [*(callbacks or []), TracingCallbackHandler()]}
+    # 비동기 실행: 한 응답에 여러 도구 호출이 오면 asyncio.gather 로 동시에 실행
+    # turn_scope: 이 턴 안의 같은 도구 호출(예: 필터 → 요약의 재필터)은 한 번만 실행
+    try:
+        with turn_scope():
+            response = _run_coroutine(get_agent_executor().ainvoke(inputs, config=config))
+    except LLMBudgetExceeded as e:
+        logger.warning("route=budget query=%s: %s", user_input, e)
+        return {"output": BUDGET_EXCEEDED_MESSAGE, "path": "budget"}
+    # 도구 결과의 [#번호] 자리표시자는 최종 답변에서만 실제 링크로
+    output = expand_refs(response["output"])
+    if cacheable:
+        get_semantic_cache().store(user_input, output, cond)
+    return {"output": output, "path": "agent"}
+
+
+def _run_coroutine(coro):
+    """동기 코드(Streamlit 스크립트, API 워커 스레드)에서 코루틴 실행"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # 이미 이벤트 루프가 도는 스레드면 별도 스레드에서 새 루프로 실행
+    with ThreadPoolExecutor(1) as pool:
+        return pool.submit(contextvars.copy_context().run, asyncio.run, coro).result()
+
+
+def _dispatch(query_type: str, user_input: str) -> Optional[Dict[str, Any]]:
+    """외부 검색 / 계산 의도는 도구를 직접 호출. 처리할 수 없으면 None (에이전트로 넘김)"""
+    if query_type == QueryType.EXTERNAL:
+        # "거기 맛집은?"처럼 지역이 없으면 대화 맥락이 필요하므로 에이전트로
+        if not extract_conditions(user_input):
+            return None
+        from tools.naver_search_tool import naver_local_search
+
+        return {"output": naver_local_search.invoke(user_input), "path": "external"}
+
+    if query_type == QueryType.CALC:
+        result = calculate(user_input)
+        if result is None:
+            return None
+        return {"output": f"계산 결과: **{format_number(result)}**", "path": "calculator"}
+
+    return None
@@ -0,0 +1,63 @@
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+# ✅ 에이전트 진행 상황 / LLM 토큰을 Streamlit 컨테이너로 바로 출력
+class StreamlitStreamHandler(BaseCallbackHandler):
+    """도구 진행 상황과 LLM 토큰을 도착하는 대로 화면에 쓰고, 첫 토큰까지의 시간을 기록합니다."""
+
+    # Streamlit 요소는 스크립트 스레드에서만 갱신 가능
+    run_inline = True
+
+    def __init__(self, container):
+        self.container = container
+        self.status = None
+        self.placeholder = container.empty()
+        self.tokens: List[str] = []
+        self.started_at = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        """첫 토큰(또는 첫 출력)까지 걸린 시간 (초)"""
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    def _mark_first_output(self):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages, **kwargs):
+        # 에이전트 단계마다 새 응답이 시작되므로 토큰 버퍼를 비움
+        self.tokens = []
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        if not token:
+            return
+        self._mark_first_output()
+        self.tokens.append(token)
+        self.placeholder.markdown("".join(self.tokens) + "▌")
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs):
+        if self.status is None:
+            self.status = self.container.status("🔧 도구 실행 중...", expanded=False)
+        name = (serialized or {}).get("name", "tool")
+        self.status.write(f"🔧 `{name}` 실행: {input_str}")
+
+    def on_tool_end(self, output: Any, **kwargs):
+        if self.status is not None:
+            self.status.write("✅ 완료")
+
+    def on_tool_error(self, error: BaseException, **kwargs):
+        if self.status is not None:
+            self.status.write(f"⚠️ 도구 오류: {error}")
+
+    def finish(self, output: str):
+        """최종 답변으로 교체하고 진행 상태를 닫습니다."""
+        self._mark_first_output()
+        self.placeholder.markdown(output)
+        if self.status is not None:
+            self.status.update(label="🔧 도구 실행 완료", state="complete")
@@ -0,0 +1,86 @@
+from typing import Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from monitoring.tracing import Span, current_span, finish_span, set_current_span, start_span
+from tools.llm_gateway import model_name, token_usage
+
+
+# ✅ 에이전트 내부(LLM 호출, 도구 실행)를 스팬으로 기록하는 LangChain 콜백
+class TracingCallbackHandler(BaseCallbackHandler):
+    """만들 때의 현재 스팬(턴 루트) 아래에 LLM/도구 스팬을 run_id 기준으로 연결합니다."""
+
+    run_inline = True
+
+    def __init__(self, parent: Optional[Span] = None):
+        self.root = parent or current_span()
+        self._spans: Dict[UUID, Span] = {}
+        self._prompts: Dict[UUID, str] = {}
+
+    def _open(self, name: str, run_id: UUID, parent_run_id: Optional[UUID], **attributes) -> Span:
+        parent = self._spans.get(parent_run_id) or self.root
+        s = start_span(name, parent=parent, **attributes)
+        self._spans[run_id] = s
+        return s
+
+    def _close(self, run_id: UUID, error: Optional[BaseException] = None) -> Optional[Span]:
+        s = self._spans.pop(run_id, None)
+        if s is None:
+            return None
+        if error is not None:
+            s.error = f"{type(error).__name__}: {error}"
+        finish_span(s)
+        return s
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        s = self._open("llm", run_id, parent_run_id, model=model_name(serialized, kwargs))
+        self._prompts[run_id] = "\n".join(str(m.content) for batch in messages for m in batch)
+        s.set(first_token_ms=None)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        self._open("llm", run_id, parent_run_id, model=model_name(serialized, kwargs), first_token_ms=None)
+        self._prompts[run_id] = "\n".join(prompts)
+
+    def on_llm_new_token(self, token: str, *, run_id, **kwargs):
+        s = self._spans.get(run_id)
+        if s is not None and s.attributes.get("first_token_ms") is None:
+            s.set(first_token_ms=round(s.duration * 1000, 3))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        s = self._spans.get(run_id)
+        prompt = self._prompts.pop(run_id, "")
+        if s is not None:
+            usage = token_usage(response)
+            if not usage:
+                # 스트리밍 응답에 usage 가 없으면 tiktoken 으로 추정
+                from agents.conversation_memory import count_tokens
+
+                completion = "".join(g.text for gens in response.generations for g in gens)
+                usage = {
+                    "prompt_tokens": count_tokens(prompt),
+                    "completion_tokens": count_tokens(completion),
+                    "estimated": True,
+                }
+            s.set(**usage)
+        self._close(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._prompts.pop(run_id, None)
+        self._close(run_id, error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        name = (serialized or {}).get("name", "tool")
+        s = self._open(f"tool:{name}", run_id, parent_run_id, input=str(input_str)[:200])
+        # 도구 함수 안에서 여는 스팬(parse_conditions 등)이 이 스팬의 자식이 되도록
+        set_current_span(s)
+
+    def _restore(self, s: Optional[Span]):
+        if s is not None and current_span() is s:
+            set_current_span(self.root)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._restore(self._close(run_id))
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._restore(self._close(run_id, error))
@@ -0,0 +1,297 @@
+"""대동여지갑 HTTP API (aiohttp)
+
+Streamlit 앱과 같은 라우터/도구를 쓰되, 요청마다 스크립트를 다시 실행하지 않고
+워커 프로세스마다 인덱스/데이터/클라이언트를 한 번만 올려 둔 채 요청을 처리합니다.
+
+    python -m api.server --port 8000 --workers 4
+    SESSION_STORE_URL=sqlite:///data/sessions.db python -m api.server --workers 4
+    gunicorn "api.server:create_app()" --worker-class aiohttp.GunicornWebWorker --workers 4 --bind :8000
+
+엔드포인트
+    POST   /chat                 {"message", "session_id"?} → {"session_id", "output", "path", "trace_id", "usage"}
+    DELETE /sessions/{id}
+    POST   /filter               {"query"} 또는 {"conditions"} → 지역사랑상품권 조건 검색
+    POST   /search               {"query", "k"?} → 벡터 검색 (질문 속 조건으로 사전 필터)
+    POST   /merchants            {"query", "limit"?} → 가맹점 검색
+    POST   /batch                {"queries": [질문 또는 {"id", "query"}]} → 결과를 한 줄씩 JSONL 스트리밍
+    GET    /health
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import logging
+import multiprocessing
+import os
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from aiohttp import web
+
+from agents.conversation_memory import TokenBudgetMemory
+from agents.router_agent import route_query
+from api.session_store import SESSION_STORE_URL, SessionStore, create_session_store, is_process_local
+from tools.coupon_store import get_coupon_store
+from tools.filter_tool import parse_conditions
+
+logger = logging.getLogger(__name__)
+
+# LLM/임베딩 호출은 동기 코드라 워커마다 스레드 풀에서 실행 (동시에 처리할 턴 수의 상한)
+API_THREADS = int(os.getenv("API_THREADS", "32"))
+MAX_MESSAGE_CHARS = 2000
+MAX_BATCH_QUERIES = int(os.getenv("MAX_BATCH_QUERIES", "2000"))
+
+SESSION_STORE_KEY = web.AppKey("session_store", SessionStore)
+EXECUTOR_KEY = web.AppKey("executor", ThreadPoolExecutor)
+SESSION_LOCKS_KEY = web.AppKey("session_locks", weakref.WeakValueDictionary)
+
+
+def _json(data: Any, status: int = 200) -> web.Response:
+    # 한글을 \uXXXX 로 바꾸지 않고 그대로 응답
+    return web.json_response(data, status=status, dumps=lambda obj: json.dumps(obj, ensure_ascii=False))
+
+
+def _error(message: str, status: int = 400) -> web.Response:
+    return _json({"error": message}, status=status)
+
+
+def _bad_request(message: str) -> web.HTTPBadRequest:
+    return web.HTTPBadRequest(text=json.dumps({"error": message}, ensure_ascii=False),
+                              content_type="application/json")
+
+
+async def _read_json(request: web.Request) -> Dict[str, Any]:
+    try:
+        body = await request.json()
+    except ValueError:
+        raise _bad_request("JSON 본문이 필요합니다.")
+    if not isinstance(body, dict):
+        raise _bad_request("JSON 객체가 필요합니다.")
+    return body
+
+
+def _int_param(body: Dict[str, Any], key: str, default: int, upper: int) -> int:
+    try:
+        value = int(body.get(key, default))
+    except (TypeError, ValueError):
+        raise _bad_request(f"{key} 는 정수여야 합니다.")
+    return max(1, min(value, upper))
+
+
+async def _run(request: web.Request, func, *args):
+    """동기 함수를 워커 스레드 풀에서 실행 (contextvars 유지 → 트레이스 스팬이 이어짐)"""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(request.app[EXECUTOR_KEY], lambda: ctx.run(func, *args))
+
+
+# ✅ 대화
+async def chat(request: web.Request) -> web.Response:
+    body = await _read_json(request)
+    message = str(body.get("message") or "").strip()
+    if not message:
+        return _error("message 가 비어 있습니다.")
+    if len(message) > MAX_MESSAGE_CHARS:
+        return _error(f"message 는 {MAX_MESSAGE_CHARS}자 이하여야 합니다.")
+    session_id = str(body.get("session_id") or uuid.uuid4().hex)
+
+    # 같은 세션의 동시 요청은 이 워커 안에서 순서대로 처리 (대화 기록이 엇갈리지 않도록)
+    locks = request.app[SESSION_LOCKS_KEY]
+    lock = locks.get(session_id)
+    if lock is None:
+        lock = locks[session_id] = asyncio.Lock()
+
+    store = request.app[SESSION_STORE_KEY]
+    async with lock:
+        state = await store.load(session_id)
+        memory = TokenBudgetMemory.from_dict(state) if state else TokenBudgetMemory()
+        try:
+            result = await _run(request, route_query, message, memory.history())
+        except Exception:
+            # 내부 예외 내용(경로, 키 등)은 로그에만 남기고 응답에는 싣지 않음
+            logger.exception("chat 처리 실패 session=%s", session_id)
+            return _error("요청을 처리하는 중 오류가 발생했습니다.", status=500)
+        memory.add_user_message(message)
+        memory.add_ai_message(result["output"])
+        await store.save(session_id, memory.to_dict())
+
+    return _json({
+        "session_id": session_id,
+        "output": result["output"],
+        "path": result["path"],
+        "trace_id": result["trace_id"],
+        "usage": result["usage"],
+    })
+
+
+async def delete_session(request: web.Request) -> web.Response:
+    await request.app[SESSION_STORE_KEY].delete(request.match_info["session_id"])
+    return _json({"deleted": request.match_info["session_id"]})
+
+
+# ✅ 도구 직접 호출 (LLM 없이)
+async def filter_coupons(request: web.Request) -> web.Response:
+    body = await _read_json(request)
+    if body.get("conditions") is not None:
+        conditions = body["conditions"]
+        if not isinstance(conditions, dict):
+            return _error("conditions 는 객체여야 합니다. 예: {\"지역1\": [\"경기\"]}")
+        cond = {}
+        for key in ("지역1", "지역2", "지원방식"):
+            values = conditions.get(key) or []
+            # 문자열을 그대로 list() 하면 글자 단위로 쪼개지므로 목록만 받음
+            if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+                return _error(f"conditions.{key} 는 문자열 목록이어야 합니다.")
+            cond[key] = values
+    elif body.get("query"):
+        cond = parse_conditions(str(body["query"]))
+    else:
+        return _error("query 또는 conditions 가 필요합니다.")
+    results = get_coupon_store().filter(cond)
+    return _json({"conditions": cond, "count": len(results), "results": results})
+
+
+def _vector_search(query: str, k: int):
+    from tools.vector_search_tool import get_vector_index
+
+    return get_vector_index().search(query, k=k, cond=parse_conditions(query))
+
+
+async def search(request: web.Request) -> web.Response:
+    body = await _read_json(request)
+    query = str(body.get("query") or "").strip()
+    if not query:
+        return _error("query 가 비어 있습니다.")
+    k = _int_param(body, "k", 5, 50)
+    results = await _run(request, _vector_search, query, k)
+    return _json({"count": len(results), "results": results})
+
+
+def _merchant_search(query: str, limit: int) -> Dict:
+    from tools.merchant_store import get_merchant_store
+
+    return get_merchant_store().search(query, limit=limit)
+
+
+async def merchants(request: web.Request) -> web.Response:
+    body = await _read_json(request)
+    query = str(body.get("query") or "").strip()
+    if not query:
+        return _error("query 가 비어 있습니다.")
+    limit = _int_param(body, "limit", 20, 200)
+    return _json(await _run(request, _merchant_search, query, limit))
+
+
+# ✅ 일괄 질의 (조건이 같은 질문은 묶어서 한 번에, 나머지만 에이전트로)
+async def batch(request: web.Request) -> web.StreamResponse:
+    from agents.batch_router import abatch_answer
+
+    body = await _read_json(request)
+    queries = body.get("queries")
+    if not isinstance(queries, list) or not queries:
+        return _error("queries 목록이 필요합니다.")
+    if len(queries) > MAX_BATCH_QUERIES:
+        return _error(f"queries 는 {MAX_BATCH_QUERIES}개 이하여야 합니다.")
+    if not all(isinstance(q, (str, dict)) for q in queries):
+        return _error("queries 의 항목은 문자열 또는 {\"query\"} 객체여야 합니다.")
+    concurrency = _int_param(body, "concurrency", 4, 16)
+
+    response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson; charset=utf-8"})
+    await response.prepare(request)
+    async for result in abatch_answer(queries, concurrency=concurrency):
+        await response.write((json.dumps(result, ensure_ascii=False) + "\n").encode("utf-8"))
+    await response.write_eof()
+    return response
+
+
+async def health(request: web.Request) -> web.Response:
+    return _json({"status": "ok", "pid": os.getpid()})
+
+
+# ✅ 워커 시작/종료
+def warm_up():
+    """워커가 요청을 받기 전에 공유 리소스를 올려 둠 (없는 리소스는 첫 요청 때 다시 시도)"""
+    from agents.agent_executor import get_agent_executor
+    from tools.filter_tool import get_condition_matcher
+    from tools.query_classifier import get_query_classifier
+
+    for name, load in [("coupon_store", get_coupon_store), ("condition_matcher", get_condition_matcher),
+                       ("query_classifier", get_query_classifier), ("agent_executor", get_agent_executor)]:
+        try:
+            load()
+        except Exception as e:
+            logger.warning("워밍업 실패 %s: %s", name, e)
+
+
+def create_app(session_store: Optional[SessionStore] = None, warmup: bool = True,
+               threads: int = API_THREADS) -> web.Application:
+    app = web.Application()
+    app[SESSION_STORE_KEY] = session_store or create_session_store()
+    app[EXECUTOR_KEY] = ThreadPoolExecutor(threads, thread_name_prefix="api")
+    app[SESSION_LOCKS_KEY] = weakref.WeakValueDictionary()
+
+    async def on_startup(app: web.Application):
+        if warmup:
+            await asyncio.get_running_loop().run_in_executor(app[EXECUTOR_KEY], warm_up)
+
+    async def on_cleanup(app: web.Application):
+        await app[SESSION_STORE_KEY].close()
+        app[EXECUTOR_KEY].shutdown(wait=False, cancel_futures=True)
+
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    app.add_routes([
+        web.post("/chat", chat),
+        web.delete("/sessions/{session_id}", delete_session),
+        web.post("/filter", filter_coupons),
+        web.post("/search", search),
+        web.post("/merchants", merchants),
+        web.post("/batch", batch),
+        web.get("/health", health),
+    ])
+    return app
+
+
+def _run_worker(host: str, port: int, reuse_port: bool):
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s [{os.getpid()}] %(name)s %(message)s")
+    web.run_app(create_app(), host=host, port=port, reuse_port=reuse_port, print=None)
+
+
+def serve(host: str = "0.0.0.0", port: int = 8000, workers: int = 1):
+    """workers 개의 프로세스가 SO_REUSEPORT 로 같은 포트를 나눠 받음 (커널이 연결을 분배)"""
+    if workers > 1 and is_process_local(SESSION_STORE_URL):
+        # 연결마다 다른 워커로 가므로 memory:// 면 한 사용자의 대화가 워커별로 갈라짐
+        raise ValueError(f"--workers {workers} 에는 워커 간에 공유되는 세션 저장소가 필요합니다 "
+                         f"(SESSION_STORE_URL=sqlite:///data/sessions.db 또는 redis://...). 현재: {SESSION_STORE_URL}")
+    if workers <= 1:
+        _run_worker(host, port, reuse_port=False)
+        return
+    # fork 대신 spawn: 부모의 스레드/이벤트 루프 상태를 물려받지 않고 워커마다 리소스를 새로 올림
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_run_worker, args=(host, port, True), name=f"api-worker-{i}")
+             for i in range(workers)]
+    for p in procs:
+        p.start()
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            p.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대동여지갑 HTTP API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("API_WORKERS", "1")))
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""세션별 대화 상태 저장소
+
+HTTP API 는 요청마다 세션 상태(TokenBudgetMemory.to_dict())를 읽고 다시 씁니다.
+워커가 하나면 memory://, 한 서버의 여러 워커면 sqlite:///경로, 여러 서버면 redis://... 를 씁니다.
+redis:// 는 선택 의존성인 redis 패키지가 있어야 합니다 (pip install "redis>=5.0").
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+SESSION_STORE_URL = os.getenv("SESSION_STORE_URL", "memory://")
+SESSION_TTL = int(os.getenv("SESSION_TTL", str(24 * 3600)))      # 마지막 사용 후 보관 시간(초)
+MAX_MEMORY_SESSIONS = int(os.getenv("MAX_MEMORY_SESSIONS", "10000"))
+
+
+class SessionStore(ABC):
+    """세션 상태(JSON 직렬화 가능한 dict) 저장소 인터페이스"""
+
+    @abstractmethod
+    async def load(self, session_id: str) -> Optional[Dict]:
+        """저장된 상태 (없거나 만료됐으면 None)"""
+
+    @abstractmethod
+    async def save(self, session_id: str, state: Dict):
+        """상태를 저장하고 만료 시각을 갱신"""
+
+    @abstractmethod
+    async def delete(self, session_id: str):
+        """세션 삭제 (없어도 오류 아님)"""
+
+    async def close(self):
+        pass
+
+
+# ✅ 프로세스 메모리 (워커 하나 / 테스트용, LRU + TTL)
+class MemorySessionStore(SessionStore):
+    def __init__(self, ttl: float = SESSION_TTL, max_sessions: int = MAX_MEMORY_SESSIONS):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._items: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    async def load(self, session_id: str) -> Optional[Dict]:
+        item = self._items.get(session_id)
+        if item is None:
+            return None
+        saved_at, payload = item
+        if time.time() - saved_at > self.ttl:
+            del self._items[session_id]
+            return None
+        self._items.move_to_end(session_id)
+        # 다른 저장소와 같이 복사본을 돌려줌 (요청 간 상태 공유 방지)
+        return json.loads(payload)
+
+    async def save(self, session_id: str, state: Dict):
+        self._items[session_id] = (time.time(), json.dumps(state, ensure_ascii=False))
+        self._items.move_to_end(session_id)
+        while len(self._items) > self.max_sessions:
+            self._items.popitem(last=False)
+
+    async def delete(self, session_id: str):
+        self._items.pop(session_id, None)
+
+
+# ✅ SQLite (같은 서버의 여러 워커 프로세스가 공유)
+class SqliteSessionStore(SessionStore):
+    def __init__(self, path: str, ttl: float = SESSION_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, state TEXT NOT NULL, saved_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # 연결은 스레드별로 하나 (sqlite3 연결은 스레드 간 공유 불가)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            self._local.conn = conn
+        return conn
+
+    def _load(self, session_id: str) -> Optional[Dict]:
+        row = self._connect().execute(
+            "SELECT state FROM sessions WHERE id = ? AND saved_at > ?", (session_id, time.time() - self.ttl)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _save(self, session_id: str, state: Dict):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, state, saved_at) VALUES (?, ?, ?)",
+                (session_id, json.dumps(state, ensure_ascii=False), time.time()),
+            )
+
+    def _delete(self, session_id: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def purge_expired(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM sessions WHERE saved_at <= ?", (time.time() - self.ttl,)).rowcount
+
+    async def load(self, session_id: str) -> Optional[Dict]:
+        return await asyncio.to_thread(self._load, session_id)
+
+    async def save(self, session_id: str, state: Dict):
+        await asyncio.to_thread(self._save, session_id, state)
+
+    async def delete(self, session_id: str):
+        await asyncio.to_thread(self._delete, session_id)
+
+
+# ✅ Redis (여러 서버, TTL 은 Redis 가 관리)
+class RedisSessionStore(SessionStore):
+    def __init__(self, url: str, ttl: float = SESSION_TTL, prefix: str = "session:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise ImportError(
+                f"{url} 세션 저장소에는 redis 패키지가 필요합니다: pip install \"redis>=5.0\"") from e
+
+        self.client = redis.from_url(url)
+        self.ttl = int(ttl)
+        self.prefix = prefix
+
+    async def load(self, session_id: str) -> Optional[Dict]:
+        payload = await self.client.get(self.prefix + session_id)
+        return json.loads(payload) if payload else None
+
+    async def save(self, session_id: str, state: Dict):
+        await self.client.set(self.prefix + session_id, json.dumps(state, ensure_ascii=False), ex=self.ttl)
+
+    async def delete(self, session_id: str):
+        await self.client.delete(self.prefix + session_id)
+
+    async def close(self):
+        await self.client.aclose()
+
+
+def is_process_local(url: str = SESSION_STORE_URL) -> bool:
+    """워커 프로세스마다 따로 생기는 저장소인지 (여러 워커면 세션이 워커별로 갈라짐)"""
+    return url.partition("://")[0] == "memory"
+
+
+def create_session_store(url: str = SESSION_STORE_URL) -> SessionStore:
+    """memory:// | sqlite:///data/sessions.db | redis://host:6379/0"""
+    scheme, _, rest = url.partition("://")
+    if scheme == "memory":
+        return MemorySessionStore()
+    if scheme == "sqlite":
+        return SqliteSessionStore(rest[1:] if rest.startswith("/") else rest)
+    if scheme in ("redis", "rediss"):
+        return RedisSessionStore(url)
+    raise ValueError(f"지원하지 않는 세션 저장소: {url}")
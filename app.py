@@ -1,5 +1,8 @@
 import streamlit as st
-from agents.agent_executor import agent_executor
+from agents.router_agent import route_query
+from agents.streaming_callback import StreamlitStreamHandler
+from agents.conversation_memory import TokenBudgetMemory
+from monitoring.tracing import get_trace
 from langchain_core.messages import AIMessage, HumanMessage
 from dotenv import load_dotenv
 import os
@@ -12,32 +15,55 @@ st.title("💬 대동여지갑")
 
 # ✅ 세션 상태로 멀티턴 대화 유지
 if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
+    st.session_state.chat_history = []  # 화면 출력용
+if "memory" not in st.session_state:
+    st.session_state.memory = TokenBudgetMemory()  # 에이전트 프롬프트용 (토큰 예산 제한)
 
-# ✅ 사용자 입력 받기
-user_input = st.chat_input("무엇이 궁금한가요? 예: '모바일 되는 충청도 지역상품권 알려줘'")
-
-if user_input:
-    try:
-        # 대화 기록 저장
-        st.session_state.chat_history.append(HumanMessage(content=user_input))
-        
-        # Agent 실행
-        with st.spinner("🤖 답변 생성 중..."):
-            response = agent_executor.invoke({
-                "input": user_input,
-                "chat_history": st.session_state.chat_history
-            })
-
-        # 응답 저장
-        st.session_state.chat_history.append(AIMessage(content=response["output"]))
-    except Exception as e:
-        st.error(f"오류가 발생했습니다: {str(e)}")
-        st.info("잠시 후 다시 시도해주세요.")
-
-# ✅ 대화 내용 출력
+# ✅ 지난 대화 내용 출력
 for msg in st.session_state.chat_history:
     if isinstance(msg, HumanMessage):
         st.chat_message("user").write(msg.content)
     elif isinstance(msg, AIMessage):
         st.chat_message("assistant").markdown(msg.content)
+
+# ✅ 사용자 입력 받기
+user_input = st.chat_input("무엇이 궁금한가요? 예: '모바일 되는 충청도 지역상품권 알려줘'")
+
+if user_input:
+    st.chat_message("user").write(user_input)
+    # 대화 기록 저장
+    st.session_state.chat_history.append(HumanMessage(content=user_input))
+
+    with st.chat_message("assistant"):
+        handler = StreamlitStreamHandler(st.container())
+        try:
+            # 단순 조회는 규칙 기반, 나머지는 Agent를 스트리밍으로 실행
+            response = route_query(user_input, st.session_state.memory.history(), callbacks=[handler])
+            handler.finish(response["output"])
+
+            # 응답 저장
+            st.session_state.chat_history.append(AIMessage(content=response["output"]))
+            st.session_state.memory.add_user_message(user_input)
+            st.session_state.memory.add_ai_message(response["output"])
+
+            path_label = {
+                "fast": "⚡ 규칙 기반 응답",
+                "external": "🔍 외부 검색 응답",
+                "calculator": "🧮 계산기 응답",
+                "cache": "♻️ 이전 답변 재사용",
+                "budget": "⛔ 토큰/시간 한도 초과",
+            }.get(response["path"], "🤖 에이전트 응답")
+            usage = response["usage"]
+            usage_label = (f" · LLM {usage['calls']}회, 토큰 {usage['prompt_tokens']}+{usage['completion_tokens']}"
+                           f" (${usage['cost_usd']:.4f})") if usage["calls"] else ""
+            st.caption(f"{path_label} · 첫 토큰까지 {handler.time_to_first_token:.2f}초{usage_label} · trace `{response['trace_id'][:8]}`")
+
+            # ✅ 단계별 소요 시간 (분류 / 필터 / LLM / 외부 검색)
+            with st.expander("⏱ 단계별 소요 시간"):
+                for s in get_trace(response["trace_id"]):
+                    tokens = s["attributes"].get("prompt_tokens")
+                    token_label = f" · 토큰 {tokens}+{s['attributes'].get('completion_tokens', 0)}" if tokens else ""
+                    st.text(f"{s['name']}: {s['duration_ms']:.1f}ms{token_label}")
+        except Exception as e:
+            st.error(f"오류가 발생했습니다: {str(e)}")
+            st.info("잠시 후 다시 시도해주세요.")
@@ -0,0 +1,142 @@
+"""지역사랑상품권 데이터 포맷별 로드 시간/메모리/필터 지연 비교
+
+JSONL 을 읽어 선형 필터(filter_jsonl_by_condition)로 거르는 경로와, 컬럼형 바이너리(.cpn)를
+mmap 으로 열어 비트마스크로 거르는 경로를 같은 조건들로 비교해 JSON 으로 출력합니다.
+로드 시간과 RSS 는 포맷마다 새 프로세스에서 측정합니다 (이미 올라간 모듈/페이지 캐시 영향 제외).
+
+    python monitoring/coupon_format_benchmark.py
+    python monitoring/coupon_format_benchmark.py --scale 500    # 레코드를 500배로 늘려 규모 확인
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tools.coupon_columnar import ColumnarCoupons, columnar_path, load_or_compile  # noqa: E402
+from tools.coupon_store import COUPON_DATA_PATH  # noqa: E402
+from tools.filter_tool import filter_jsonl_by_condition, load_jsonl, parse_conditions  # noqa: E402
+
+QUERIES_PATH = os.path.join(ROOT, "monitoring", "load_test_queries.txt")
+
+# 새 프로세스에서 포맷 하나를 열고 (로드 시간 초, 늘어난 RSS 바이트) 출력
+_LOAD_PROBE = (
+    "import json, sys, time, psutil\n"
+    "sys.path.insert(0, sys.argv[3])\n"
+    "import numpy\n"
+    "from tools.coupon_columnar import ColumnarCoupons\n"
+    "from tools.filter_tool import load_jsonl\n"
+    "p = psutil.Process()\n"
+    "before = p.memory_info().rss\n"
+    "start = time.perf_counter()\n"
+    "data = load_jsonl(sys.argv[2]) if sys.argv[1] == 'jsonl' else ColumnarCoupons.load(sys.argv[2])\n"
+    "elapsed = time.perf_counter() - start\n"
+    "print(json.dumps([elapsed, p.memory_info().rss - before]))\n"
+)
+
+
+def load_conditions(path: str = QUERIES_PATH) -> List[Dict[str, List[str]]]:
+    """부하 테스트 질문 중 지역/지원방식 조건이 있는 것들의 조건"""
+    with open(path, "r", encoding="utf-8") as f:
+        queries = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    conds = [parse_conditions(q) for q in queries]
+    return [c for c in conds if c.get("지역1") or c.get("지역2")]
+
+
+def measure_load(fmt: str, path: str, repeat: int = 3) -> Dict:
+    """새 프로세스에서 연 시간(최솟값)과 RSS 증가량"""
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", _LOAD_PROBE, fmt, path, ROOT],
+                             capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+    return {
+        "load_ms": round(min(r[0] for r in runs) * 1000, 3),
+        "rss_mb": round(min(r[1] for r in runs) / 2**20, 2),
+        "file_mb": round(os.path.getsize(path) / 2**20, 3),
+    }
+
+
+def _latency(fn, conds: List[Dict], rounds: int) -> Dict:
+    latencies = []
+    for _ in range(rounds):
+        for cond in conds:
+            start = time.perf_counter()
+            fn(cond)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        "filter_p50_ms": round(float(np.percentile(latencies, 50)), 4),
+        "filter_p95_ms": round(float(np.percentile(latencies, 95)), 4),
+    }
+
+
+def run_benchmark(jsonl_path: str, conds: List[Dict], rounds: int = 20) -> Dict[str, Dict]:
+    cpn_path = columnar_path(jsonl_path)
+    start = time.perf_counter()
+    load_or_compile(jsonl_path, cpn_path)
+    compile_s = time.perf_counter() - start
+
+    data = load_jsonl(jsonl_path)
+    table = ColumnarCoupons.load(cpn_path)
+    for cond in conds:
+        # 두 경로의 결과가 같아야 비교가 의미 있음
+        expected = filter_jsonl_by_condition.__wrapped__(data, cond)
+        if [table.view(i) for i in table.match_ids(cond)] != expected:
+            raise AssertionError(f"필터 결과 불일치: {cond}")
+
+    jsonl = {**measure_load("jsonl", jsonl_path),
+             **_latency(lambda c: filter_jsonl_by_condition.__wrapped__(data, c), conds, rounds)}
+    columnar = {**measure_load("columnar", cpn_path),
+                **_latency(lambda c: [table.view(i) for i in table.match_ids(c)], conds, rounds),
+                "compile_s": round(compile_s, 3)}
+    return {"jsonl": jsonl, "columnar": columnar}
+
+
+def scaled_jsonl(path: str, scale: int, workdir: str) -> str:
+    """레코드를 scale 배로 복제한 임시 JSONL"""
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line for line in f if line.strip()]
+    out = os.path.join(workdir, f"coupons_x{scale}.jsonl")
+    with open(out, "w", encoding="utf-8") as f:
+        for _ in range(scale):
+            f.writelines(lines)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSONL vs 컬럼형 바이너리 로드/메모리/필터 비교")
+    parser.add_argument("--jsonl", default=COUPON_DATA_PATH)
+    parser.add_argument("--scale", type=int, default=1, help="레코드 복제 배수")
+    parser.add_argument("--rounds", type=int, default=20, help="조건 목록 반복 횟수")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    conds = load_conditions()
+    with tempfile.TemporaryDirectory() as workdir:
+        path = scaled_jsonl(args.jsonl, args.scale, workdir) if args.scale > 1 else args.jsonl
+        with open(path, "r", encoding="utf-8") as f:
+            count = sum(1 for line in f if line.strip())
+        report = {
+            "source": args.jsonl,
+            "scale": args.scale,
+            "count": count,
+            "conditions": len(conds),
+            "formats": run_benchmark(path, conds, args.rounds),
+        }
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,158 +1,181 @@
-import streamlit as st
+import os
+import sys
+import time
+
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import json
-from performance_monitor import performance_monitor
-import time
+import streamlit as st
+
+# `streamlit run monitoring/dashboard.py` 로 실행해도 프로젝트 루트 기준으로 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from monitoring.metrics_store import TIME_RANGES, MetricsRollup
+from monitoring.performance_monitor import METRICS_DIR, performance_monitor
 
 st.set_page_config(page_title="시스템 성능 대시보드", layout="wide")
 st.title("📊 시스템 성능 모니터링 대시보드")
 
 # 사이드바 설정
 st.sidebar.title("설정")
-time_range = st.sidebar.selectbox(
-    "시간 범위",
-    ["최근 1시간", "최근 24시간", "최근 7일", "전체"]
-)
-
-# 메트릭 데이터 로드
-try:
-    with open("performance_metrics.json", "r", encoding="utf-8") as f:
-        metrics = json.load(f)
-except FileNotFoundError:
-    st.error("성능 메트릭 데이터를 찾을 수 없습니다.")
-    st.stop()
-
-# 데이터 전처리
-def process_metrics(metrics, time_range):
-    """메트릭 데이터 전처리"""
-    now = datetime.now()
-    
-    if time_range == "최근 1시간":
-        start_time = now - timedelta(hours=1)
-    elif time_range == "최근 24시간":
-        start_time = now - timedelta(days=1)
-    elif time_range == "최근 7일":
-        start_time = now - timedelta(days=7)
+time_range = st.sidebar.selectbox("시간 범위", list(TIME_RANGES))
+auto_refresh = st.sidebar.checkbox("자동 새로고침 (5초)")
+
+
+# ✅ 집계 저장소는 프로세스당 하나 (재실행마다 새로 붙은 세그먼트 줄만 읽음)
+@st.cache_resource
+def get_rollup() -> MetricsRollup:
+    return MetricsRollup(METRICS_DIR)
+
+
+def render():
+    rollup = get_rollup()
+    rollup.poll()
+
+    window = rollup.window(time_range)
+    summary = rollup.summary(time_range)
+    if window.empty:
+        st.info("성능 메트릭 데이터가 없습니다. 앱을 사용하면 metrics/ 에 쌓입니다.")
+
+    # 대시보드 레이아웃
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("응답 시간")
+        df_response = window[window["metric"] == "response_times"]
+        if not df_response.empty:
+            fig_response = px.line(
+                df_response,
+                x="timestamp",
+                y=["p50", "p95", "p99"],
+                title="응답 시간 추이 (초)"
+            )
+            st.plotly_chart(fig_response, use_container_width=True)
+        else:
+            st.info("응답 시간 데이터가 없습니다.")
+
+    with col2:
+        st.subheader("메모리 사용량")
+        df_memory = window[window["metric"] == "memory_usage"]
+        if not df_memory.empty:
+            df_memory = df_memory.assign(max_mb=df_memory["max"] / (1024 * 1024))  # MB로 변환
+            fig_memory = px.line(
+                df_memory,
+                x="timestamp",
+                y="max_mb",
+                title="메모리 사용량 (MB)"
+            )
+            st.plotly_chart(fig_memory, use_container_width=True)
+        else:
+            st.info("메모리 사용량 데이터가 없습니다.")
+
+    # 단계별 소요 시간 (트레이싱 스팬)
+    st.subheader("단계별 소요 시간")
+    stages = {k[len("spans:"):]: v for k, v in summary.items() if k.startswith("spans:")}
+    if stages:
+        df_stages = pd.DataFrame.from_dict(stages, orient="index")[["count", "p50", "p95", "p99"]]
+        st.dataframe((df_stages * [1, 1000, 1000, 1000]).rename(
+            columns={"p50": "p50 (ms)", "p95": "p95 (ms)", "p99": "p99 (ms)"}
+        ), use_container_width=True)
     else:
-        start_time = datetime.min
-
-    filtered_metrics = {
-        "response_times": [],
-        "memory_usage": [],
-        "cpu_usage": [],
-        "errors": []
-    }
-
-    for metric_type in metrics:
-        for metric in metrics[metric_type]:
-            timestamp = datetime.fromisoformat(metric["timestamp"])
-            if timestamp >= start_time:
-                filtered_metrics[metric_type].append(metric)
-
-    return filtered_metrics
-
-filtered_metrics = process_metrics(metrics, time_range)
-
-# 대시보드 레이아웃
-col1, col2 = st.columns(2)
-
-with col1:
-    st.subheader("응답 시간")
-    if filtered_metrics["response_times"]:
-        df_response = pd.DataFrame(filtered_metrics["response_times"])
-        df_response["timestamp"] = pd.to_datetime(df_response["timestamp"])
-        fig_response = px.line(
-            df_response,
-            x="timestamp",
-            y="value",
-            title="응답 시간 추이"
-        )
-        st.plotly_chart(fig_response, use_container_width=True)
+        st.info("트레이싱 데이터가 없습니다.")
+
+    # LLM 토큰 / 비용 (tools/llm_gateway.py 가 호출마다 기록)
+    st.subheader("LLM 토큰 / 비용")
+    usage = rollup.llm_usage(time_range)
+    if not usage.empty:
+        turn_tokens = summary.get("llm_turn_tokens:turn", {})
+        col_a, col_b, col_c, col_d = st.columns(4)
+        with col_a:
+            st.metric("LLM 호출 수", f"{int(usage['calls'].sum())}")
+        with col_b:
+            st.metric("총 토큰 (입력 + 출력)",
+                      f"{int(usage['prompt_tokens'].sum()):,} + {int(usage['completion_tokens'].sum()):,}")
+        with col_c:
+            st.metric("추정 비용", f"${usage['cost_usd'].sum():.4f}")
+        with col_d:
+            st.metric("턴당 토큰 평균 / p95",
+                      f"{turn_tokens.get('mean', 0):.0f} / {turn_tokens.get('p95', 0):.0f}")
+
+        st.dataframe(usage.rename(columns={
+            "calls": "호출 수", "prompt_tokens": "입력 토큰", "completion_tokens": "출력 토큰",
+            "prompt_tokens_p95": "입력 토큰 p95", "cost_usd": "비용 ($)", "latency_p95_s": "지연 p95 (초)",
+        }), use_container_width=True)
+
+        # 프롬프트 크기가 지연을 좌우하므로 입력 토큰 추이를 용도별로
+        df_prompt = window[window["metric"].astype(str).str.startswith("llm_prompt_tokens:")]
+        if not df_prompt.empty:
+            df_prompt = df_prompt.assign(purpose=df_prompt["metric"].astype(str).str.split(":").str[1])
+            fig_prompt = px.line(df_prompt, x="timestamp", y="p95", color="purpose",
+                                 title="호출당 입력 토큰 p95 추이")
+            st.plotly_chart(fig_prompt, use_container_width=True)
     else:
-        st.info("응답 시간 데이터가 없습니다.")
-
-with col2:
-    st.subheader("메모리 사용량")
-    if filtered_metrics["memory_usage"]:
-        df_memory = pd.DataFrame(filtered_metrics["memory_usage"])
-        df_memory["timestamp"] = pd.to_datetime(df_memory["timestamp"])
-        df_memory["value"] = df_memory["value"] / (1024 * 1024)  # MB로 변환
-        fig_memory = px.line(
-            df_memory,
-            x="timestamp",
-            y="value",
-            title="메모리 사용량 (MB)"
+        st.info("LLM 호출 기록이 없습니다.")
+
+    # 시스템 상태
+    st.subheader("시스템 상태")
+    system_metrics = performance_monitor.get_system_metrics()
+
+    col3, col4, col5 = st.columns(3)
+
+    with col3:
+        st.metric("CPU 사용률", f"{system_metrics['cpu_percent']}%")
+
+    with col4:
+        st.metric("메모리 사용률", f"{system_metrics['memory_percent']}%")
+
+    with col5:
+        st.metric("디스크 사용률", f"{system_metrics['disk_usage']}%")
+
+    # 에러 로그
+    st.subheader("에러 로그")
+    seconds = TIME_RANGES[time_range][0]
+    errors = rollup.recent_errors(None if seconds is None else time.time() - seconds)
+    if errors:
+        df_errors = pd.DataFrame(errors)
+        df_errors["timestamp"] = pd.to_datetime(df_errors["ts"] + time.localtime().tm_gmtoff, unit="s")
+        st.dataframe(
+            df_errors[["timestamp", "value", "metadata"]],
+            use_container_width=True
         )
-        st.plotly_chart(fig_memory, use_container_width=True)
     else:
-        st.info("메모리 사용량 데이터가 없습니다.")
-
-# 시스템 상태
-st.subheader("시스템 상태")
-system_metrics = performance_monitor.get_system_metrics()
-
-col3, col4, col5 = st.columns(3)
-
-with col3:
-    st.metric("CPU 사용률", f"{system_metrics['cpu_percent']}%")
-
-with col4:
-    st.metric("메모리 사용률", f"{system_metrics['memory_percent']}%")
-
-with col5:
-    st.metric("디스크 사용률", f"{system_metrics['disk_usage']}%")
-
-# 에러 로그
-st.subheader("에러 로그")
-if filtered_metrics["errors"]:
-    df_errors = pd.DataFrame(filtered_metrics["errors"])
-    df_errors["timestamp"] = pd.to_datetime(df_errors["timestamp"])
-    st.dataframe(
-        df_errors[["timestamp", "value", "metadata"]],
-        use_container_width=True
-    )
-else:
-    st.info("에러 로그가 없습니다.")
-
-# 성능 분석
-st.subheader("성능 분석")
-analysis = performance_monitor.analyze_performance()
-
-col6, col7, col8, col9 = st.columns(4)
-
-with col6:
-    st.metric(
-        "평균 응답 시간",
-        f"{analysis['average_response_time']:.2f}초"
-    )
-
-with col7:
-    st.metric(
-        "최대 메모리 사용량",
-        f"{analysis['max_memory_usage'] / (1024 * 1024):.2f}MB"
-    )
-
-with col8:
-    st.metric(
-        "에러율",
-        f"{analysis['error_rate'] * 100:.2f}%"
-    )
-
-with col9:
-    st.metric(
-        "총 요청 수",
-        f"{analysis['total_requests']}"
-    )
-
-# 자동 새로고침
-if st.button("새로고침"):
-    st.experimental_rerun()
+        st.info("에러 로그가 없습니다.")
 
-# 자동 새로고침 설정
-auto_refresh = st.sidebar.checkbox("자동 새로고침 (5초)")
-if auto_refresh:
-    time.sleep(5)
-    st.experimental_rerun() 
\ No newline at end of file
+    # 성능 분석
+    st.subheader("성능 분석")
+    response = summary.get("response_times", {})
+    memory = summary.get("memory_usage", {})
+    total_requests = int(response.get("count", 0))
+    total_errors = int(summary.get("errors", {}).get("count", 0))
+
+    col6, col7, col8, col9 = st.columns(4)
+
+    with col6:
+        st.metric(
+            "평균 / p95 응답 시간",
+            f"{response.get('mean', 0):.2f}초 / {response.get('p95', 0):.2f}초"
+        )
+
+    with col7:
+        st.metric(
+            "최대 메모리 사용량",
+            f"{memory.get('max', 0) / (1024 * 1024):.2f}MB"
+        )
+
+    with col8:
+        st.metric(
+            "에러율",
+            f"{(total_errors / total_requests if total_requests else 0) * 100:.2f}%"
+        )
+
+    with col9:
+        st.metric(
+            "총 요청 수",
+            f"{total_requests}"
+        )
+
+
+# ✅ 자동 새로고침은 fragment 주기 실행 (sleep 으로 스크립트를 붙잡지 않음)
+st.fragment(render, run_every=5 if auto_refresh else None)()
+
+if st.button("새로고침"):
+    st.rerun()
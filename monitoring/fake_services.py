@@ -0,0 +1,134 @@
+"""부하 테스트/시스템 테스트용 가짜 OpenAI, 네이버 서비스
+
+실제 API 없이 에이전트 전체 경로(함수 호출 → 도구 실행 → 최종 답변)를 그대로 돌리되,
+응답은 결정적이고 지연 시간만 설정값대로 흉내 냅니다.
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from agents.conversation_memory import count_tokens
+
+EXTERNAL_KEYWORDS = ["맛집", "관광", "카페", "명소"]
+MERCHANT_KEYWORDS = ["가맹점", "음식점", "가게", "식당"]
+COUPON_KEYWORDS = ["상품권", "화폐"]
+
+
+def _pick_tools(query: str) -> List[str]:
+    """질문 내용으로 호출할 도구들을 정함 (실제 GPT의 병렬 tool call 선택을 흉내)
+
+    "대전 상품권이랑 맛집" 처럼 여러 의도가 섞이면 도구 여러 개를 한 번에 호출합니다.
+    """
+    tools = []
+    if any(k in query for k in EXTERNAL_KEYWORDS):
+        tools.append("naver_local_search")
+    if any(k in query for k in MERCHANT_KEYWORDS):
+        tools.append("merchant_search")
+    if any(k in query for k in ["정리", "요약"]):
+        tools += ["filter_coupon_data", "summarize_coupon_results"]
+    elif not tools or any(k in query for k in COUPON_KEYWORDS):
+        tools.append("filter_coupon_data")
+    return tools
+
+
+# ✅ 에이전트용 가짜 채팅 모델 (OpenAI tools 형식으로 응답)
+class FakeAgentChatModel(BaseChatModel):
+    """첫 호출은 도구 호출(tool_calls, 여러 개일 수 있음), 도구 결과를 받은 뒤에는 최종 답변을 돌려줍니다."""
+
+    latency: float = 0.5                 # 첫 토큰까지 지연(초)
+    per_token_latency: float = 0.0       # 출력 토큰당 지연(초)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-agent-chat"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        prompt_tokens = sum(count_tokens(str(m.content)) for m in messages)
+        if isinstance(messages[-1], ToolMessage):
+            results = []
+            for m in reversed(messages):
+                if not isinstance(m, ToolMessage):
+                    break
+                results.append(str(m.content)[:300])
+            content = "조회 결과를 정리했습니다.\n\n" + "\n\n".join(reversed(results))
+            message = AIMessage(content=content)
+        else:
+            query = next((str(m.content) for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+            message = AIMessage(content="", tool_calls=[
+                {"name": name, "args": {"query": query}, "id": f"call_{i}", "type": "tool_call"}
+                for i, name in enumerate(_pick_tools(query))
+            ])
+        completion_tokens = max(1, count_tokens(str(message.content)))
+        time.sleep(self.latency + self.per_token_latency * completion_tokens)
+        message.usage_metadata = {
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+# ✅ 요약용 가짜 OpenAI 클라이언트 (client.chat.completions.create 만 흉내)
+class FakeOpenAIClient:
+    def __init__(self, latency: float = 0.5):
+        self.latency = latency
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model: str, messages: List[Dict], **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        prompt = "\n".join(m["content"] for m in messages)
+        content = f"{len(prompt.splitlines()) - 2}개 지역상품권 요약입니다."
+        usage = SimpleNamespace(prompt_tokens=count_tokens(prompt), completion_tokens=count_tokens(content))
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=usage,
+        )
+
+
+def _fake_naver_client_class():
+    from tools.naver_search_tool import NaverLocalClient
+
+    class FakeNaverClient(NaverLocalClient):
+        """HTTP 대신 지연만 흉내 내고 고정된 검색 결과를 돌려줌 (캐시/중복 제거 로직은 그대로)"""
+
+        def __init__(self, latency: float = 0.2, **kwargs):
+            super().__init__("fake", "fake", **kwargs)
+            self.latency = latency
+            self.requests = 0
+
+        async def _fetch(self, query: str, display: int) -> List[Dict]:
+            self.requests += 1
+            await asyncio.sleep(self.latency)
+            return [
+                {"title": f"<b>{query}</b> {i}", "address": f"{query} 주소 {i}", "link": f"https://example.com/{i}"}
+                for i in range(1, display + 1)
+            ]
+
+    return FakeNaverClient
+
+
+def install_fake_services(llm_latency: float = 0.5, per_token_latency: float = 0.0,
+                          summary_latency: float = 0.5, naver_latency: float = 0.2) -> Dict[str, Any]:
+    """프로세스 전역 리소스를 가짜로 바꿔 끼우고, 에이전트를 새로 만들게 합니다."""
+    from agents.agent_executor import get_agent_executor
+    from tools import naver_search_tool
+    from tools.resources import get_chat_llm, get_openai_client
+
+    llm = FakeAgentChatModel(latency=llm_latency, per_token_latency=per_token_latency)
+    openai_client = FakeOpenAIClient(summary_latency)
+    get_chat_llm.set(llm)
+    get_openai_client.set(openai_client)
+    get_agent_executor.clear()
+
+    naver_client = _fake_naver_client_class()(naver_latency)
+    naver_search_tool.get_naver_client()  # 전용 루프 준비
+    naver_search_tool._client = naver_client
+    return {"llm": llm, "openai": openai_client, "naver": naver_client}
@@ -0,0 +1,98 @@
+"""앱 시작 비용(콜드 import 시간) 측정
+
+새 인터프리터에서 모듈을 import 하는 시간을 여러 번 재서 중앙값을 JSON으로 출력합니다.
+
+    python monitoring/import_benchmark.py
+    python monitoring/import_benchmark.py --runs 7 --save import_baseline.json
+    python monitoring/import_benchmark.py --baseline import_baseline.json --threshold 1.2
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    "tools.filter_tool",
+    "tools.llm_tool",
+    "agents.agent_executor",
+    "agents.router_agent",
+]
+
+_TIMER = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import {module}\n"
+    "elapsed = time.perf_counter() - start\n"
+    "heavy = [m for m in ('langchain.agents', 'langchain_openai', 'openai', 'faiss', 'pandas', 'httpx')"
+    " if m in sys.modules]\n"
+    "print(elapsed * 1000, ','.join(heavy))\n"
+)
+
+
+def time_import(module: str) -> Dict:
+    """새 프로세스에서 모듈 하나를 import 하는 데 걸린 시간(ms)과, 함께 로드된 무거운 모듈"""
+    out = subprocess.run(
+        [sys.executable, "-c", _TIMER.format(module=module)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout.strip().splitlines()[-1]
+    ms, _, heavy = out.partition(" ")
+    return {"ms": float(ms), "heavy": [m for m in heavy.split(",") if m]}
+
+
+def run_benchmark(modules: List[str], runs: int = 5) -> Dict[str, Dict]:
+    report = {}
+    for module in modules:
+        samples = [time_import(module) for _ in range(runs)]
+        times = [s["ms"] for s in samples]
+        report[module] = {
+            "median_ms": round(statistics.median(times), 1),
+            "min_ms": round(min(times), 1),
+            "max_ms": round(max(times), 1),
+            "heavy_modules": samples[-1]["heavy"],
+        }
+    return report
+
+
+def compare(report: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """기준치 대비 threshold 배 이상 느려진 모듈 목록"""
+    regressions = []
+    for module, result in report.items():
+        base = baseline.get(module)
+        if base and result["median_ms"] > base["median_ms"] * threshold:
+            regressions.append(
+                f"{module}: {base['median_ms']}ms → {result['median_ms']}ms"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="콜드 import 시간 측정")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--save", help="결과를 기준치 파일로 저장")
+    parser.add_argument("--baseline", help="비교할 기준치 JSON 파일")
+    parser.add_argument("--threshold", type=float, default=1.2, help="허용 배수 (기본 1.2)")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.modules, args.runs)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print("⚠️ import 시간 회귀:\n" + "\n".join(regressions), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""부하 테스트 / 단계별 지연 시간 벤치마크
+
+가짜 OpenAI·네이버(monitoring/fake_services.py)로 route_query 전체 경로를 돌리고,
+처리량과 단계별 p50/p95/p99 를 JSON 으로 출력합니다.
+
+    python monitoring/load_test.py --concurrency 8 --repeat 5
+    python monitoring/load_test.py --llm-latency 0.8 --naver-latency 0.3 --output bench.json
+    python monitoring/load_test.py --baseline bench.json --threshold 1.2
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from monitoring import tracing
+from monitoring.fake_services import install_fake_services
+
+QUERY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "load_test_queries.txt")
+
+
+def load_queries(path: str = QUERY_FILE) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def latency_stats(samples: List[float]) -> Dict[str, float]:
+    """초 단위 샘플 → ms 단위 통계"""
+    arr = np.asarray(samples, dtype="float64") * 1000
+    p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+    return {
+        "count": int(arr.size),
+        "mean_ms": round(float(arr.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(arr.max()), 3),
+    }
+
+
+class _SpanCollector:
+    """벤치마크 동안 끝난 스팬을 단계 이름별로 모음"""
+
+    def __init__(self):
+        self.durations: Dict[str, List[float]] = {}
+        self.tokens = {"prompt_tokens": 0, "completion_tokens": 0}
+        self._lock = threading.Lock()
+
+    def __call__(self, span: tracing.Span):
+        with self._lock:
+            self.durations.setdefault(span.name, []).append(span.duration)
+            for key in self.tokens:
+                self.tokens[key] += span.attributes.get(key, 0) or 0
+
+
+def _clear_caches():
+    from tools.llm_cache import summary_cache
+    from tools.naver_search_tool import get_naver_client
+    from tools.semantic_cache import get_semantic_cache
+
+    summary_cache.clear()
+    get_naver_client()[0]._cache.clear()
+    get_semantic_cache().clear()
+
+
+def run_load_test(queries: List[str], concurrency: int = 4, repeat: int = 1,
+                  warmup: bool = True, warm_cache: bool = False, semantic_cache: bool = False) -> Dict:
+    from agents.router_agent import route_query
+    from tools.semantic_cache import get_semantic_cache
+
+    # 의미 캐시는 기본으로 끔 (반복 회차가 전부 캐시 적중이 되면 에이전트 경로를 잴 수 없음)
+    cache = get_semantic_cache()
+    cache_enabled, cache.enabled = cache.enabled, semantic_cache
+    try:
+        return _run_load_test(route_query, queries, concurrency, repeat, warmup, warm_cache)
+    finally:
+        cache.enabled = cache_enabled
+
+
+def _run_load_test(route_query, queries: List[str], concurrency: int, repeat: int,
+                   warmup: bool, warm_cache: bool) -> Dict:
+    if warmup:
+        # 도구 모듈 import / 저장소 로딩 같은 1회성 비용은 측정에서 제외
+        for q in dict.fromkeys(queries):
+            route_query(q)
+    if not warm_cache:
+        # 워밍업 때 쌓인 요약/검색 캐시는 비우고 시작 (반복 회차부터는 캐시 효과가 반영됨)
+        _clear_caches()
+
+    collector = _SpanCollector()
+    tracing.add_exporter(collector)
+    paths: Dict[str, int] = {}
+    errors: List[str] = []
+    workload = queries * repeat
+
+    def one(query: str):
+        try:
+            result = route_query(query)
+            return result["path"]
+        except Exception as e:
+            errors.append(f"{query}: {type(e).__name__}: {e}")
+            return "error"
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for path in pool.map(one, workload):
+                paths[path] = paths.get(path, 0) + 1
+    finally:
+        elapsed = time.perf_counter() - start
+        tracing.remove_exporter(collector)
+
+    stages = {name: latency_stats(d) for name, d in sorted(collector.durations.items())}
+    return {
+        "requests": len(workload),
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(workload) / elapsed, 3),
+        "paths": paths,
+        "errors": errors[:20],
+        "tokens": collector.tokens,
+        "end_to_end": stages.pop("turn", None),
+        "stages": stages,
+    }
+
+
+def compare(report: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """기준치 대비 p95 가 threshold 배 이상 늘었거나 처리량이 1/threshold 아래로 떨어진 항목"""
+    regressions = []
+    if report["throughput_rps"] < baseline["throughput_rps"] / threshold:
+        regressions.append(f"throughput: {baseline['throughput_rps']} → {report['throughput_rps']} rps")
+    current = {"end_to_end": report["end_to_end"], **report["stages"]}
+    previous = {"end_to_end": baseline["end_to_end"], **baseline["stages"]}
+    for name, stats in current.items():
+        base = previous.get(name)
+        if stats and base and stats["p95_ms"] > base["p95_ms"] * threshold and stats["p95_ms"] - base["p95_ms"] > 1.0:
+            regressions.append(f"{name} p95: {base['p95_ms']}ms → {stats['p95_ms']}ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 LLM/네이버로 부하 테스트")
+    parser.add_argument("--queries", default=QUERY_FILE, help="질문 파일 (한 줄에 하나)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3, help="질문 모음을 몇 번 반복할지")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="에이전트 LLM 호출당 지연(초)")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="출력 토큰당 지연(초)")
+    parser.add_argument("--summary-latency", type=float, default=0.5, help="요약 GPT 호출 지연(초)")
+    parser.add_argument("--naver-latency", type=float, default=0.2, help="네이버 API 지연(초)")
+    parser.add_argument("--no-warmup", action="store_true")
+    parser.add_argument("--warm-cache", action="store_true", help="워밍업 때 채운 캐시를 유지")
+    parser.add_argument("--semantic-cache", action="store_true", help="의미 기반 응답 캐시 사용")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=1.2, help="허용 배수 (기본 1.2)")
+    args = parser.parse_args()
+
+    # 벤치마크 스팬이 운영 메트릭(metrics/)에 섞이지 않도록
+    tracing.remove_exporter(tracing.export_to_monitor)
+    install_fake_services(args.llm_latency, args.token_latency, args.summary_latency, args.naver_latency)
+    # AgentExecutor 의 verbose 출력이 JSON 과 섞이지 않도록
+    from agents.agent_executor import get_agent_executor
+    get_agent_executor().verbose = False
+
+    report = run_load_test(load_queries(args.queries), args.concurrency, args.repeat,
+                           warmup=not args.no_warmup, warm_cache=args.warm_cache,
+                           semantic_cache=args.semantic_cache)
+    report["config"] = {k: v for k, v in vars(args).items() if k not in ("output", "baseline")}
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print("⚠️ 성능 회귀:\n" + "\n".join(regressions), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
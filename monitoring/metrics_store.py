@@ -0,0 +1,241 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from monitoring.performance_monitor import METRICS_DIR, StreamingHistogram, list_segments
+
+# 해상도(초) → 보관 기간(초). None 이면 계속 보관
+RESOLUTIONS = {
+    "1m": (60, 2 * 24 * 3600),
+    "1h": (3600, 60 * 24 * 3600),
+    "1d": (86400, None),
+}
+CHECKPOINT_NAME = "rollups.json"
+RECENT_ERRORS = 200
+
+# 대시보드 시간 범위 → (조회 기간(초), 사용할 해상도)
+TIME_RANGES = {
+    "최근 1시간": (3600, "1m"),
+    "최근 24시간": (24 * 3600, "1h"),
+    "최근 7일": (7 * 24 * 3600, "1h"),
+    "전체": (None, "1d"),
+}
+
+
+# ✅ 세그먼트 tail 리더 (파일별 오프셋 이후에 새로 붙은 줄만 읽음)
+class SegmentTailReader:
+    """segment-*.jsonl 을 처음부터 다시 읽지 않고, 마지막으로 읽은 위치 이후의 완성된 줄만 돌려줍니다."""
+
+    def __init__(self, directory: str = METRICS_DIR, offsets: Optional[Dict[str, int]] = None):
+        self.directory = directory
+        self.offsets: Dict[str, int] = dict(offsets or {})
+
+    def read_new(self) -> Iterator[Dict]:
+        segments = list_segments(self.directory)
+        names = {os.path.basename(p) for p in segments}
+        # 지워진 세그먼트의 오프셋은 버림
+        self.offsets = {name: pos for name, pos in self.offsets.items() if name in names}
+
+        for path in segments:
+            name = os.path.basename(path)
+            offset = self.offsets.get(name, 0)
+            if os.path.getsize(path) <= offset:
+                continue
+            with open(path, "rb") as f:
+                f.seek(offset)
+                chunk = f.read()
+            # 쓰는 중인 마지막 줄(개행 없음)은 다음 번에 읽음
+            end = chunk.rfind(b"\n") + 1
+            self.offsets[name] = offset + end
+            for line in chunk[:end].splitlines():
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _local_offset() -> int:
+    """일 단위 버킷을 현지 자정 기준으로 자르기 위한 UTC 오프셋(초)"""
+    return int(time.localtime().tm_gmtoff)
+
+
+def metric_key(sample: Dict) -> str:
+    """스팬은 단계별로, LLM 토큰/비용은 용도별로 나눠 집계 (spans:llm, llm_prompt_tokens:agent ...)"""
+    if sample["type"] == "spans":
+        return f"spans:{(sample.get('metadata') or {}).get('name', '?')}"
+    if sample["type"].startswith("llm_"):
+        return f"{sample['type']}:{(sample.get('metadata') or {}).get('purpose', '?')}"
+    return sample["type"]
+
+
+class _Bucket:
+    __slots__ = ("count", "hist")
+
+    def __init__(self):
+        self.count = 0
+        self.hist = StreamingHistogram()
+
+
+# ✅ 1분/1시간/1일 단위로 미리 집계해 두는 저장소
+class MetricsRollup:
+    """샘플이 들어올 때 해상도별 버킷(개수, 합, 최소/최대, 히스토그램)을 갱신합니다.
+
+    대시보드는 원본 샘플 대신 이 버킷만 읽으므로, 조회 비용이 이력 길이가 아니라 버킷 수에 비례합니다.
+    """
+
+    def __init__(self, directory: str = METRICS_DIR, checkpoint: bool = True):
+        self.directory = directory
+        self.checkpoint_path = os.path.join(directory, CHECKPOINT_NAME) if checkpoint else None
+        self.buckets: Dict[Tuple[str, str, int], _Bucket] = {}
+        self.errors: deque = deque(maxlen=RECENT_ERRORS)
+        self.reader = SegmentTailReader(directory)
+        self._lock = threading.Lock()
+        self._load_checkpoint()
+
+    # ---------- 집계 ----------
+    def add(self, sample: Dict):
+        key = metric_key(sample)
+        ts = float(sample["ts"])
+        value = sample.get("value")
+        numeric = isinstance(value, (int, float)) and not isinstance(value, bool)
+        offset = _local_offset()
+        for resolution, (seconds, _) in RESOLUTIONS.items():
+            start = int((ts + offset) // seconds * seconds - offset)
+            bucket = self.buckets.get((key, resolution, start))
+            if bucket is None:
+                bucket = self.buckets[(key, resolution, start)] = _Bucket()
+            bucket.count += 1
+            if numeric:
+                bucket.hist.record(value)
+        if sample["type"] == "errors":
+            self.errors.append(sample)
+
+    def poll(self) -> int:
+        """세그먼트에 새로 붙은 샘플만 반영. 반영한 샘플 수를 돌려줍니다."""
+        with self._lock:
+            n = 0
+            for sample in self.reader.read_new():
+                self.add(sample)
+                n += 1
+            if n:
+                self._prune()
+                self._save_checkpoint()
+            return n
+
+    def _prune(self, now: Optional[float] = None):
+        now = now or time.time()
+        for key in [k for k in self.buckets if RESOLUTIONS[k[1]][1] is not None]:
+            if key[2] < now - RESOLUTIONS[key[1]][1]:
+                del self.buckets[key]
+
+    # ---------- 체크포인트 (재시작 시 전체 이력을 다시 읽지 않도록) ----------
+    def _load_checkpoint(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.reader.offsets = data["offsets"]
+        for key, resolution, start, count, hist in data["buckets"]:
+            bucket = _Bucket()
+            bucket.count = count
+            bucket.hist = StreamingHistogram.from_dict(hist)
+            self.buckets[(key, resolution, start)] = bucket
+        self.errors.extend(data.get("errors", []))
+
+    def _save_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        data = {
+            "offsets": self.reader.offsets,
+            "buckets": [[k, r, s, b.count, b.hist.to_dict()] for (k, r, s), b in self.buckets.items()],
+            "errors": list(self.errors),
+        }
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    # ---------- 조회 ----------
+    def frame(self, resolution: str, since: Optional[float] = None) -> pd.DataFrame:
+        """해상도 하나의 버킷 테이블 (metric, bucket, count, mean, min, max, p50, p95, p99)"""
+        with self._lock:
+            rows = [
+                (key, start, b.count, b.hist)
+                for (key, res, start), b in self.buckets.items()
+                if res == resolution
+            ]
+        df = pd.DataFrame({
+            "metric": pd.Categorical([r[0] for r in rows]),
+            "bucket": pd.Series([r[1] for r in rows], dtype="int64"),
+            "count": pd.Series([r[2] for r in rows], dtype="int64"),
+            "mean": pd.Series([r[3].mean for r in rows], dtype="float64"),
+            "min": pd.Series([r[3].min if r[3].count else float("nan") for r in rows], dtype="float64"),
+            "max": pd.Series([r[3].max if r[3].count else float("nan") for r in rows], dtype="float64"),
+            "p50": pd.Series([r[3].percentile(50) for r in rows], dtype="float64"),
+            "p95": pd.Series([r[3].percentile(95) for r in rows], dtype="float64"),
+            "p99": pd.Series([r[3].percentile(99) for r in rows], dtype="float64"),
+        })
+        if since is not None:
+            df = df[df["bucket"] >= since - RESOLUTIONS[resolution][0]]
+        df = df.sort_values("bucket", kind="stable").reset_index(drop=True)
+        df["timestamp"] = pd.to_datetime(df["bucket"] + _local_offset(), unit="s")
+        return df
+
+    def window(self, time_range: str, now: Optional[float] = None) -> pd.DataFrame:
+        """대시보드 시간 범위 하나에 해당하는 버킷만"""
+        seconds, resolution = TIME_RANGES[time_range]
+        since = None if seconds is None else (now or time.time()) - seconds
+        return self.frame(resolution, since)
+
+    def summary(self, time_range: str, now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """구간 전체 통계 (버킷 히스토그램을 합쳐서 계산)"""
+        seconds, resolution = TIME_RANGES[time_range]
+        since = None if seconds is None else (now or time.time()) - seconds - RESOLUTIONS[resolution][0]
+        merged: Dict[str, StreamingHistogram] = {}
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for (key, res, start), b in self.buckets.items():
+                if res != resolution or (since is not None and start < since):
+                    continue
+                merged.setdefault(key, StreamingHistogram()).merge(b.hist)
+                counts[key] = counts.get(key, 0) + b.count
+        result = {}
+        for key, hist in merged.items():
+            result[key] = hist.summary()
+            result[key]["count"] = counts[key]
+        return result
+
+    def llm_usage(self, time_range: str, now: Optional[float] = None) -> pd.DataFrame:
+        """용도(agent, summary ...)별 LLM 호출 수, 토큰, 추정 비용, 지연"""
+        return llm_usage_table(self.summary(time_range, now))
+
+    def recent_errors(self, since: Optional[float] = None) -> List[Dict]:
+        with self._lock:
+            return [e for e in self.errors if since is None or e["ts"] >= since]
+
+
+def llm_usage_table(summary: Dict[str, Dict[str, float]]) -> pd.DataFrame:
+    """summary() 결과의 llm_* 지표 → 용도별 한 줄 (합계는 평균 × 개수)"""
+    purposes = sorted({k.split(":", 1)[1] for k in summary if k.startswith("llm_prompt_tokens:")})
+    rows = []
+    for purpose in purposes:
+        prompt = summary.get(f"llm_prompt_tokens:{purpose}", {})
+        completion = summary.get(f"llm_completion_tokens:{purpose}", {})
+        cost = summary.get(f"llm_cost_usd:{purpose}", {})
+        latency = summary.get(f"llm_latency:{purpose}", {})
+        calls = int(prompt.get("count", 0))
+        rows.append({
+            "purpose": purpose,
+            "calls": calls,
+            "prompt_tokens": round(prompt.get("mean", 0.0) * calls),
+            "completion_tokens": round(completion.get("mean", 0.0) * completion.get("count", 0)),
+            "prompt_tokens_p95": prompt.get("p95", 0.0),
+            "cost_usd": cost.get("mean", 0.0) * cost.get("count", 0),
+            "latency_p95_s": latency.get("p95", 0.0),
+        })
+    columns = ["purpose", "calls", "prompt_tokens", "completion_tokens", "prompt_tokens_p95", "cost_usd",
+               "latency_p95_s"]
+    return pd.DataFrame(rows, columns=columns).set_index("purpose")
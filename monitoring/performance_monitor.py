@@ -1,42 +1,237 @@
-import time
-import logging
-import psutil
+import atexit
+import glob
 import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
 from datetime import datetime
 from functools import wraps
-from typing import Dict, List, Any
-
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('performance.log'),
-        logging.StreamHandler()
-    ]
-)
+from typing import Any, Dict, List, Optional
+
+import psutil
 
 logger = logging.getLogger(__name__)
 
-class PerformanceMonitor:
-    def __init__(self):
-        self.metrics: Dict[str, List[Dict[str, Any]]] = {
-            "response_times": [],
-            "memory_usage": [],
-            "cpu_usage": [],
-            "errors": []
+METRICS_DIR = os.getenv("METRICS_DIR", "metrics")
+RECENT_SAMPLES = 2000            # 지표별로 메모리에 남길 최근 샘플 수
+FLUSH_INTERVAL = 2.0             # 백그라운드 flush 주기(초)
+SEGMENT_MAX_BYTES = 8 * 1024 * 1024
+METRIC_TYPES = ("response_times", "memory_usage", "cpu_usage", "errors")
+
+
+# ✅ 스트리밍 히스토그램 (HDR 방식의 로그-선형 버킷, 상대오차 ~1%)
+class StreamingHistogram:
+    """값을 버킷 개수만 세어 두고 p50/p95/p99 를 근사합니다. 메모리는 값의 범위에만 비례합니다."""
+
+    _POSITIVE = 1 << 20
+
+    def __init__(self, precision: int = 64):
+        self.precision = precision
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _key(self, value: float) -> int:
+        if value == 0:
+            return 0
+        mantissa, exponent = math.frexp(abs(value))
+        idx = exponent * self.precision + int((mantissa - 0.5) * 2 * self.precision)
+        # 음수는 절댓값이 클수록 작은 키가 되도록 뒤집음
+        return idx + self._POSITIVE if value > 0 else -(idx + self._POSITIVE)
+
+    def _value(self, key: int) -> float:
+        if key == 0:
+            return 0.0
+        idx = abs(key) - self._POSITIVE
+        exponent, sub = divmod(idx, self.precision)
+        # 버킷 중앙값
+        mid = math.ldexp(0.5 + (sub + 0.5) / (2 * self.precision), exponent)
+        return mid if key > 0 else -mid
+
+    def record(self, value: float):
+        key = self._key(value)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "StreamingHistogram"):
+        for key, n in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + n
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen >= rank:
+                # 근사값이 실제 범위를 벗어나지 않도록 min/max 로 자름
+                return min(max(self._value(key), self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"precision": self.precision, "counts": self.counts, "total": self.total,
+                "min": self.min if self.count else None, "max": self.max if self.count else None}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StreamingHistogram":
+        hist = cls(data["precision"])
+        hist.counts = {int(k): n for k, n in data["counts"].items()}
+        hist.count = sum(hist.counts.values())
+        hist.total = data["total"]
+        if hist.count:
+            hist.min, hist.max = data["min"], data["max"]
+        return hist
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
         }
 
+
+# ✅ append-only 세그먼트 파일 (JSONL, 크기 넘으면 새 파일)
+class SegmentWriter:
+    """샘플을 metrics/segment-*.jsonl 뒤에 이어 쓰기만 합니다. 기존 내용은 다시 쓰지 않습니다."""
+
+    def __init__(self, directory: str = METRICS_DIR, max_bytes: int = SEGMENT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._path: Optional[str] = None
+
+    def _segment(self) -> str:
+        if self._path is None or not os.path.exists(self._path) or os.path.getsize(self._path) >= self.max_bytes:
+            os.makedirs(self.directory, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+            # 여러 워커 프로세스가 같은 디렉터리에 써도 파일이 겹치지 않도록 pid 포함
+            self._path = os.path.join(self.directory, f"segment-{stamp}-{os.getpid()}.jsonl")
+        return self._path
+
+    def write(self, samples: List[tuple]):
+        if not samples:
+            return
+        lines = [
+            json.dumps({"type": t, "ts": ts, "value": v, "metadata": meta}, ensure_ascii=False, default=str)
+            for t, ts, v, meta in samples
+        ]
+        with open(self._segment(), "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def list_segments(directory: str = METRICS_DIR) -> List[str]:
+    """시간순 세그먼트 파일 목록"""
+    return sorted(glob.glob(os.path.join(directory, "segment-*.jsonl")))
+
+
+class PerformanceMonitor:
+    """기록은 링 버퍼 + 히스토그램에 O(1)로 하고, 파일 쓰기는 백그라운드 스레드가 모아서 합니다."""
+
+    def __init__(self, metrics_dir: Optional[str] = METRICS_DIR, recent_samples: int = RECENT_SAMPLES,
+                 flush_interval: float = FLUSH_INTERVAL):
+        self.recent_samples = recent_samples
+        self.flush_interval = flush_interval
+        self._recent: Dict[str, deque] = {t: deque(maxlen=recent_samples) for t in METRIC_TYPES}
+        self._histograms: Dict[str, StreamingHistogram] = {t: StreamingHistogram() for t in METRIC_TYPES}
+        self._counts: Dict[str, int] = {t: 0 for t in METRIC_TYPES}
+        self._pending: deque = deque()
+        self._lock = threading.Lock()
+        self._writer = SegmentWriter(metrics_dir) if metrics_dir else None
+        self._wakeup = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._process = psutil.Process()
+
+    # ---------- 기록 (요청 스레드) ----------
     def log_metric(self, metric_type: str, value: Any, metadata: Dict = None):
-        """메트릭 로깅"""
-        timestamp = datetime.now().isoformat()
-        metric_data = {
-            "timestamp": timestamp,
-            "value": value,
-            "metadata": metadata or {}
+        """메트릭 기록 (파일 I/O 없음)"""
+        sample = (metric_type, time.time(), value, metadata or {})
+        recent = self._recent.get(metric_type)
+        if recent is None:
+            with self._lock:
+                recent = self._recent.setdefault(metric_type, deque(maxlen=self.recent_samples))
+                self._histograms.setdefault(metric_type, StreamingHistogram())
+                self._counts.setdefault(metric_type, 0)
+        recent.append(sample)
+        with self._lock:
+            self._counts[metric_type] += 1
+            if isinstance(value, (int, float)):
+                self._histograms[metric_type].record(value)
+        if self._writer is not None:
+            self._pending.append(sample)
+            if self._flusher is None:
+                self._start_flusher()
+        logger.debug("%s: %s", metric_type, value)
+
+    # ---------- 백그라운드 flush ----------
+    def _start_flusher(self):
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+            self._flusher.start()
+            atexit.register(self.flush)
+
+    def _flush_loop(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("메트릭 flush 실패")
+
+    def flush(self):
+        """쌓인 샘플을 세그먼트 파일 뒤에 이어 씁니다."""
+        if self._writer is None:
+            return
+        batch = []
+        while True:
+            try:
+                batch.append(self._pending.popleft())
+            except IndexError:
+                break
+        self._writer.write(batch)
+
+    # ---------- 조회 ----------
+    @property
+    def metrics(self) -> Dict[str, List[Dict[str, Any]]]:
+        """최근 샘플 (이전 dict 리스트 형식)"""
+        return {
+            metric_type: [
+                {"timestamp": datetime.fromtimestamp(ts).isoformat(), "value": value, "metadata": meta}
+                for _, ts, value, meta in list(samples)
+            ]
+            for metric_type, samples in self._recent.items()
         }
-        self.metrics[metric_type].append(metric_data)
-        logger.info(f"{metric_type}: {value}")
+
+    def histogram(self, metric_type: str) -> StreamingHistogram:
+        return self._histograms.get(metric_type, StreamingHistogram())
+
+    def percentiles(self, metric_type: str) -> Dict[str, float]:
+        with self._lock:
+            return self.histogram(metric_type).summary()
 
     def get_system_metrics(self) -> Dict[str, float]:
         """시스템 메트릭 수집"""
@@ -50,20 +245,19 @@ class PerformanceMonitor:
         """함수 성능 모니터링 데코레이터"""
         @wraps(func)
         def wrapper(*args, **kwargs):
-            start_time = time.time()
-            start_memory = psutil.Process().memory_info().rss
+            start_time = time.perf_counter()
+            start_memory = self._process.memory_info().rss
 
             try:
                 result = func(*args, **kwargs)
-                execution_time = time.time() - start_time
-                end_memory = psutil.Process().memory_info().rss
-                memory_used = end_memory - start_memory
+                execution_time = time.perf_counter() - start_time
+                memory_used = self._process.memory_info().rss - start_memory
 
-                # 성능 메트릭 로깅
+                # 성능 메트릭 기록 (인자 문자열은 길어질 수 있어 앞부분만)
                 self.log_metric("response_times", execution_time, {
                     "function": func.__name__,
-                    "args": str(args),
-                    "kwargs": str(kwargs)
+                    "args": str(args)[:200],
+                    "kwargs": str(kwargs)[:200]
                 })
                 self.log_metric("memory_usage", memory_used, {
                     "function": func.__name__
@@ -81,35 +275,30 @@ class PerformanceMonitor:
         return wrapper
 
     def save_metrics(self, filepath: str = "performance_metrics.json"):
-        """메트릭 저장"""
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(self.metrics, f, ensure_ascii=False, indent=2)
+        """최근 샘플 스냅샷 저장 (링 버퍼 크기만큼만 쓰므로 전체 이력과 무관)"""
+        self.flush()
+        tmp_path = filepath + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.metrics, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, filepath)
 
     def analyze_performance(self) -> Dict[str, Any]:
-        """성능 분석"""
-        analysis = {
-            "average_response_time": 0,
-            "max_memory_usage": 0,
-            "error_rate": 0,
-            "total_requests": 0
-        }
+        """성능 분석 (프로세스 시작 이후 전체, 히스토그램 기반)"""
+        with self._lock:
+            response = self.histogram("response_times").summary()
+            memory = self.histogram("memory_usage").summary()
+            total_requests = self._counts.get("response_times", 0)
+            total_errors = self._counts.get("errors", 0)
 
-        if self.metrics["response_times"]:
-            analysis["average_response_time"] = sum(
-                m["value"] for m in self.metrics["response_times"]
-            ) / len(self.metrics["response_times"])
-
-        if self.metrics["memory_usage"]:
-            analysis["max_memory_usage"] = max(
-                m["value"] for m in self.metrics["memory_usage"]
-            )
-
-        total_requests = len(self.metrics["response_times"])
-        total_errors = len(self.metrics["errors"])
-        analysis["total_requests"] = total_requests
-        analysis["error_rate"] = total_errors / total_requests if total_requests > 0 else 0
-
-        return analysis
+        return {
+            "average_response_time": response["mean"],
+            "p50_response_time": response["p50"],
+            "p95_response_time": response["p95"],
+            "p99_response_time": response["p99"],
+            "max_memory_usage": memory["max"],
+            "error_rate": total_errors / total_requests if total_requests > 0 else 0,
+            "total_requests": total_requests
+        }
 
 # 싱글톤 인스턴스
 performance_monitor = PerformanceMonitor()
@@ -122,6 +311,15 @@ def example_function():
     return "완료"
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('performance.log'),
+            logging.StreamHandler()
+        ]
+    )
+
     # 테스트 실행
     for _ in range(5):
         example_function()
@@ -134,6 +332,7 @@ if __name__ == "__main__":
     analysis = performance_monitor.analyze_performance()
     print("\n성능 분석 결과:")
     print(f"평균 응답 시간: {analysis['average_response_time']:.2f}초")
+    print(f"p95 응답 시간: {analysis['p95_response_time']:.2f}초")
     print(f"최대 메모리 사용량: {analysis['max_memory_usage'] / 1024 / 1024:.2f}MB")
     print(f"에러율: {analysis['error_rate'] * 100:.2f}%")
-    print(f"총 요청 수: {analysis['total_requests']}") 
\ No newline at end of file
+    print(f"총 요청 수: {analysis['total_requests']}")
@@ -0,0 +1,80 @@
+"""도구 결과 표기별 프롬프트 토큰 비교
+
+질문마다 filter_coupon_data 가 돌려줄 결과(최대 30행)를
+    json  : 이전처럼 dict 목록 (LangChain 이 json.dumps 로 scratchpad 에 넣는 형태)
+    compact : tools/compact_output.py 의 지역별 압축 표기
+로 만들어 토큰 수를 세고, 질문별/전체 절감량을 JSON 으로 출력합니다.
+도구 결과는 이후 에이전트 LLM 호출마다 다시 읽히므로 절감량은 호출 단계 하나당 입력 토큰 감소분입니다.
+
+    python monitoring/tool_output_tokens.py
+    python monitoring/tool_output_tokens.py --queries my_questions.txt --output tokens.json
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agents.conversation_memory import count_tokens  # noqa: E402
+from tools.compact_output import encode_coupon_rows  # noqa: E402
+from tools.coupon_store import get_coupon_store  # noqa: E402
+from tools.filter_tool import parse_conditions  # noqa: E402
+
+QUERIES_PATH = os.path.join(ROOT, "monitoring", "load_test_queries.txt")
+MAX_ROWS = 30
+
+
+def load_queries(path: str = QUERIES_PATH) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def measure_query(query: str) -> Dict:
+    rows = get_coupon_store().filter(parse_conditions(query), with_ids=True)[:MAX_ROWS]
+    legacy = json.dumps([{k: v for k, v in r.items() if k != "id"} for r in rows], ensure_ascii=False)
+    json_tokens = count_tokens(legacy)
+    compact_tokens = count_tokens(encode_coupon_rows(rows))
+    return {
+        "query": query,
+        "rows": len(rows),
+        "json_tokens": json_tokens,
+        "compact_tokens": compact_tokens,
+        "saved_tokens": json_tokens - compact_tokens,
+        "saved_pct": round(100 * (json_tokens - compact_tokens) / json_tokens, 1) if json_tokens else 0.0,
+    }
+
+
+def run_report(queries: List[str]) -> Dict:
+    # 결과가 없는 질문은 두 표기 모두 몇 토큰이라 비교에서 제외
+    per_query = [m for m in (measure_query(q) for q in queries) if m["rows"]]
+    total_json = sum(m["json_tokens"] for m in per_query)
+    total_compact = sum(m["compact_tokens"] for m in per_query)
+    return {
+        "queries": len(queries),
+        "with_results": len(per_query),
+        "json_tokens": total_json,
+        "compact_tokens": total_compact,
+        "saved_tokens_per_query": round((total_json - total_compact) / len(per_query), 1) if per_query else 0.0,
+        "saved_pct": round(100 * (total_json - total_compact) / total_json, 1) if total_json else 0.0,
+        "per_query": per_query,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="도구 결과 JSON vs 압축 표기 토큰 비교")
+    parser.add_argument("--queries", default=QUERIES_PATH, help="질문 파일 (한 줄에 하나)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    report = run_report(load_queries(args.queries))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
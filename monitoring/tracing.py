@@ -0,0 +1,157 @@
+import contextvars
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+RECENT_SPANS = 5000
+
+
+# ✅ 스팬: 한 단계(분류, 필터, LLM 호출, 외부 검색 등)의 시작~끝
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start", "end", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, **attributes):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.attributes: Dict[str, Any] = attributes
+        self.error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        """소요 시간 (초)"""
+        return ((self.end or time.perf_counter()) - self.start)
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+_recent: deque = deque(maxlen=RECENT_SPANS)
+_exporters: List[Callable[[Span], None]] = []
+_exporters_lock = threading.Lock()
+
+
+def export_to_monitor(span: Span):
+    """끝난 스팬을 PerformanceMonitor 세그먼트로 보냄 (값은 초 단위 소요 시간)"""
+    from monitoring.performance_monitor import performance_monitor
+
+    performance_monitor.log_metric("spans", span.duration, span.to_dict())
+
+
+def add_exporter(exporter: Callable[[Span], None]):
+    with _exporters_lock:
+        _exporters.append(exporter)
+
+
+def remove_exporter(exporter: Callable[[Span], None]):
+    with _exporters_lock:
+        if exporter in _exporters:
+            _exporters.remove(exporter)
+
+
+add_exporter(export_to_monitor)
+
+
+def finish_span(span: Span):
+    """스팬을 닫고 내보냅니다."""
+    span.end = time.perf_counter()
+    _recent.append(span)
+    for exporter in list(_exporters):
+        try:
+            exporter(span)
+        except Exception:
+            logger.exception("스팬 내보내기 실패: %s", span.name)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def set_current_span(span: Optional[Span]):
+    """콜백처럼 with 블록으로 감쌀 수 없는 곳에서 현재 스팬을 바꿀 때 사용"""
+    _current_span.set(span)
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace_id if span else None
+
+
+def start_span(name: str, parent: Optional[Span] = None, **attributes) -> Span:
+    """부모(없으면 현재 스팬)에 연결된 스팬을 엽니다. 부모가 없으면 새 trace 를 시작합니다."""
+    parent = parent or _current_span.get()
+    if parent is None:
+        return Span(name, uuid.uuid4().hex, **attributes)
+    return Span(name, parent.trace_id, parent.span_id, **attributes)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """with span("parse_conditions"): ... — 블록 안에서 열린 스팬은 이 스팬의 자식이 됩니다."""
+    s = start_span(name, **attributes)
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        finish_span(s)
+
+
+@contextmanager
+def start_trace(name: str = "turn", **attributes):
+    """한 턴의 루트 스팬. 바깥 스팬과 무관하게 새 trace ID 를 만듭니다."""
+    s = Span(name, uuid.uuid4().hex, **attributes)
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        finish_span(s)
+
+
+def traced(name: Optional[str] = None):
+    """함수 전체를 스팬으로 감싸는 데코레이터"""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_trace(trace_id: str) -> List[Dict[str, Any]]:
+    """최근 스팬 중 trace 하나에 속한 것 (시작 순)"""
+    spans = [s for s in list(_recent) if s.trace_id == trace_id]
+    return [s.to_dict() for s in sorted(spans, key=lambda s: s.start)]
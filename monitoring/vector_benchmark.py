@@ -0,0 +1,183 @@
+"""벡터 인덱스 종류별 정확도/지연/메모리 비교
+
+정확 검색(flat)의 top-k 를 정답으로 두고 sq8 / hnsw / ivfpq 의 recall@k, 질의당 검색 지연,
+인덱스 크기, 인덱스를 연 프로세스의 RSS 증가량을 JSON 으로 출력합니다.
+
+    python monitoring/vector_benchmark.py                       # data/faiss_coupon_db 의 벡터 사용
+    python monitoring/vector_benchmark.py --synthetic 50000     # 모델 없이 합성 벡터로 규모 확인
+    python monitoring/vector_benchmark.py --encoders torch,onnx # 질의 인코더 지연/일치도 비교
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tools.vector_index_builder import make_index, stored_vectors  # noqa: E402
+from tools.vector_search_tool import (INDEX_TYPES, VECTOR_DB_PATH, configure_index,  # noqa: E402
+                                      index_filename)
+
+QUERIES_PATH = os.path.join(ROOT, "monitoring", "load_test_queries.txt")
+
+_RSS_PROBE = (
+    "import faiss, psutil, sys\n"
+    "p = psutil.Process()\n"
+    "before = p.memory_info().rss\n"
+    "index = faiss.read_index(sys.argv[1])\n"
+    "print(p.memory_info().rss - before)\n"
+)
+
+
+def synthetic_vectors(n: int, dim: int, n_queries: int, seed: int = 0):
+    """군집 구조가 있는 정규화 벡터와, 그 근처의 질의 벡터"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, n // 50), dim)).astype("float32")
+    vectors = centers[rng.integers(0, len(centers), n)] + 0.5 * rng.standard_normal((n, dim)).astype("float32")
+    queries = vectors[rng.integers(0, n, n_queries)] + 0.3 * rng.standard_normal((n_queries, dim)).astype("float32")
+    for x in (vectors, queries):
+        x /= np.linalg.norm(x, axis=1, keepdims=True)
+    return vectors, np.arange(n, dtype="int64"), queries
+
+
+def load_db_vectors(db_path: str, queries: List[str], embed_fn=None):
+    """빌드된 flat 인덱스의 벡터와, 질의 문장 임베딩"""
+    import faiss
+
+    if embed_fn is None:
+        from tools.embedding_model import embed_texts as embed_fn
+
+    vectors, ids = stored_vectors(faiss.read_index(os.path.join(db_path, index_filename("flat"))))
+    return vectors, ids, embed_fn(queries)
+
+
+def load_queries(path: str = QUERIES_PATH) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def measure_rss(path: str) -> int:
+    """새 프로세스에서 인덱스를 열었을 때 늘어난 RSS(바이트)"""
+    out = subprocess.run([sys.executable, "-c", _RSS_PROBE, path],
+                         capture_output=True, text=True, check=True).stdout
+    return int(out.strip().splitlines()[-1])
+
+
+def benchmark_index(index_type: str, vectors: np.ndarray, ids: np.ndarray, queries: np.ndarray,
+                    truth: np.ndarray, k: int, workdir: str) -> Dict:
+    import faiss
+
+    start = time.perf_counter()
+    index = configure_index(make_index(index_type, vectors, ids))
+    build_s = time.perf_counter() - start
+
+    latencies = []
+    found = np.empty((len(queries), k), dtype="int64")
+    for row, q in enumerate(queries):
+        start = time.perf_counter()
+        _, found[row] = index.search(q[None, :], k)
+        latencies.append(time.perf_counter() - start)
+    recall = np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)])
+
+    path = os.path.join(workdir, index_filename(index_type))
+    faiss.write_index(index, path)
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        f"recall@{k}": round(float(recall), 4),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies_ms, 95)), 3),
+        "build_s": round(build_s, 3),
+        "index_mb": round(os.path.getsize(path) / 2**20, 2),
+        "rss_mb": round(measure_rss(path) / 2**20, 2),
+    }
+
+
+def benchmark_encoders(backends: List[str], queries: List[str]) -> Dict[str, Dict]:
+    """질의 인코더 백엔드별 지연(질의 1개씩)과 첫 번째 백엔드 대비 코사인 유사도"""
+    from tools.embedding_model import load_encoder
+
+    report, reference = {}, None
+    for backend in backends:
+        model = load_encoder(backend)
+        latencies, outputs = [], []
+        for q in queries:
+            start = time.perf_counter()
+            outputs.append(model.encode([q], normalize_embeddings=True)[0])
+            latencies.append((time.perf_counter() - start) * 1000)
+        outputs = np.asarray(outputs, dtype="float32")
+        result = {
+            "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        }
+        if reference is None:
+            reference = outputs
+        else:
+            result["mean_cosine_vs_" + backends[0]] = round(float((outputs * reference).sum(axis=1).mean()), 4)
+        report[backend] = result
+    return report
+
+
+def run_benchmark(vectors: np.ndarray, ids: np.ndarray, queries: np.ndarray, k: int = 5,
+                  index_types: Optional[List[str]] = None) -> Dict[str, Dict]:
+    import faiss
+
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    queries = np.ascontiguousarray(queries, dtype="float32")
+    k = min(k, len(vectors))
+    exact = faiss.IndexIDMap2(faiss.IndexFlatIP(vectors.shape[1]))
+    exact.add_with_ids(vectors, ids)
+    _, truth = exact.search(queries, k)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        return {
+            index_type: benchmark_index(index_type, vectors, ids, queries, truth, k, workdir)
+            for index_type in (index_types or INDEX_TYPES)
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벡터 인덱스 종류별 recall/지연/메모리 비교")
+    parser.add_argument("--db", default=VECTOR_DB_PATH)
+    parser.add_argument("--synthetic", type=int, default=0, help="합성 벡터 개수 (0이면 --db 사용)")
+    parser.add_argument("--dim", type=int, default=1024, help="합성 벡터 차원")
+    parser.add_argument("--queries", type=int, default=200, help="합성 질의 개수")
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--index-types", default=",".join(INDEX_TYPES))
+    parser.add_argument("--encoders", default="", help="비교할 질의 인코더 백엔드 (예: torch,onnx)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    index_types = [t.strip() for t in args.index_types.split(",") if t.strip()]
+    if args.synthetic:
+        vectors, ids, queries = synthetic_vectors(args.synthetic, args.dim, args.queries)
+        source = f"synthetic:{args.synthetic}x{args.dim}"
+    else:
+        vectors, ids, queries = load_db_vectors(args.db, load_queries())
+        source = args.db
+
+    report = {
+        "source": source,
+        "count": int(len(vectors)),
+        "dim": int(vectors.shape[1]),
+        "k": args.k,
+        "indexes": run_benchmark(vectors, ids, queries, args.k, index_types),
+    }
+    if args.encoders:
+        backends = [b.strip() for b in args.encoders.split(",") if b.strip()]
+        report["encoders"] = benchmark_encoders(backends, load_queries())
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
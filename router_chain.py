@@ -1,20 +1,23 @@
-# test_router_chain.py
-from agents.router_chain import router_chain  # 방금 만든 router_chain
+# 터미널에서 라우터를 직접 시험해 보는 REPL (python router_chain.py)
+from agents.conversation_memory import TokenBudgetMemory
+from agents.router_agent import route_query
 from dotenv import load_dotenv
-import os
 
 load_dotenv()
 
 def test_router():
     print("===== 하이브리드 라우팅 테스트 시작 =====")
-    
+    memory = TokenBudgetMemory()
+
     while True:
         user_input = input("💬 질문: ")
         if user_input.lower() in ["exit", "quit", "종료"]:
             break
 
-        result = router_chain.invoke({"input": user_input})
-        print("🧠 응답:", result)
+        result = route_query(user_input, memory.history())
+        memory.add_user_message(user_input)
+        memory.add_ai_message(result["output"])
+        print(f"🧠 응답 ({result['path']}):", result["output"])
         print("-" * 60)
 
 if __name__ == "__main__":
@@ -0,0 +1,15 @@
+"""pytest 공통 설정
+
+performance_monitor 는 import 할 때 METRICS_DIR 로 기록 디렉터리를 정하고, tracing 의 스팬 exporter 도
+그 모니터로 보냅니다. 테스트 중 기록한 메트릭/스팬이 대시보드가 읽는 운영 metrics/ 에 섞이지 않도록
+어떤 모듈보다 먼저 임시 디렉터리로 바꾸고, 끝나면 지웁니다.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+TEST_METRICS_DIR = tempfile.mkdtemp(prefix="test-metrics-")
+os.environ["METRICS_DIR"] = TEST_METRICS_DIR
+# atexit 은 역순 실행 → performance_monitor 의 마지막 flush 뒤에 지워짐
+atexit.register(shutil.rmtree, TEST_METRICS_DIR, True)
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from aiohttp.test_utils import AioHTTPTestCase
+
+from agents.conversation_memory import TokenBudgetMemory
+from api.server import create_app, serve
+from api.session_store import (MemorySessionStore, RedisSessionStore, SessionStore, SqliteSessionStore,
+                               create_session_store)
+from monitoring.fake_services import install_fake_services
+
+
+class TestApi(AioHTTPTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.fakes = install_fake_services(llm_latency=0.01, summary_latency=0.01, naver_latency=0.01)
+
+    async def get_application(self):
+        self.store = MemorySessionStore()
+        return create_app(session_store=self.store, warmup=False)
+
+    async def test_chat_keeps_session(self):
+        """세션 ID 로 대화 기록이 이어지고, 세션을 지우면 초기화"""
+        resp = await self.client.post("/chat", json={"message": "충남 모바일 상품권"})
+        self.assertEqual(resp.status, 200)
+        first = await resp.json()
+        self.assertEqual(first["path"], "fast")
+        self.assertTrue(first["trace_id"])
+
+        resp = await self.client.post("/chat", json={"message": "지역화폐 할인율 높은 곳 추천해줘",
+                                                     "session_id": first["session_id"]})
+        second = await resp.json()
+        self.assertEqual(second["path"], "agent")
+        self.assertEqual(second["session_id"], first["session_id"])
+
+        state = await self.store.load(first["session_id"])
+        self.assertEqual(len(state["messages"]), 4)
+
+        await self.client.delete(f"/sessions/{first['session_id']}")
+        self.assertIsNone(await self.store.load(first["session_id"]))
+
+    async def test_concurrent_sessions(self):
+        """여러 세션의 요청이 동시에 처리됨"""
+        responses = await asyncio.gather(*[
+            self.client.post("/chat", json={"message": "12만원 나누기 4", "session_id": f"s{i}"})
+            for i in range(6)
+        ])
+        bodies = [await r.json() for r in responses]
+        self.assertEqual({b["path"] for b in bodies}, {"calculator"})
+        self.assertIn("30,000", bodies[0]["output"])
+
+    async def test_filter(self):
+        resp = await self.client.post("/filter", json={"query": "충남 모바일 상품권"})
+        body = await resp.json()
+        self.assertEqual(body["conditions"]["지역1"], ["충남"])
+        self.assertEqual(body["count"], len(body["results"]))
+        self.assertGreater(body["count"], 0)
+
+        resp = await self.client.post("/filter", json={"conditions": {"지역1": ["충남"], "지원방식": ["모바일"]}})
+        self.assertEqual((await resp.json())["count"], body["count"])
+
+    async def test_batch_streams_jsonl(self):
+        """일괄 질의 결과가 입력 순서대로 한 줄씩 스트리밍"""
+        resp = await self.client.post("/batch", json={"queries": [
+            "충남 모바일 상품권", {"id": "a", "query": "12만원 나누기 4"}, "충남 모바일 상품권 알려줘"]})
+        self.assertEqual(resp.status, 200)
+        self.assertTrue(resp.headers["Content-Type"].startswith("application/x-ndjson"))
+        lines = [json.loads(line) for line in (await resp.text()).splitlines()]
+        self.assertEqual([r["path"] for r in lines], ["fast", "calculator", "fast"])
+        self.assertEqual(lines[1]["id"], "a")
+        self.assertEqual((await self.client.post("/batch", json={"queries": []})).status, 400)
+
+    async def test_bad_requests(self):
+        self.assertEqual((await self.client.post("/chat", json={"message": " "})).status, 400)
+        self.assertEqual((await self.client.post("/chat", data="not json")).status, 400)
+        self.assertEqual((await self.client.post("/filter", json={})).status, 400)
+        for conditions in ({"지역1": "경기"}, {"지원방식": [1]}, ["경기"]):
+            resp = await self.client.post("/filter", json={"conditions": conditions})
+            self.assertEqual(resp.status, 400)
+            self.assertIn("error", await resp.json())
+        self.assertEqual((await self.client.post("/search", json={"query": "x", "k": "many"})).status, 400)
+
+    async def test_chat_error_hides_details(self):
+        """500 응답에는 일반 문구만 (예외 내용은 로그에만)"""
+        with mock.patch("api.server.route_query", side_effect=RuntimeError("/secret/path key=sk-123")):
+            with self.assertLogs("api.server", level="ERROR"):
+                resp = await self.client.post("/chat", json={"message": "할인율 높은 곳"})
+        self.assertEqual(resp.status, 500)
+        self.assertNotIn("secret", (await resp.json())["error"])
+
+    async def test_health(self):
+        body = await (await self.client.get("/health")).json()
+        self.assertEqual(body["status"], "ok")
+
+
+class TestSessionStore(unittest.IsolatedAsyncioTestCase):
+    async def test_memory_store_ttl_and_lru(self):
+        store = MemorySessionStore(ttl=60, max_sessions=2)
+        for i in range(3):
+            await store.save(f"s{i}", {"n": i})
+        self.assertIsNone(await store.load("s0"))
+        self.assertEqual(await store.load("s2"), {"n": 2})
+
+        expired = MemorySessionStore(ttl=0)
+        await expired.save("s", {})
+        self.assertIsNone(await expired.load("s"))
+
+    async def test_sqlite_store_shared(self):
+        """같은 파일을 연 저장소끼리 세션 공유 (워커 프로세스 간 공유와 같은 방식)"""
+        with tempfile.TemporaryDirectory() as tmp:
+            url = "sqlite:///" + os.path.join(tmp, "sessions.db")
+            a, b = create_session_store(url), create_session_store(url)
+            self.assertIsInstance(a, SqliteSessionStore)
+
+            memory = TokenBudgetMemory()
+            memory.add_user_message("충남 상품권")
+            memory.add_ai_message("충남에는 ...")
+            await a.save("s", memory.to_dict())
+
+            restored = TokenBudgetMemory.from_dict(await b.load("s"))
+            self.assertEqual([m.content for m in restored.history()], ["충남 상품권", "충남에는 ..."])
+            self.assertEqual(restored.total_tokens, memory.total_tokens)
+
+            await b.delete("s")
+            self.assertIsNone(await a.load("s"))
+
+    def test_unknown_scheme(self):
+        with self.assertRaises(ValueError):
+            create_session_store("mongodb://localhost")
+
+    def test_interface_is_abstract(self):
+        with self.assertRaises(TypeError):
+            SessionStore()
+
+    def test_redis_is_optional(self):
+        """redis 패키지가 없으면 설치 방법을 알려주는 오류"""
+        with mock.patch.dict("sys.modules", {"redis": None, "redis.asyncio": None}):
+            with self.assertRaisesRegex(ImportError, "pip install"):
+                RedisSessionStore("redis://localhost:6379/0")
+
+    def test_multi_worker_needs_shared_store(self):
+        """여러 워커 + memory:// 는 세션이 워커별로 갈라지므로 시작하지 않음"""
+        with mock.patch("api.server.SESSION_STORE_URL", "memory://"), \
+                mock.patch("api.server._run_worker") as run_worker:
+            with self.assertRaises(ValueError):
+                serve(workers=2)
+        run_worker.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
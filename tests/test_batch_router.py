@@ -0,0 +1,80 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from agents import batch_router
+from agents.batch_router import batch_answer, read_items
+from tools.coupon_store import get_coupon_store
+
+
+class TestBatchRouter(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def fake_route(self, query):
+        """에이전트 대신: 호출 기록 + 동시 실행 수 측정"""
+        with self.lock:
+            self.calls.append(query)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        return {"output": f"답변: {query}", "path": "agent", "trace_id": "t"}
+
+    def test_grouped_fast_and_residual(self):
+        """조건이 같은 질문은 묶어서 한 번에, 애매한 질문만 에이전트로 (같은 문장은 한 번)"""
+        queries = ["충남 모바일 상품권", "할인율 높은 곳 추천해줘", "충남 모바일 상품권 알려줘",
+                   "경기 카드형", "할인율 높은 곳 추천해줘", {"id": "q6", "query": "강원 상품권"}]
+        store = get_coupon_store()
+        with patch.object(batch_router, "route_query", self.fake_route), \
+                patch.object(store, "filter_many", wraps=store.filter_many) as filter_many:
+            results = list(batch_answer(queries))
+
+        self.assertEqual([r["index"] for r in results], list(range(6)))
+        self.assertEqual([r["path"] for r in results], ["fast", "agent", "fast", "fast", "agent", "fast"])
+        self.assertEqual(results[5]["id"], "q6")
+        self.assertEqual(results[0]["output"], results[2]["output"])
+        self.assertEqual(results[0]["count"], len(store.filter({"지역1": ["충남"], "지원방식": ["모바일"]})))
+        # 조건 집합 3개를 filter_many 한 번으로
+        filter_many.assert_called_once()
+        self.assertEqual(len(filter_many.call_args[0][0]), 3)
+        self.assertEqual(self.calls, ["할인율 높은 곳 추천해줘"])
+
+    def test_concurrency_limit_and_chunks(self):
+        """에이전트 동시 호출 수 제한, 청크가 나뉘어도 순서 번호 유지"""
+        queries = [f"추천 {i}번 질문" for i in range(10)]
+        with patch.object(batch_router, "route_query", self.fake_route):
+            results = list(batch_answer(queries, concurrency=3, chunk_size=4))
+        self.assertEqual([r["index"] for r in results], list(range(10)))
+        self.assertEqual(len(self.calls), 10)
+        self.assertLessEqual(self.max_active, 3)
+        self.assertGreater(self.max_active, 1)
+
+    def test_errors_and_input_format(self):
+        """빈 질문/실패한 질문은 error 로 기록하고 나머지는 계속"""
+        def failing(query):
+            raise RuntimeError("LLM 오류")
+
+        lines = ["# 주석", "", '{"id": 1, "query": "추천해줘"}', '{"id": 2, "query": " "}', "충남 상품권"]
+        with patch.object(batch_router, "route_query", failing):
+            results = list(batch_answer(read_items(lines)))
+        self.assertEqual([r["path"] for r in results], ["error", "error", "fast"])
+        self.assertIn("LLM 오류", results[0]["error"])
+
+    def test_filter_many_matches_filter(self):
+        """여러 조건 일괄 필터 결과가 조건별 filter 와 같음"""
+        store = get_coupon_store()
+        conds = [{"지역1": ["충남"], "지역2": [], "지원방식": ["모바일"]},
+                 {"지역1": ["경기"], "지역2": ["수원시"], "지원방식": []},
+                 {"지역1": [], "지역2": [], "지원방식": ["카드형"]},
+                 {"지역1": ["없는곳"], "지역2": [], "지원방식": []}]
+        self.assertEqual(store.filter_many(conds), [store.filter(c) for c in conds])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from monitoring.tool_output_tokens import measure_query
+from tools.compact_output import LEGEND, REF_PATTERN, encode_coupon_rows, expand_refs
+from tools.coupon_store import get_coupon_store
+
+
+class TestCompactOutput(unittest.TestCase):
+    def setUp(self):
+        self.rows = [
+            {"id": 1, "이름": "공주페이", "지역": "충남 공주시", "지원방식": "모바일", "링크": "http://a"},
+            {"id": 2, "이름": "천안사랑카드", "지역": "충남 천안시", "지원방식": "지류형, 카드형", "링크": "http://b"},
+            {"id": 3, "이름": "온통대전", "지역": "대전 대전광역시", "지원방식": "", "링크": "http://c"},
+        ]
+
+    def test_grouped_by_region(self):
+        """지역1 별 한 줄, 지원방식은 코드, 링크는 [#번호]"""
+        text = encode_coupon_rows(self.rows)
+        self.assertEqual(text.splitlines(), [
+            LEGEND,
+            "충남: 공주시 공주페이 M [#1] | 천안시 천안사랑카드 PC [#2]",
+            "대전: 대전광역시 온통대전 - [#3]",
+        ])
+        self.assertNotIn("http", text)
+        self.assertEqual(encode_coupon_rows([]), "검색 결과가 없습니다.")
+
+    def test_token_limit(self):
+        text = encode_coupon_rows(self.rows * 20, max_tokens=60)
+        self.assertTrue(text.endswith("건은 생략했습니다."))
+
+    def test_expand_refs(self):
+        """최종 답변의 [#번호] 만 실제 링크로 (범례/모르는 번호는 그대로)"""
+        store = get_coupon_store()
+        link = store.view(0)["링크"]
+        self.assertEqual(expand_refs("공주페이 [#0] 참고"), f"공주페이 [링크]({link}) 참고")
+        self.assertEqual(expand_refs("[#번호] [#999999]"), "[#번호] [#999999]")
+
+    def test_agent_answer_expands_links(self):
+        """도구 결과는 압축 표기로 프롬프트에 들어가고, 최종 답변에서만 링크로 펼쳐짐"""
+        from agents.router_agent import route_query
+        from monitoring.fake_services import install_fake_services
+
+        install_fake_services(llm_latency=0.01, summary_latency=0.01, naver_latency=0.01)
+        output = route_query("충남 모바일 상품권 추천해줘")["output"]
+        self.assertIn("충남: 공주시", output)
+        self.assertIn("[링크](http", output)
+        self.assertIsNone(REF_PATTERN.search(output))
+
+    def test_saves_tokens(self):
+        """같은 결과를 JSON 보다 적은 토큰으로"""
+        report = measure_query("경기도 카드형 지역화폐")
+        self.assertEqual(report["rows"], 30)
+        self.assertGreater(report["saved_pct"], 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+from langchain_core.messages import HumanMessage, SystemMessage
+from agents.conversation_memory import TokenBudgetMemory, count_tokens
+
+
+class TestTokenBudgetMemory(unittest.TestCase):
+    def test_keeps_recent_turns_within_budget(self):
+        """예산을 넘으면 오래된 턴부터 버림"""
+        memory = TokenBudgetMemory(max_tokens=60)
+        for i in range(20):
+            memory.add_user_message(f"{i}번째 질문입니다. 충청도 모바일 상품권 알려줘")
+            memory.add_ai_message(f"{i}번째 답변입니다.")
+            self.assertLessEqual(memory.total_tokens, 60)
+        self.assertEqual(memory.messages[-1].content, "19번째 답변입니다.")
+        self.assertLess(len(memory.messages), 40)
+
+    def test_dropped_questions_are_summarized(self):
+        """버린 질문은 요약 한 줄로 유지 (요약 예산 이내)"""
+        memory = TokenBudgetMemory(max_tokens=30, summary_tokens=40)
+        for i in range(10):
+            memory.add_user_message(f"질문 {i} 경기도 카드형")
+            memory.add_ai_message("답변")
+        history = memory.history()
+        self.assertIsInstance(history[0], SystemMessage)
+        self.assertIn("질문 7", history[0].content)
+        self.assertIsInstance(history[1], HumanMessage)
+        self.assertNotIn("질문 0", history[0].content)
+        self.assertLessEqual(sum(count_tokens(q) + 1 for q in memory.dropped_questions), 40)
+
+    def test_history_without_overflow(self):
+        """예산 이내면 그대로"""
+        memory = TokenBudgetMemory()
+        memory.add_user_message("안녕")
+        memory.add_ai_message("안녕하세요")
+        self.assertEqual([m.content for m in memory.history()], ["안녕", "안녕하세요"])
+
+
+if __name__ == '__main__':
+    unittest.main()
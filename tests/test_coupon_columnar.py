@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+import unittest
+
+from tests.test_coupon_store import _row
+from tools.coupon_columnar import ColumnarCoupons, columnar_path, load_or_compile
+from tools.coupon_store import COUPON_DATA_PATH, CouponStore
+from tools.filter_tool import filter_jsonl_by_condition, load_jsonl
+
+
+def _write(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+class TestCouponColumnar(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.rows = [
+            _row("경기", "수원시", "수원페이", ["카드형", "모바일"]),
+            _row("경기", "고양시", "고양페이", ["카드형"]),
+            _row("충남", "천안시", "천안사랑카드", ["모바일", "지류형"]),
+        ]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_save_and_mmap_load(self):
+        """저장 → mmap 로드 후 코드/비트마스크/문자열이 그대로"""
+        path = os.path.join(self.tmp.name, "coupons.cpn")
+        ColumnarCoupons.from_records(self.rows).save(path)
+        table = ColumnarCoupons.load(path)
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.region1.dtype.name, "uint16")
+        self.assertEqual(table.support.dtype.name, "uint8")
+        # 지원방식 표기는 원본 순서 유지
+        self.assertEqual(table.view(0), {"이름": "수원페이", "지역": "경기 수원시",
+                                         "지원방식": "카드형, 모바일", "링크": "http://example.com/수원시"})
+        self.assertEqual(table.match_ids({"지역1": ["경기", "충남"], "지원방식": ["모바일"]}).tolist(), [0, 2])
+        self.assertEqual(table.match_ids({"지역1": ["경기"], "지원방식": ["없는방식"]}).tolist(), [])
+        self.assertEqual(table.match_ids({"지원방식": ["카드형"]}, require_region=False).tolist(), [0, 1])
+
+    def test_bad_magic(self):
+        path = os.path.join(self.tmp.name, "broken.cpn")
+        with open(path, "wb") as f:
+            f.write(b"not a coupon file")
+        with self.assertRaises(ValueError):
+            ColumnarCoupons.load(path)
+
+    def test_recompile_when_source_changes(self):
+        """JSONL 이 바뀌면 .cpn 을 다시 만들고, 같으면 파일을 그대로 씀"""
+        jsonl = os.path.join(self.tmp.name, "coupons.jsonl")
+        store = CouponStore(jsonl)
+        _write(jsonl, self.rows)
+        store.refresh()
+        self.assertTrue(os.path.exists(columnar_path(jsonl)))
+        self.assertIsNotNone(load_or_compile(jsonl)._buffer)   # 두 번째는 mmap 로드
+
+        _write(jsonl, self.rows[:1])
+        os.utime(jsonl, (0, os.stat(jsonl).st_mtime + 10))
+        self.assertTrue(store.refresh())
+        self.assertEqual(len(store.filter({"지역1": ["경기"]})), 1)
+        self.assertEqual(len(ColumnarCoupons.load(columnar_path(jsonl))), 1)
+
+    def test_matches_linear_filter(self):
+        """실제 데이터의 모든 지역 조합에서 선형 필터와 결과가 같은지 확인"""
+        data = load_jsonl(COUPON_DATA_PATH)
+        store = CouponStore.from_rows(data)
+        conds = [{"지역1": [r1], "지원방식": s} for r1 in store.by_region1
+                 for s in ([], ["모바일"], ["카드형", "지류형"])]
+        conds += [{"지역1": [], "지역2": [r2], "지원방식": []} for r2 in list(store.by_region2)[:20]]
+        for cond in conds:
+            self.assertEqual(store.filter(cond), filter_jsonl_by_condition(data, cond))
+
+
+if __name__ == '__main__':
+    unittest.main()
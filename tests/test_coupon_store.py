@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+import unittest
+from tools.coupon_columnar import columnar_path
+from tools.coupon_store import CouponStore, COUPON_DATA_PATH
+from tools.filter_tool import load_jsonl, filter_jsonl_by_condition
+
+
+def _row(region1, region2, name, supports):
+    return {
+        "content": f"{region1} {region2}에서는 \"{name}\"이 제공됩니다.",
+        "metadata": {
+            "지역1": region1,
+            "지역2": region2,
+            "이름": name,
+            "지원방식": supports,
+            "비지원방식": [],
+            "링크": f"http://example.com/{region2}"
+        }
+    }
+
+
+class TestCouponStore(unittest.TestCase):
+    def setUp(self):
+        """임시 JSONL 파일 준비"""
+        fd, self.path = tempfile.mkstemp(suffix=".jsonl")
+        os.close(fd)
+        self._write([
+            _row("경기", "수원시", "수원페이", ["모바일", "카드형"]),
+            _row("경기", "고양시", "고양페이", ["카드형"]),
+            _row("충남", "천안시", "천안사랑카드", ["모바일"]),
+        ])
+
+    def tearDown(self):
+        os.remove(self.path)
+        if os.path.exists(columnar_path(self.path)):
+            os.remove(columnar_path(self.path))
+
+    def _write(self, rows):
+        with open(self.path, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def test_inverted_indexes(self):
+        """지역1/지역2/지원방식 역색인 구성"""
+        store = CouponStore(self.path)
+        store.refresh()
+        self.assertEqual(store.by_region1["경기"], {0, 1})
+        self.assertEqual(store.by_region2["천안시"], {2})
+        self.assertEqual(store.by_support["모바일"], {0, 2})
+
+    def test_filter_intersection(self):
+        """조건 교집합 필터링"""
+        store = CouponStore(self.path)
+        results = store.filter({"지역1": ["경기", "충남"], "지원방식": ["모바일"]})
+        self.assertEqual([r["이름"] for r in results], ["수원페이", "천안사랑카드"])
+        self.assertEqual(store.filter({"지역2": ["고양시"], "지원방식": []})[0]["지역"], "경기 고양시")
+        self.assertEqual(store.filter({"지역1": [], "지원방식": ["카드형"]}), [])
+
+    def test_reload_on_mtime_change(self):
+        """파일이 바뀌면 다시 로드"""
+        store = CouponStore(self.path)
+        self.assertTrue(store.refresh())
+        self.assertFalse(store.refresh())
+        self._write([_row("제주", "제주시", "탐나는전", ["지류형"])])
+        os.utime(self.path, (0, os.stat(self.path).st_mtime + 10))
+        self.assertTrue(store.refresh())
+        self.assertEqual(len(store.records()), 1)
+
+    def test_matches_linear_filter(self):
+        """실제 데이터에서 선형 필터와 결과가 같은지 확인"""
+        store = CouponStore(COUPON_DATA_PATH)
+        data = load_jsonl(COUPON_DATA_PATH)
+        for cond in [
+            {"지원방식": ["모바일"], "지역1": ["충북", "충남", "대전", "세종"]},
+            {"지원방식": ["카드형", "지류형"], "지역1": ["경기"]},
+            {"지원방식": [], "지역1": ["제주"]},
+        ]:
+            self.assertEqual(store.filter(cond), filter_jsonl_by_condition(data, cond))
+
+
+if __name__ == '__main__':
+    unittest.main()
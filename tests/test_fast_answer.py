@@ -0,0 +1,36 @@
+import unittest
+from tools.fast_answer import render_results, try_fast_answer
+
+
+class TestFastAnswer(unittest.TestCase):
+    def test_simple_lookup_is_answered(self):
+        """지역 + 지원방식 조회는 LLM 없이 응답"""
+        answer = try_fast_answer("모바일 되는 충청도 지역상품권 알려줘")
+        self.assertIsNotNone(answer)
+        self.assertIn("모바일", answer)
+        self.assertIn("충남 아산시", answer)
+
+    def test_city_lookup(self):
+        """시군구 조회"""
+        answer = try_fast_answer("익산 모바일 상품권")
+        self.assertIn("익산시", answer)
+
+    def test_ambiguous_falls_back(self):
+        """부정/비교/후속 질문은 에이전트로"""
+        for query in ["지류형은 지원하지 않는 곳은?",
+                      "충청도랑 경상도 비교해줘",
+                      "그럼 카드형은?",
+                      "대전 맛집 추천"]:
+            self.assertIsNone(try_fast_answer(query), query)
+
+    def test_render_empty_and_truncated(self):
+        """결과 없음 / 개수 초과 템플릿"""
+        cond = {"지역1": ["서울"], "지역2": [], "지원방식": ["모바일"]}
+        self.assertIn("찾지 못했습니다", render_results(cond, []))
+        rows = [{"이름": f"상품권{i}", "지역": "경기 수원시", "지원방식": "모바일", "링크": "http://x"}
+                for i in range(35)]
+        self.assertIn("외 5곳", render_results(cond, rows))
+
+
+if __name__ == '__main__':
+    unittest.main()
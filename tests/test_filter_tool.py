@@ -0,0 +1,57 @@
+import unittest
+from tools.filter_tool import ConditionMatcher, extract_conditions, parse_conditions
+
+
+class TestConditionParser(unittest.TestCase):
+    def test_province_group_and_support_type(self):
+        """도 통칭 + 지원방식"""
+        cond = parse_conditions("모바일 되는 충청도 지역상품권 알려줘")
+        self.assertEqual(cond["지원방식"], ["모바일"])
+        self.assertEqual(cond["지역1"], ["충북", "충남", "대전", "세종"])
+        self.assertEqual(cond["지역2"], [])
+
+    def test_city_names(self):
+        """시군구 정식 명칭과 약칭"""
+        self.assertEqual(parse_conditions("익산 모바일")["지역2"], ["익산시"])
+        cond = parse_conditions("충청남도 천안시 카드형")
+        self.assertEqual(cond["지역1"], ["충남"])
+        self.assertEqual(cond["지역2"], ["천안시"])
+
+    def test_region1_takes_precedence(self):
+        """시도명과 겹치는 약칭은 시도로 해석"""
+        cond = parse_conditions("광주 상품권")
+        self.assertEqual(cond["지역1"], ["광주"])
+        self.assertEqual(cond["지역2"], [])
+
+    def test_spans(self):
+        """구간 위치 정보"""
+        spans = extract_conditions("전북 익산 모바일")
+        self.assertEqual([(s.start, s.end, s.field) for s in spans],
+                         [(0, 2, "지역1"), (3, 5, "지역2"), (6, 9, "지원방식")])
+
+    def test_longest_match(self):
+        """접두사가 겹치면 가장 긴 어휘를 선택"""
+        matcher = ConditionMatcher(["고양시", "고성군"])
+        spans = matcher.extract("고양시와 고성")
+        self.assertEqual([s.values for s in spans], [("고양시",), ("고성군",)])
+        self.assertEqual(spans[0].text, "고양시")
+
+    def test_name_inside_longer_word(self):
+        """더 긴 단어 속의 시군구명은 조건이 아님 (강남구 ≠ 남구, 강동구 ≠ 동구)"""
+        self.assertEqual(parse_conditions("강남구 상품권")["지역2"], [])
+        self.assertEqual(parse_conditions("강동구 맛집")["지역2"], [])
+        self.assertEqual(parse_conditions("남구에서 카드형")["지역2"], ["남구"])
+        self.assertEqual(parse_conditions("경기도카드형")["지원방식"], ["카드형"])
+
+    def test_metropolitan_city_alias(self):
+        """광역/특별시의 "X시" 표기는 지역1, "광주시"는 경기 광주시"""
+        for query, region in [("부산시 지류형", "부산"), ("세종시 모바일", "세종"), ("울산시 상품권", "울산"),
+                              ("대구시 상품권", "대구"), ("인천시 상품권", "인천"), ("대전시에서", "대전"),
+                              ("서울시 상품권", "서울")]:
+            self.assertEqual(parse_conditions(query)["지역1"], [region], query)
+        cond = parse_conditions("광주시 상품권")
+        self.assertEqual((cond["지역1"], cond["지역2"]), ([], ["광주시"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from tools.llm_cache import LLMResponseCache, make_cache_key
+
+
+class TestLLMResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "cache.sqlite")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_key_ignores_row_order(self):
+        """결과 행 순서와 무관한 키"""
+        rows = [{"이름": "a", "지역": "경기 수원시"}, {"이름": "b", "지역": "충남 천안시"}]
+        self.assertEqual(make_cache_key("gpt-4o", "t", rows), make_cache_key("gpt-4o", "t", rows[::-1]))
+        self.assertNotEqual(make_cache_key("gpt-4o", "t", rows), make_cache_key("gpt-4", "t", rows))
+        self.assertNotEqual(make_cache_key("gpt-4o", "t", rows), make_cache_key("gpt-4o", "t2", rows))
+
+    def test_memory_lru(self):
+        """메모리 LRU 제거와 카운터"""
+        cache = LLMResponseCache(max_memory_items=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "1")
+        self.assertEqual(cache.stats, {"memory_hits": 2, "disk_hits": 0, "misses": 1})
+
+    def test_disk_tier_survives_restart(self):
+        """SQLite 계층은 프로세스 재시작 후에도 유지"""
+        LLMResponseCache(db_path=self.db_path).put("k", "요약")
+        cache = LLMResponseCache(db_path=self.db_path)
+        self.assertEqual(cache.get("k"), "요약")
+        self.assertEqual(cache.stats["disk_hits"], 1)
+        self.assertEqual(cache.get("k"), "요약")
+        self.assertEqual(cache.stats["memory_hits"], 1)
+
+    def test_disk_ttl_and_size_bound(self):
+        """TTL 만료와 크기 제한"""
+        cache = LLMResponseCache(max_memory_items=1, db_path=self.db_path, ttl_seconds=60, max_disk_items=2)
+        now = time.time()
+        with mock.patch("tools.llm_cache.time.time", return_value=now):
+            for key in ["a", "b", "c"]:
+                cache.put(key, key)
+        count = cache._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        self.assertEqual(count, 2)
+        with mock.patch("tools.llm_cache.time.time", return_value=now + 120):
+            self.assertIsNone(cache.get("b"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import tempfile
+import time
+import unittest
+
+from monitoring.fake_services import install_fake_services
+from monitoring.metrics_store import MetricsRollup
+from monitoring.performance_monitor import SegmentWriter, performance_monitor
+from tools.llm_gateway import (LLMBudgetExceeded, budget_scope, chat_completion, estimate_cost,
+                               truncate_rows, truncate_text)
+
+
+def _values(metric: str, purpose: str):
+    return [s["value"] for s in performance_monitor.metrics.get(metric, []) if s["metadata"]["purpose"] == purpose]
+
+
+class TestLLMGateway(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.fakes = install_fake_services(llm_latency=0.01, summary_latency=0.01, naver_latency=0.01)
+
+    def test_cost_by_model_prefix(self):
+        """날짜가 붙은 모델명은 가장 긴 접두사 가격, 모르는 모델은 0"""
+        self.assertAlmostEqual(estimate_cost("gpt-4", 1000, 1000), 0.09)
+        self.assertAlmostEqual(estimate_cost("gpt-4o-2024-08-06", 1_000_000, 0), 2.5)
+        self.assertEqual(estimate_cost("fake-agent-chat", 1000, 1000), 0.0)
+
+    def test_chat_completion_records_and_budgets(self):
+        """호출마다 토큰/비용을 기록하고 턴 예산에 누적, 예산을 넘으면 호출 전에 중단"""
+        messages = [{"role": "user", "content": "충남 공주시 - 공주페이 (모바일)"}]
+        before = len(_values("llm_prompt_tokens", "test"))
+        with budget_scope(max_tokens=10_000) as budget:
+            chat_completion(messages, model="gpt-4o", purpose="test")
+        self.assertEqual(budget.calls, 1)
+        self.assertGreater(budget.prompt_tokens, 0)
+        self.assertGreater(budget.cost_usd, 0)
+        self.assertEqual(len(_values("llm_prompt_tokens", "test")), before + 1)
+
+        calls = self.fakes["openai"].calls
+        with budget_scope(max_tokens=5):
+            with self.assertRaises(LLMBudgetExceeded):
+                chat_completion(messages, model="gpt-4o", purpose="test")
+        with budget_scope(max_seconds=0):
+            with self.assertRaises(LLMBudgetExceeded):
+                chat_completion(messages, model="gpt-4o", purpose="test")
+        self.assertEqual(self.fakes["openai"].calls, calls)
+
+    def test_route_query_usage(self):
+        """에이전트 경로의 LLM 호출이 게이트웨이를 거쳐 턴 사용량으로 집계"""
+        from agents.router_agent import _route, route_query
+
+        result = route_query("세종 지역화폐 정리해줘")
+        self.assertEqual(result["path"], "agent")
+        self.assertEqual(result["usage"]["calls"], 3)   # 도구 선택 → 요약 → 최종 답변
+        self.assertTrue(_values("llm_prompt_tokens", "agent"))
+        self.assertTrue(_values("llm_turn_tokens", "turn"))
+
+        # 첫 호출 전에 예산이 모자라면 에이전트를 돌리지 않고 안내 문구
+        with budget_scope(max_tokens=10):
+            self.assertEqual(_route("할인율 높은 곳 추천해줘", None, None)["path"], "budget")
+
+    def test_truncate_tool_output(self):
+        rows = [{"이름": f"상품권{i}", "링크": f"https://example.com/{i}"} for i in range(50)]
+        kept = truncate_rows(rows, max_rows=30)
+        self.assertEqual(len(kept), 31)
+        self.assertEqual(kept[-1], {"note": "외 20건은 생략했습니다."})
+        self.assertLess(len(truncate_rows(rows, max_tokens=100)), 20)
+        self.assertEqual(truncate_rows(rows[:3]), rows[:3])
+
+        text = "\n".join(f"{i}. 가게 이름 {i}" for i in range(200))
+        self.assertTrue(truncate_text(text, max_tokens=50).endswith("(길이 제한으로 생략)"))
+        self.assertEqual(truncate_text("짧은 결과"), "짧은 결과")
+
+    def test_every_agent_tool_is_limited(self):
+        """에이전트 도구 결과는 종류(문자열/목록/dict)와 상관없이 턴 예산에 맞춰 줄어듦"""
+        from agents.agent_executor import get_tools
+
+        tools = {t.name: t for t in get_tools()}
+        full = tools["merchant_search"].invoke({"query": "익산 음식점"})
+        self.assertEqual(len(full["가맹점"]), 20)
+        with budget_scope(max_tokens=400):
+            limited = tools["merchant_search"].invoke({"query": "익산 음식점"})
+            self.assertLess(len(limited["가맹점"]), 20)
+            self.assertIn("note", limited["가맹점"][-1])
+            self.assertEqual(limited["총개수"], full["총개수"])
+            text = tools["naver_local_search"].invoke({"query": "익산, 군산, 전주 맛집"})
+            self.assertTrue(text.endswith("(길이 제한으로 생략)"))
+        # 턴 캐시에 든 원본 결과는 그대로
+        self.assertEqual(len(full["가맹점"]), 20)
+
+    def test_usage_table(self):
+        """대시보드용 용도별 집계 (합계 = 평균 × 개수)"""
+        with tempfile.TemporaryDirectory() as tmp:
+            now = time.time()
+            meta = {"purpose": "agent", "model": "gpt-4"}
+            SegmentWriter(tmp).write([
+                *[("llm_prompt_tokens", now, n, meta) for n in (100, 300)],
+                *[("llm_completion_tokens", now, 50, meta) for _ in range(2)],
+                *[("llm_cost_usd", now, 0.01, meta) for _ in range(2)],
+                ("llm_prompt_tokens", now, 80, {"purpose": "summary"}),
+            ])
+            rollup = MetricsRollup(tmp, checkpoint=False)
+            rollup.poll()
+            usage = rollup.llm_usage("최근 1시간", now=now)
+        self.assertEqual(list(usage.index), ["agent", "summary"])
+        self.assertEqual(usage.loc["agent", "calls"], 2)
+        self.assertAlmostEqual(usage.loc["agent", "prompt_tokens"], 400, delta=8)
+        self.assertAlmostEqual(usage.loc["agent", "cost_usd"], 0.02, places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+from monitoring.fake_services import install_fake_services
+from monitoring.load_test import compare, load_queries, run_load_test
+
+
+class TestLoadTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.fakes = install_fake_services(llm_latency=0.01, summary_latency=0.01, naver_latency=0.01)
+
+    def test_report_shape(self):
+        """빠른 경로/에이전트/외부 검색이 섞인 질문으로 단계별 통계가 나옴"""
+        queries = ["충남 모바일 상품권", "지역화폐 할인율 높은 곳 추천해줘", "대전 맛집 추천해줘", "12만원 나누기 4"]
+        report = run_load_test(queries, concurrency=3, repeat=2)
+        self.assertEqual(report["requests"], 8)
+        self.assertEqual(report["errors"], [])
+        self.assertEqual(report["paths"], {"fast": 2, "agent": 2, "external": 2, "calculator": 2})
+        self.assertEqual(report["end_to_end"]["count"], 8)
+        for stage in ("llm", "try_fast_answer", "naver_local_search", "tool:filter_coupon_data"):
+            self.assertIn(stage, report["stages"])
+        self.assertGreater(report["tokens"]["prompt_tokens"], 0)
+        self.assertGreaterEqual(report["stages"]["llm"]["p50_ms"], 10)
+
+    def test_compare_flags_regression(self):
+        base = {"throughput_rps": 10.0, "end_to_end": {"p95_ms": 100.0}, "stages": {"llm": {"p95_ms": 50.0}}}
+        slow = {"throughput_rps": 9.5, "end_to_end": {"p95_ms": 100.0}, "stages": {"llm": {"p95_ms": 80.0}}}
+        self.assertEqual(compare(base, base, 1.2), [])
+        self.assertEqual(len(compare(slow, base, 1.2)), 1)
+
+    def test_corpus(self):
+        self.assertGreaterEqual(len(load_queries()), 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
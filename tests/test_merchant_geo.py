@@ -0,0 +1,103 @@
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from tools.geocoder import CachedGeocoder, GeocodeCache
+from tools.merchant_geo import MAX_AUTO_RADIUS_M, GridIndex, MerchantGeoIndex, haversine_m
+from tools.merchant_store import MerchantStore, build_merchant_table
+
+HEADER = "가맹점명,사용가능지역화폐,시도명,시군구명,소재지도로명주소,소재지지번주소,업종명,주요상품,전화번호,데이터기준일자\n"
+MERCHANTS = [
+    ("이디야커피(익산역서부점)", "익산시 고현로 42", "음식점", 35.9405, 126.9460),
+    ("익산역김밥", "익산시 익산대로 1", "음식점", 35.9410, 126.9470),
+    ("송학약국", "익산시 송학로 5", "약국", 35.9420, 126.9440),
+    ("원광대문구", "익산시 익산대로 460", "문구", 35.9680, 126.9560),
+]
+
+
+class FakeGeocoder:
+    def __init__(self):
+        self.calls = []
+
+    def geocode(self, address):
+        self.calls.append(address)
+        return (35.95, 126.95) if address == "익산시청" else None
+
+
+class TestGridIndex(unittest.TestCase):
+    def test_knn_and_radius_match_brute_force(self):
+        """격자 검색 결과가 전수 계산과 같은지 확인"""
+        rng = np.random.default_rng(0)
+        lats = 35.9 + rng.random(2000) * 0.1
+        lons = 126.9 + rng.random(2000) * 0.1
+        grid = GridIndex(lats, lons)
+        for lat, lon in [(35.95, 126.95), (35.901, 126.999), (36.2, 127.3)]:
+            dists = haversine_m(lat, lon, lats, lons)
+            ids, d = grid.knn(lat, lon, 7, max_radius_m=100_000)
+            self.assertEqual(list(ids), list(np.argsort(dists, kind="stable")[:7]))
+            ids, d = grid.radius(lat, lon, 800)
+            self.assertEqual(set(ids), set(np.flatnonzero(dists <= 800)))
+            self.assertTrue(np.all(np.diff(d) >= 0))
+
+    def test_far_anchor_returns_nothing(self):
+        """최대 반경 밖의 가맹점은 '근처'로 돌려주지 않고, 멀리 떨어진 기준점도 바로 끝남"""
+        rng = np.random.default_rng(0)
+        lats = 35.94 + rng.normal(0, 0.05, 50000)
+        lons = 126.95 + rng.normal(0, 0.05, 50000)
+        grid = GridIndex(lats, lons)
+        start = time.perf_counter()
+        for lat, lon in [(36.35, 127.38), (37.56, 126.97)]:     # 대전, 서울
+            ids, d = grid.knn(lat, lon, 10)
+            self.assertEqual(len(ids), 0)
+        self.assertLess(time.perf_counter() - start, 0.05)
+        ids, d = grid.knn(35.94, 126.95, 10)
+        self.assertEqual(len(ids), 10)
+        self.assertTrue(np.all(d <= MAX_AUTO_RADIUS_M))
+
+
+class TestMerchantGeoIndex(unittest.TestCase):
+    def setUp(self):
+        """좌표가 캐시된 작은 가맹점 저장소"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        csv_path = os.path.join(self.tmpdir.name, "익산.csv")
+        cache = GeocodeCache(os.path.join(self.tmpdir.name, "geocode.jsonl"))
+        with open(csv_path, "w", encoding="utf-8-sig") as f:
+            f.write(HEADER)
+            for name, address, business, lat, lon in MERCHANTS:
+                f.write(f"{name},익산다이로움카드,전북특별자치도,익산시,{address},,{business},,,2025-06-10\n")
+                cache.put(address, (lat, lon))
+        self.cache_path = cache.path
+        self.backend = FakeGeocoder()
+        self.index = MerchantGeoIndex(MerchantStore(build_merchant_table(self.tmpdir.name)),
+                                      CachedGeocoder(GeocodeCache(self.cache_path), self.backend))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_anchor_from_merchant_name(self):
+        """가맹점 이름으로 기준 위치를 잡고 업종 조건으로 근처 검색"""
+        result = self.index.search("익산역 근처 음식점")
+        self.assertEqual(result["가맹점"][0]["가맹점명"], "이디야커피(익산역서부점)")
+        self.assertEqual({m["가맹점명"] for m in result["가맹점"]}, {"이디야커피(익산역서부점)", "익산역김밥"})
+        self.assertEqual(self.backend.calls, [])
+
+    def test_radius_and_coordinates(self):
+        """좌표 표기 + 반경 검색"""
+        result = self.index.search("35.9405,126.9460 300m")
+        self.assertEqual(result["반경m"], 300)
+        self.assertNotIn("원광대문구", [m["가맹점명"] for m in result["가맹점"]])
+        self.assertEqual(len(self.index.search("35.9405,126.9460 근처")["가맹점"]), 4)
+
+    def test_geocoder_fallback_is_cached(self):
+        """모르는 장소는 지오코더를 한 번만 호출하고 파일 캐시에 남김"""
+        self.index.search("익산시청 근처")
+        self.index.search("익산시청 근처")
+        self.assertEqual(self.backend.calls, ["익산시청"])
+        self.assertEqual(GeocodeCache(self.cache_path).get("익산시청"), (35.95, 126.95))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from tools.merchant_store import MerchantStore, build_merchant_table, load_merchant_store
+
+HEADER = "가맹점명,사용가능지역화폐,시도명,시군구명,소재지도로명주소,소재지지번주소,업종명,주요상품,전화번호,데이터기준일자\n"
+
+
+class TestMerchantStore(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """인코딩이 다른 CSV 두 개로 가맹점 저장소 구성"""
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        with open(os.path.join(cls.tmpdir.name, "익산.csv"), "w", encoding="utf-8-sig") as f:
+            f.write(HEADER)
+            f.write("미생맥주 부송점,익산다이로움카드,전북특별자치도,익산시,전북특별자치도 익산시 하나로10길 82,,음식점/식음료업,,,2025-06-10\n")
+            f.write("이디야커피(익산역서부점),익산다이로움카드,전북특별자치도,익산시,전북특별자치도 익산시 고현로 42,,음식점/식음료업,,,2025-06-10\n")
+            f.write("씨유원광대점,익산다이로움카드,전북특별자치도,익산시,전북특별자치도 익산시 익산대로68길 75,,식자재/유통,,,2025-06-10\n")
+        with open(os.path.join(cls.tmpdir.name, "고창.csv"), "w", encoding="cp949") as f:
+            f.write(HEADER)
+            f.write("고창분식,고창사랑상품권,전라북도,고창군,전라북도 고창군 고창읍 중앙로 317,,,,,2023-07-10\n")
+            f.write("구구식당,고창사랑상품권,전라북도,고창군,전라북도 고창군 고창읍 읍내리 1,,음식점업,,,2023-07-10\n")
+            f.write("아씨미용실,고창사랑상품권,전라북도,고창군,전라북도 고창군 고창읍 읍내리 2,,개인서비스업,,,2023-07-10\n")
+        cls.store = MerchantStore(build_merchant_table(cls.tmpdir.name))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def test_ingestion(self):
+        """인코딩 처리와 업종 대분류"""
+        self.assertEqual(len(self.store), 6)
+        self.assertEqual(str(self.store.df["지역화폐"].dtype), "category")
+        # 업종명이 비어 있으면 가맹점명으로 추정
+        self.assertEqual(self.store.df.loc[self.store.df["가맹점명"] == "고창분식", "업종분류"].item(), "음식점")
+
+    def test_condition_search(self):
+        """시군구 + 지역화폐 + 업종 조건 검색"""
+        result = self.store.search("익산 다이로움카드 되는 음식점")
+        self.assertEqual(result["조건"]["시군구명"], ["익산시"])
+        self.assertEqual(result["조건"]["지역화폐"], ["익산다이로움카드"])
+        self.assertEqual(result["총개수"], 2)
+
+    def test_ngram_search(self):
+        """이름/주소 n-gram 검색"""
+        result = self.store.search("익산역 카페")
+        self.assertEqual([m["가맹점명"] for m in result["가맹점"]], ["이디야커피(익산역서부점)"])
+        self.assertEqual(len(self.store.text_search("중앙로 317")), 1)
+        self.assertEqual(len(self.store.text_search("없는가게")), 0)
+
+    def test_category_word_is_also_name(self):
+        """업종이 들어간 단어는 업종분류와 이름 검색의 합집합 (이름이 맞는 가게가 먼저)"""
+        result = self.store.search("고창 구구식당")
+        self.assertEqual(result["조건"]["업종어"], ["구구식당"])
+        self.assertEqual(result["총개수"], 2)
+        self.assertEqual(result["가맹점"][0]["가맹점명"], "구구식당")
+        # 업종명이 "개인서비스업" 이어도 가맹점명으로 미용 분류
+        self.assertEqual([m["가맹점명"] for m in self.store.search("고창 미용실")["가맹점"]], ["아씨미용실"])
+
+    def test_parquet_roundtrip(self):
+        """Parquet으로 저장 후 다시 로드"""
+        path = os.path.join(self.tmpdir.name, "merchants.parquet")
+        load_merchant_store(path, self.tmpdir.name)
+        self.assertTrue(os.path.exists(path))
+        store = load_merchant_store(path, self.tmpdir.name)
+        self.assertEqual(len(store), 6)
+        self.assertEqual(store.search("고창 분식")["가맹점"][0]["가맹점명"], "고창분식")
+
+
+if __name__ == '__main__':
+    unittest.main()
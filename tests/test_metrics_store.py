@@ -0,0 +1,67 @@
+import os
+import tempfile
+import time
+import unittest
+
+from monitoring.metrics_store import MetricsRollup, SegmentTailReader
+from monitoring.performance_monitor import SegmentWriter
+
+
+class TestMetricsRollup(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.writer = SegmentWriter(self.tmp.name)
+        self.now = time.time()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_tail_reader_reads_only_new_lines(self):
+        """이미 읽은 줄은 다시 읽지 않고, 쓰는 중인 줄은 다음에 읽음"""
+        reader = SegmentTailReader(self.tmp.name)
+        self.writer.write([("response_times", self.now, 0.1, {})])
+        self.assertEqual(len(list(reader.read_new())), 1)
+        self.assertEqual(list(reader.read_new()), [])
+
+        with open(self.writer._segment(), "a", encoding="utf-8") as f:
+            f.write('{"type": "errors", "ts": 1, ')
+        self.assertEqual(list(reader.read_new()), [])
+        with open(self.writer._segment(), "a", encoding="utf-8") as f:
+            f.write('"value": "x", "metadata": {}}\n')
+        self.assertEqual([s["type"] for s in reader.read_new()], ["errors"])
+
+    def test_windowed_buckets(self):
+        """최근 1시간은 1분 버킷만, 오래된 샘플은 제외"""
+        old = self.now - 3 * 3600
+        self.writer.write([("response_times", old, 5.0, {})])
+        self.writer.write([("response_times", self.now - i, 0.1 * (i % 10 + 1), {}) for i in range(120)])
+        self.writer.write([("spans", self.now, 0.02, {"name": "parse_conditions"})])
+        rollup = MetricsRollup(self.tmp.name)
+        self.assertEqual(rollup.poll(), 122)
+
+        window = rollup.window("최근 1시간", now=self.now)
+        response = window[window["metric"] == "response_times"]
+        self.assertEqual(int(response["count"].sum()), 120)
+        self.assertLessEqual(len(response), 4)
+
+        summary = rollup.summary("최근 1시간", now=self.now)
+        self.assertEqual(summary["response_times"]["count"], 120)
+        self.assertAlmostEqual(summary["response_times"]["max"], 1.0)
+        self.assertIn("spans:parse_conditions", summary)
+        self.assertEqual(rollup.summary("전체", now=self.now)["response_times"]["count"], 121)
+
+    def test_checkpoint_resumes(self):
+        """재시작하면 체크포인트 이후 샘플만 새로 읽음"""
+        self.writer.write([("response_times", self.now, 0.5, {}), ("errors", self.now, "boom", {})])
+        MetricsRollup(self.tmp.name).poll()
+        self.writer.write([("response_times", self.now, 1.5, {})])
+
+        rollup = MetricsRollup(self.tmp.name)
+        self.assertEqual(rollup.poll(), 1)
+        self.assertEqual(rollup.summary("최근 1시간", now=self.now)["response_times"]["count"], 2)
+        self.assertEqual(rollup.recent_errors()[0]["value"], "boom")
+        self.assertTrue(os.path.exists(rollup.checkpoint_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
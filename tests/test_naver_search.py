@@ -0,0 +1,151 @@
+import asyncio
+import concurrent.futures
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+
+from tools.naver_search_tool import MAX_RETRY_DELAY, NaverLocalClient, _BackgroundLoop
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """네이버 지역검색 API를 흉내 내는 로컬 서버"""
+    hits = {}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)["query"][0]
+        with self.lock:
+            count = self.hits[query] = self.hits.get(query, 0) + 1
+
+        if query.startswith("한도") and count == 1:
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+        if query.startswith("긴대기") and count == 1:
+            self.send_response(429)
+            self.send_header("Retry-After", "3600")
+            self.end_headers()
+            return
+        if query.startswith("오류"):
+            self.send_response(503)
+            self.end_headers()
+            return
+        if query.startswith("느린"):
+            time.sleep(0.3)
+
+        body = json.dumps({"items": [{"title": f"<b>{query}</b>", "address": "주소", "link": "http://x"}]})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body.encode("utf-8"))
+
+    def log_message(self, *args):
+        pass
+
+
+class TestNaverLocalClient(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/v1/search/local.json"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _StubHandler.hits = {}
+
+    def _run(self, coro_fn, **kwargs):
+        async def main():
+            client = NaverLocalClient("id", "secret", base_url=self.url, **kwargs)
+            try:
+                return await coro_fn(client)
+            finally:
+                await client.aclose()
+        return asyncio.run(main())
+
+    def test_ttl_cache(self):
+        """같은 질의는 TTL 동안 한 번만 요청"""
+        async def scenario(client):
+            await client.search("대전 맛집")
+            return await client.search("대전 맛집")
+        items = self._run(scenario)
+        self.assertEqual(items[0]["title"], "<b>대전 맛집</b>")
+        self.assertEqual(_StubHandler.hits["대전 맛집"], 1)
+
+        async def expired(client):
+            await client.search("대전 관광")
+            await client.search("대전 관광")
+        self._run(expired, cache_ttl=0)
+        self.assertEqual(_StubHandler.hits["대전 관광"], 2)
+
+    def test_rate_limit_backoff(self):
+        """429 응답 후 Retry-After 만큼 기다렸다 재시도"""
+        items = self._run(lambda c: c.search("한도 초과"))
+        self.assertEqual(len(items), 1)
+        self.assertEqual(_StubHandler.hits["한도 초과"], 2)
+
+    def test_gives_up_after_retries(self):
+        """5xx가 계속되면 재시도 횟수만큼만 시도"""
+        with self.assertRaises(httpx.HTTPStatusError):
+            self._run(lambda c: c.search("오류"), max_retries=2)
+        self.assertEqual(_StubHandler.hits["오류"], 3)
+
+    def test_concurrent_fanout(self):
+        """지역별 질의를 동시에 보내고, 같은 질의는 한 번만 요청"""
+        queries = ["느린 익산", "느린 군산", "느린 완주", "느린 익산"]
+        start = time.perf_counter()
+        results = self._run(lambda c: c.search_many(queries))
+        elapsed = time.perf_counter() - start
+        self.assertEqual(set(results), set(queries))
+        self.assertLess(elapsed, 0.8)
+        self.assertEqual(_StubHandler.hits["느린 익산"], 1)
+
+    def test_retry_after_is_capped(self):
+        """Retry-After 가 아무리 길어도 백오프 상한까지만 기다림"""
+        response = httpx.Response(429, headers={"Retry-After": "3600"})
+        self.assertEqual(NaverLocalClient._retry_delay(response, 0), MAX_RETRY_DELAY)
+
+    def test_timeout_cancels_background_request(self):
+        """제한 시간이 지나면 백그라운드 루프의 요청도 취소되고, 같은 질의는 다시 시도할 수 있음"""
+        loop = _BackgroundLoop()
+        client = NaverLocalClient("id", "secret", base_url=self.url)
+        with self.assertRaises(concurrent.futures.TimeoutError):
+            loop.run(client.search("긴대기 맛집"), timeout=0.5)
+        time.sleep(0.1)
+        self.assertEqual(_StubHandler.hits["긴대기 맛집"], 1)
+        self.assertEqual(client._inflight, {})
+        items = loop.run(client.search("긴대기 맛집"), timeout=5)
+        self.assertEqual(len(items), 1)
+        loop.run(client.aclose(), timeout=5)
+
+    def test_cancelled_waiter_does_not_cancel_shared_request(self):
+        """같은 질의를 기다리던 쪽 하나가 취소돼도 요청 주인과 다른 대기자는 결과를 받음"""
+        async def scenario(client):
+            owner = asyncio.ensure_future(client.search("느린 전주"))
+            await asyncio.sleep(0.05)
+            waiter = asyncio.ensure_future(client.search("느린 전주"))
+            other = asyncio.ensure_future(client.search("느린 전주"))
+            await asyncio.sleep(0.05)
+            waiter.cancel()
+            return await asyncio.gather(owner, waiter, other, return_exceptions=True)
+
+        owner, waiter, other = self._run(scenario)
+        self.assertIsInstance(waiter, asyncio.CancelledError)
+        self.assertEqual(owner, other)
+        self.assertEqual(len(owner), 1)
+        self.assertEqual(_StubHandler.hits["느린 전주"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
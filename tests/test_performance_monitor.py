@@ -0,0 +1,96 @@
+import json
+import os
+import random
+import tempfile
+import time
+import unittest
+
+from monitoring.performance_monitor import PerformanceMonitor, StreamingHistogram, list_segments
+
+
+class TestStreamingHistogram(unittest.TestCase):
+    def test_percentiles_close_to_exact(self):
+        """버킷 근사 백분위수가 정렬 기반 값과 1~2% 이내"""
+        rng = random.Random(0)
+        values = [rng.lognormvariate(0, 1) for _ in range(20000)]
+        hist = StreamingHistogram()
+        for v in values:
+            hist.record(v)
+        values.sort()
+        for p in (50, 95, 99):
+            exact = values[int(len(values) * p / 100) - 1]
+            self.assertAlmostEqual(hist.percentile(p) / exact, 1.0, delta=0.02)
+        self.assertEqual(hist.count, 20000)
+
+    def test_negative_and_zero(self):
+        """메모리 변화량처럼 음수/0이 섞여도 순서가 유지됨"""
+        hist = StreamingHistogram()
+        for v in (-1000, -10, 0, 10, 1000):
+            hist.record(v)
+        self.assertEqual(hist.percentile(50), 0.0)
+        self.assertLess(hist.percentile(20), -500)
+        self.assertGreater(hist.percentile(100), 500)
+
+
+class TestPerformanceMonitor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.monitor = PerformanceMonitor(metrics_dir=self.tmp.name, recent_samples=100, flush_interval=60)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_memory_is_bounded(self):
+        """링 버퍼는 최근 N개만, 통계는 전체 기준"""
+        for i in range(1000):
+            self.monitor.log_metric("response_times", i / 1000)
+        self.assertEqual(len(self.monitor.metrics["response_times"]), 100)
+        analysis = self.monitor.analyze_performance()
+        self.assertEqual(analysis["total_requests"], 1000)
+        self.assertAlmostEqual(analysis["p95_response_time"], 0.95, delta=0.02)
+
+    def test_flush_appends_segments(self):
+        """flush는 쌓인 샘플만 세그먼트 뒤에 이어 씀"""
+        self.monitor.log_metric("response_times", 0.1, {"function": "a"})
+        self.monitor.flush()
+        self.monitor.log_metric("errors", "boom", {"function": "b"})
+        self.monitor.flush()
+        self.monitor.flush()
+
+        lines = []
+        for path in list_segments(self.tmp.name):
+            with open(path, encoding="utf-8") as f:
+                lines += [json.loads(line) for line in f]
+        self.assertEqual([l["type"] for l in lines], ["response_times", "errors"])
+        self.assertEqual(lines[1]["value"], "boom")
+
+    def test_record_is_cheap(self):
+        """기록 한 번이 수십 마이크로초 이내 (파일 I/O 없음)"""
+        n = 20000
+        start = time.perf_counter()
+        for _ in range(n):
+            self.monitor.log_metric("response_times", 0.123, {"function": "f"})
+        per_call_us = (time.perf_counter() - start) / n * 1e6
+        self.assertLess(per_call_us, 50)
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_decorator_records_errors(self):
+        @self.monitor.monitor_performance
+        def fail():
+            raise ValueError("x")
+
+        with self.assertRaises(ValueError):
+            fail()
+        self.assertEqual(self.monitor.metrics["errors"][0]["metadata"]["error_type"], "ValueError")
+
+    def test_tests_do_not_write_production_metrics(self):
+        """테스트의 전역 모니터/스팬 기록은 운영 metrics/ 가 아닌 임시 디렉터리로 (tests/conftest.py)"""
+        from monitoring.performance_monitor import METRICS_DIR, performance_monitor
+
+        self.assertEqual(os.path.abspath(METRICS_DIR), os.path.abspath(os.environ["METRICS_DIR"]))
+        self.assertNotEqual(os.path.abspath(METRICS_DIR), os.path.abspath("metrics"))
+        self.assertEqual(performance_monitor._writer.directory, METRICS_DIR)
+
+
+if __name__ == '__main__':
+    unittest.main()
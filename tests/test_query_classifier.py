@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+import zlib
+
+import numpy as np
+
+from tools.query_classifier import EmbeddingQueryClassifier, QueryType, keyword_classify
+
+
+def hashed_ngram_embed(texts, dim=512):
+    """테스트용 임베딩: 글자 1~2-gram 해싱 후 정규화"""
+    out = np.zeros((len(texts), dim), dtype="float32")
+    for row, text in enumerate(texts):
+        text = text.replace(" ", "")
+        grams = list(text) + [text[i:i + 2] for i in range(len(text) - 1)]
+        for g in grams:
+            out[row, zlib.crc32(g.encode("utf-8")) % dim] += 1.0
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    return out / np.maximum(norms, 1e-9)
+
+
+class TestEmbeddingQueryClassifier(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.calls = []
+
+        def embed(texts):
+            cls.calls.append(list(texts))
+            return hashed_ngram_embed(texts)
+
+        cls.classifier = EmbeddingQueryClassifier(embed)
+
+    def test_unseen_queries(self):
+        """예시에 없는 표현도 의도별로 분류"""
+        cases = {
+            "광주 모바일 지역화폐 되나요": QueryType.INTERNAL,
+            "목포 맛집 추천 좀": QueryType.EXTERNAL,
+            "7만원 곱하기 5": QueryType.CALC,
+            "안녕하세요": QueryType.ETC,
+        }
+        results = self.classifier.classify_batch(list(cases))
+        self.assertEqual([r.query_type for r in results], list(cases.values()))
+        for r in results:
+            self.assertEqual(r.method, "embedding")
+            self.assertTrue(0.0 < r.confidence <= 1.0)
+
+    def test_batch_and_cache(self):
+        """배치 안 중복/이미 본 질의는 다시 임베딩하지 않음"""
+        self.calls.clear()
+        self.classifier.classify_batch(["부산 카페 추천", "부산 카페 추천", "대구 상품권"])
+        self.assertEqual(self.calls, [["부산 카페 추천", "대구 상품권"]])
+        self.calls.clear()
+        first = self.classifier.classify("대구 상품권 ")
+        self.assertEqual(self.calls, [])
+        self.assertEqual(first.query, "대구 상품권")
+
+    def test_calibrated_confidence(self):
+        """온도 보정 후 평균 신뢰도가 0~1 사이의 확률로 정규화됨"""
+        probs = self.classifier.predict_proba(["세종 지류형", "서울 여행지"])
+        np.testing.assert_allclose(probs.sum(axis=1), 1.0, rtol=1e-6)
+        self.assertGreater(self.classifier.temperature, 0)
+
+    def test_head_saved_and_reloaded(self):
+        """학습한 헤드를 저장하고, 예시가 같으면 다시 학습하지 않음"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "head.npz")
+            EmbeddingQueryClassifier(hashed_ngram_embed, head_path=path)
+            calls = []
+
+            def embed(texts):
+                calls.append(texts)
+                return hashed_ngram_embed(texts)
+
+            reloaded = EmbeddingQueryClassifier(embed, head_path=path)
+            self.assertEqual(calls, [])
+            self.assertEqual(reloaded.classify("춘천 맛집").query_type, QueryType.EXTERNAL)
+
+    def test_keyword_fallback(self):
+        self.assertEqual(keyword_classify("경기도 모바일 지역화폐").query_type, QueryType.INTERNAL)
+        self.assertEqual(keyword_classify("대전 맛집").query_type, QueryType.EXTERNAL)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import subprocess
+import sys
+import unittest
+
+from tools.resources import cached_resource
+
+
+class TestCachedResource(unittest.TestCase):
+    def test_factory_runs_once(self):
+        """같은 팩토리는 한 번만 실행되고 같은 객체를 공유"""
+        calls = []
+
+        @cached_resource
+        def make():
+            calls.append(1)
+            return object()
+
+        self.assertIs(make(), make())
+        self.assertEqual(len(calls), 1)
+        make.clear()
+        make()
+        self.assertEqual(len(calls), 2)
+
+    def test_agent_module_import_is_lazy(self):
+        """agents.agent_executor import 만으로는 LLM/에이전트/무거운 도구를 만들지 않음"""
+        code = (
+            "import sys, agents.agent_executor as m\n"
+            "heavy = [x for x in ('langchain.agents', 'langchain_openai', 'openai', 'faiss', 'pandas')"
+            " if x in sys.modules]\n"
+            "print(','.join(heavy))\n"
+        )
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
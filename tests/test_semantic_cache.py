@@ -0,0 +1,116 @@
+import unittest
+from unittest import mock
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from monitoring.fake_services import install_fake_services
+from tests.test_query_classifier import hashed_ngram_embed
+from tools.semantic_cache import SemanticResponseCache, get_semantic_cache, normalize_query
+
+
+class TestSemanticResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.version = 1
+        self.embedded = []
+
+        def embed(texts):
+            self.embedded.extend(texts)
+            return hashed_ngram_embed(texts)
+
+        self.cache = SemanticResponseCache(embed, threshold=0.8, version_fn=lambda: self.version)
+
+    def test_paraphrase_hit(self):
+        """표현이 다른 같은 질문은 적중, 조건(지역)이 다르면 유사해도 적중하지 않음"""
+        self.cache.store("충청도 모바일 상품권", "충청도 답변")
+        hit = self.cache.lookup("모바일 되는 충청도 지역화폐 알려줘")
+        self.assertIsNotNone(hit)
+        self.assertEqual(hit.output, "충청도 답변")
+        self.assertGreaterEqual(hit.similarity, 0.8)
+
+        self.cache.store("충남 모바일 상품권 할인", "충남 답변")
+        self.assertIsNone(self.cache.lookup("충북 모바일 상품권 할인"))
+        self.assertEqual(self.cache.lookup("충남 모바일 상품권 할인").output, "충남 답변")
+
+    def test_negation_not_shared(self):
+        """"안 되는" 질문과 "되는" 질문은 조건 키가 같아도 서로의 답을 쓰지 않음"""
+        self.cache.store("모바일 되는 충청도 상품권", "모바일 되는 곳")
+        self.assertIsNone(self.cache.lookup("모바일 안 되는 충청도 상품권"))
+        self.cache.store("모바일 안 되는 충청도 상품권", "모바일 안 되는 곳")
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.lookup("모바일 되는 충청도 상품권").output, "모바일 되는 곳")
+        self.assertEqual(self.cache.stats["skipped"], 1)
+
+    def test_exact_hit_skips_embedding(self):
+        self.assertEqual(normalize_query("충남 상품권 알려줘!"), normalize_query("충남  상품권 알려주세요"))
+        self.cache.store("충남 상품권 알려줘!", "답변")
+        self.embedded.clear()
+        hit = self.cache.lookup("충남  상품권 알려주세요")
+        self.assertEqual((hit.output, hit.similarity), ("답변", 1.0))
+        self.assertEqual(self.embedded, [])
+        self.assertEqual(self.cache.stats["exact_hits"], 1)
+
+    def test_ttl_lru_and_dataset_version(self):
+        self.cache.max_items = 2
+        for region in ("충남", "충북", "전북"):
+            self.cache.store(f"{region} 상품권 할인", region)
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.lookup("충남 상품권 할인"))
+
+        self.version = 2
+        self.assertIsNone(self.cache.lookup("전북 상품권 할인"))
+        self.assertEqual(len(self.cache), 0)
+
+        self.cache.store("전북 상품권 할인", "전북")
+        with mock.patch("tools.semantic_cache.time.time", return_value=10 ** 12):
+            self.assertIsNone(self.cache.lookup("전북 상품권 할인"))
+
+    def test_without_embedding_model(self):
+        """임베딩 모델이 없으면 정규화 문자열 일치만 사용"""
+        def missing(texts):
+            raise ImportError("sentence_transformers")
+
+        cache = SemanticResponseCache(missing, version_fn=lambda: 1)
+        cache.store("충남 상품권 할인", "답변")
+        self.assertEqual(cache.lookup("충남 상품권 할인 알려줘").output, "답변")
+        self.assertIsNone(cache.lookup("충남에서 할인 많이 해주는 상품권"))
+
+
+class TestRouterSemanticCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from agents.agent_executor import get_agent_executor
+
+        install_fake_services(llm_latency=0.01, summary_latency=0.01, naver_latency=0.01)
+        get_agent_executor().verbose = False
+
+    def setUp(self):
+        self.cache = get_semantic_cache()
+        self.saved = (self.cache.embed_fn, self.cache.enabled)
+        self.cache.embed_fn, self.cache.enabled = hashed_ngram_embed, True
+        self.cache.clear()
+
+    def tearDown(self):
+        self.cache.embed_fn, self.cache.enabled = self.saved
+        self.cache.clear()
+
+    def test_agent_answer_reused(self):
+        from agents.router_agent import route_query
+
+        first = route_query("지역화폐 할인율 높은 곳 추천해줘")
+        self.assertEqual(first["path"], "agent")
+        second = route_query("할인율 높은 지역화폐 추천해줘")
+        self.assertEqual(second["path"], "cache")
+        self.assertEqual(second["output"], first["output"])
+
+    def test_context_dependent_question_not_cached(self):
+        """조건 없는 멀티턴 질문은 맥락마다 답이 다르므로 캐시하지 않음"""
+        from agents.router_agent import route_query
+
+        history = [HumanMessage(content="대전 상품권"), AIMessage(content="온통대전")]
+        self.assertEqual(route_query("할인율은 어때?", history)["path"], "agent")
+        self.assertEqual(route_query("할인율은 어때?", history)["path"], "agent")
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
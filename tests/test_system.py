@@ -1,17 +1,24 @@
 import unittest
-from agents.agent_executor import agent_executor
+from agents.agent_executor import get_agent_executor
+from monitoring.fake_services import install_fake_services
 from tools.filter_tool import parse_conditions, filter_jsonl_by_condition
+from tools.llm_cache import summary_cache
 from tools.llm_tool import summarize_results
 from tools.query_classifier import classify_query
 
 class TestSystem(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """실제 OpenAI/네이버 대신 지연 없는 가짜 서비스 사용"""
+        cls.fakes = install_fake_services(llm_latency=0, summary_latency=0, naver_latency=0)
+
     def setUp(self):
         """테스트 환경 설정"""
         self.test_query = "경기도 모바일 지역화폐"
         self.test_data = [{
             "content": "경기도 수원시에서는 \"수원사랑상품권\"이 제공되며, 모바일 지원됩니다.",
             "metadata": {
-                "지역1": "경기도",
+                "지역1": "경기",
                 "지역2": "수원시",
                 "이름": "수원사랑상품권",
                 "지원방식": ["모바일"],
@@ -23,43 +30,45 @@ class TestSystem(unittest.TestCase):
     def test_query_classification(self):
         """쿼리 분류 테스트"""
         classification = classify_query(self.test_query)
-        self.assertIn(classification["query_type"], 
-                     ["internal_search", "external_search", "calculator"])
-        self.assertGreaterEqual(classification["confidence"], 0.0)
-        self.assertLessEqual(classification["confidence"], 1.0)
+        self.assertEqual(classification.query_type, "internal_search")
+        self.assertGreaterEqual(classification.confidence, 0.0)
+        self.assertLessEqual(classification.confidence, 1.0)
 
     def test_condition_parsing(self):
         """조건 파싱 테스트"""
         conditions = parse_conditions(self.test_query)
-        self.assertEqual(conditions["region"], "경기도")
-        self.assertEqual(conditions["support_type"], "모바일")
+        self.assertIn("경기", conditions["지역1"])
+        self.assertEqual(conditions["지원방식"], ["모바일"])
 
     def test_data_filtering(self):
         """데이터 필터링 테스트"""
         conditions = {
-            "region": "경기도",
-            "support_type": "모바일",
-            "keywords": []
+            "지역1": ["경기"],
+            "지역2": [],
+            "지원방식": ["모바일"]
         }
         results = filter_jsonl_by_condition(self.test_data, conditions)
         self.assertEqual(len(results), 1)
-        self.assertEqual(results[0]["metadata"]["지역1"], "경기도")
-        self.assertIn("모바일", results[0]["metadata"]["지원방식"])
+        self.assertEqual(results[0]["지역"], "경기 수원시")
+        self.assertIn("모바일", results[0]["지원방식"])
 
     def test_result_summarization(self):
         """결과 요약 테스트"""
-        summary = summarize_results(self.test_data)
+        summary_cache.clear()
+        rows = filter_jsonl_by_condition(self.test_data, parse_conditions(self.test_query))
+        summary = summarize_results(rows)
         self.assertIsInstance(summary, str)
         self.assertGreater(len(summary), 0)
 
     def test_agent_execution(self):
         """에이전트 실행 테스트"""
-        response = agent_executor.invoke({
+        response = get_agent_executor().invoke({
             "input": self.test_query,
             "chat_history": []
         })
         self.assertIn("output", response)
         self.assertIsInstance(response["output"], str)
+        self.assertIn("조회 결과", response["output"])
 
 if __name__ == '__main__':
-    unittest.main() 
\ No newline at end of file
+    unittest.main()
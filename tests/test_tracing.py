@@ -0,0 +1,70 @@
+import unittest
+from uuid import uuid4
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from agents.tracing_callback import TracingCallbackHandler
+from monitoring import tracing
+from monitoring.tracing import get_trace, span, start_trace, traced
+from tools.filter_tool import parse_conditions
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.finished = []
+        tracing.add_exporter(self.finished.append)
+
+    def tearDown(self):
+        tracing.remove_exporter(self.finished.append)
+
+    def test_spans_share_trace_id(self):
+        """한 턴 안의 스팬은 같은 trace ID와 부모-자식 관계로 연결"""
+        @traced("outer")
+        def outer():
+            with span("inner"):
+                parse_conditions("충남 모바일 상품권")
+
+        with start_trace("turn") as turn:
+            outer()
+
+        spans = {s["name"]: s for s in get_trace(turn.trace_id)}
+        self.assertEqual(set(spans), {"turn", "outer", "inner", "parse_conditions"})
+        self.assertEqual(spans["outer"]["parent_id"], spans["turn"]["span_id"])
+        self.assertEqual(spans["parse_conditions"]["parent_id"], spans["inner"]["span_id"])
+        self.assertIsNone(tracing.current_span())
+
+    def test_error_recorded(self):
+        with self.assertRaises(ValueError):
+            with start_trace("turn"):
+                raise ValueError("실패")
+        self.assertEqual(self.finished[-1].error, "ValueError: 실패")
+
+    def test_callback_llm_and_tool_spans(self):
+        """콜백이 LLM 토큰 수와 도구 스팬을 턴 아래에 기록"""
+        with start_trace("turn") as turn:
+            handler = TracingCallbackHandler()
+            llm_run, tool_run = uuid4(), uuid4()
+            handler.on_chat_model_start({"name": "ChatOpenAI"}, [[HumanMessage(content="안녕")]],
+                                        run_id=llm_run, invocation_params={"model_name": "gpt-4"})
+            handler.on_llm_new_token("안", run_id=llm_run)
+            message = AIMessage(content="안녕하세요",
+                                usage_metadata={"input_tokens": 12, "output_tokens": 3, "total_tokens": 15})
+            handler.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]), run_id=llm_run)
+
+            handler.on_tool_start({"name": "filter_coupon_data"}, "충남 모바일", run_id=tool_run)
+            with span("inside_tool"):
+                pass
+            handler.on_tool_end([], run_id=tool_run)
+
+        spans = {s["name"]: s for s in get_trace(turn.trace_id)}
+        llm = spans["llm"]
+        self.assertEqual(llm["attributes"]["model"], "gpt-4")
+        self.assertEqual((llm["attributes"]["prompt_tokens"], llm["attributes"]["completion_tokens"]), (12, 3))
+        self.assertIsNotNone(llm["attributes"]["first_token_ms"])
+        self.assertEqual(spans["inside_tool"]["parent_id"], spans["tool:filter_coupon_data"]["span_id"])
+        self.assertEqual(spans["tool:filter_coupon_data"]["parent_id"], spans["turn"]["span_id"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import contextvars
+import threading
+import time
+import unittest
+
+from monitoring.fake_services import install_fake_services
+from monitoring.tracing import get_trace
+from tools.turn_cache import memoize_per_turn, turn_scope
+
+
+class TestTurnCache(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+        @memoize_per_turn
+        def slow_lookup(query: str):
+            self.calls.append(query)
+            time.sleep(0.05)
+            if query == "boom":
+                raise ValueError(query)
+            return [query]
+
+        self.lookup = slow_lookup
+
+    def test_memoized_only_inside_turn(self):
+        self.lookup("a")
+        self.lookup("a")
+        self.assertEqual(len(self.calls), 2)
+
+        with turn_scope() as cache:
+            self.assertEqual(self.lookup("a"), ["a"])
+            self.assertEqual(self.lookup("a"), ["a"])
+            self.lookup("b")
+        self.assertEqual(self.calls[2:], ["a", "b"])
+        self.assertEqual(cache.stats, {"hits": 1, "misses": 2})
+
+        # 턴이 끝나면 새로 계산
+        with turn_scope():
+            self.lookup("a")
+        self.assertEqual(len(self.calls), 5)
+
+    def test_concurrent_calls_share_one_run(self):
+        """동시에 들어온 같은 호출은 먼저 시작한 쪽의 결과를 기다림"""
+        results = []
+        with turn_scope():
+            threads = [threading.Thread(target=contextvars.copy_context().run,
+                                        args=(lambda: results.append(self.lookup("a")),))
+                       for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertEqual(self.calls, ["a"])
+        self.assertEqual(results, [["a"]] * 4)
+
+    def test_errors_not_memoized(self):
+        with turn_scope():
+            for _ in range(2):
+                with self.assertRaises(ValueError):
+                    self.lookup("boom")
+        self.assertEqual(self.calls, ["boom", "boom"])
+
+
+class TestParallelTools(unittest.TestCase):
+    LATENCY = 0.4
+
+    @classmethod
+    def setUpClass(cls):
+        from agents.agent_executor import get_agent_executor
+
+        cls.fakes = install_fake_services(llm_latency=0.01, summary_latency=cls.LATENCY,
+                                          naver_latency=cls.LATENCY)
+        get_agent_executor().verbose = False
+
+    def test_independent_tools_run_concurrently(self):
+        """외부 검색 + 필터 + 요약을 한 번에 호출하면 턴 시간 ≈ 가장 느린 도구, 필터는 한 번만"""
+        from agents.router_agent import route_query
+        from monitoring.load_test import _clear_caches
+
+        route_query("세종 상품권 정리해줘")  # 워밍업
+        _clear_caches()
+
+        start = time.perf_counter()
+        result = route_query("대전 상품권 맛집 정리해줘")
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(result["path"], "agent")
+        spans = get_trace(result["trace_id"])
+        names = [s["name"] for s in spans]
+        for tool in ("naver_local_search", "filter_coupon_data", "summarize_coupon_results"):
+            self.assertIn(f"tool:{tool}", names)
+        self.assertEqual(names.count("coupon_store.filter"), 1)
+        self.assertLess(elapsed, 2 * self.LATENCY - 0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from tools.vector_index_builder import build_index, load_jsonl_records, make_record, record_id
+from tools.vector_search_tool import CouponVectorIndex
+
+
+class TestVectorIndexBuilder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "db")
+        self.records = load_jsonl_records()[:20]
+        self.embedded = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def embed(self, texts):
+        """글자 코드 기반 결정적 가짜 임베딩"""
+        self.embedded.extend(texts)
+        out = np.zeros((len(texts), 16), dtype="float32")
+        for row, text in enumerate(texts):
+            for j, ch in enumerate(text):
+                out[row, (ord(ch) + j) % 16] += 1
+        return out
+
+    def build(self, records, **kwargs):
+        self.embedded.clear()
+        return build_index(records, self.db, embed_fn=self.embed, model_name="fake", **kwargs)
+
+    def test_template_matches_cleaned_jsonl(self):
+        """스프레드시트 행 → JSONL 과 같은 문장/메타데이터"""
+        for record in load_jsonl_records():
+            meta = record["metadata"]
+            rebuilt = make_record(meta["지역1"], meta["지역2"], meta["이름"], meta["지원방식"], meta["링크"])
+            self.assertEqual(rebuilt, record)
+
+    def test_incremental_rebuild(self):
+        """추가/변경된 레코드만 다시 임베딩하고, 삭제된 레코드는 인덱스에서 제거"""
+        manifest = self.build(self.records)
+        self.assertEqual((manifest["version"], manifest["count"]), (1, 20))
+        self.assertEqual(len(self.embedded), 20)
+
+        self.assertEqual(self.build(self.records)["stats"]["unchanged"], 20)
+        self.assertEqual(self.embedded, [])
+
+        new = make_record("전북", "새만금시", "새만금사랑상품권", ["모바일"], "http://example.com")
+        changed = dict(self.records[3], content=self.records[3]["content"] + " (변경)")
+        records = self.records[:3] + [changed] + self.records[5:] + [new]
+        manifest = self.build(records)
+        self.assertEqual(manifest["version"], 3)
+        self.assertEqual(manifest["stats"], {"added": 1, "changed": 1, "removed": 1, "unchanged": 18})
+        self.assertEqual(sorted(self.embedded), sorted([changed["content"], new["content"]]))
+        self.assertEqual(manifest["count"], 20)
+
+        # 검색 결과 id → 레코드 매핑, 메타데이터 사전 필터
+        vindex = CouponVectorIndex(self.db, embed_fn=self.embed)
+        self.assertEqual(vindex.version, 3)
+        hits = vindex.search(new["content"], k=1)
+        self.assertEqual(hits[0]["이름"], "새만금사랑상품권")
+        hits = vindex.search("상품권", k=5, cond={"지역1": [], "지역2": ["새만금시"], "지원방식": []})
+        self.assertEqual([h["이름"] for h in hits], ["새만금사랑상품권"])
+
+        with open(os.path.join(self.db, "manifest.json"), encoding="utf-8") as f:
+            on_disk = json.load(f)
+        self.assertEqual(on_disk["ids"][-1], str(record_id(new)))
+        self.assertFalse([p for p in os.listdir(self.tmp.name) if p.startswith(".")])
+
+    def test_full_rebuild(self):
+        self.build(self.records)
+        manifest = self.build(self.records, full=True)
+        self.assertEqual(len(self.embedded), 20)
+        self.assertEqual(manifest["version"], 2)
+
+    def test_quantized_variants(self):
+        """압축 인덱스는 재임베딩 없이 만들어지고, 종류를 골라 같은 방식으로 필터 검색"""
+        records = load_jsonl_records()
+        self.build(records)
+        manifest = self.build(records, variants=["sq8", "hnsw", "ivfpq"])
+        self.assertEqual(self.embedded, [])
+        self.assertEqual(manifest["variants"], ["hnsw", "ivfpq", "sq8"])
+
+        target = records[10]
+        cond = {"지역1": [], "지역2": [target["metadata"]["지역2"]], "지원방식": []}
+        exact = CouponVectorIndex(self.db, embed_fn=self.embed).search(target["content"], k=3, cond=cond)
+        for index_type in ("sq8", "hnsw", "ivfpq"):
+            vindex = CouponVectorIndex(self.db, embed_fn=self.embed, index_type=index_type)
+            self.assertEqual(vindex.index_type, index_type)
+            hits = vindex.search(target["content"], k=3, cond=cond)
+            self.assertEqual({h["이름"] for h in hits}, {h["이름"] for h in exact}, index_type)
+
+        # 변형 없이 다시 빌드하면 오래된 변형 파일은 남지 않고, 없는 종류는 flat 으로 대체
+        self.build(records)
+        self.assertEqual(CouponVectorIndex(self.db, embed_fn=self.embed, index_type="hnsw").index_type, "flat")
+
+    def test_variant_recall(self):
+        """근사 인덱스의 recall@5 (정확 검색 기준)"""
+        from monitoring.vector_benchmark import run_benchmark, synthetic_vectors
+
+        vectors, ids, queries = synthetic_vectors(2000, 32, 50)
+        report = run_benchmark(vectors, ids, queries, k=5, index_types=["flat", "sq8", "hnsw"])
+        self.assertEqual(report["flat"]["recall@5"], 1.0)
+        self.assertGreater(report["sq8"]["recall@5"], 0.9)
+        self.assertGreater(report["hnsw"]["recall@5"], 0.9)
+        self.assertLess(report["sq8"]["index_mb"], report["flat"]["index_mb"])
+
+    def test_benchmark_loads_plain_flat_index(self):
+        """IDMap 이 아닌 예전 IndexFlatIP(배포된 data/faiss_coupon_db)도 벤치마크가 읽음"""
+        import faiss
+
+        from monitoring.vector_benchmark import load_db_vectors
+        from tools.vector_index_builder import index_filename
+
+        vectors = np.random.default_rng(0).random((10, 8), dtype="float32")
+        index = faiss.IndexFlatIP(8)
+        index.add(vectors)
+        os.makedirs(self.db)
+        faiss.write_index(index, os.path.join(self.db, index_filename("flat")))
+        loaded, ids, queries = load_db_vectors(self.db, ["충남 상품권"], embed_fn=self.embed)
+        np.testing.assert_array_equal(loaded, vectors)
+        self.assertEqual(list(ids), list(range(10)))
+        self.assertEqual(len(queries), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
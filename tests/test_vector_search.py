@@ -0,0 +1,51 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from tools import embedding_model
+from tools.vector_search_tool import CouponVectorIndex
+
+
+class TestVectorSearch(unittest.TestCase):
+    def setUp(self):
+        """임베딩 모델 대신 인덱스에 저장된 벡터를 돌려주는 가짜 인코더"""
+        self.vindex = CouponVectorIndex(embed_fn=self._fake_embed)
+
+    def _fake_embed(self, queries):
+        return np.stack([self.vindex.index.reconstruct(0) for _ in queries])
+
+    def test_batch_search(self):
+        """배치 검색 결과 수"""
+        results = self.vindex.search_batch(["탐나는전", "포항"], k=3)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(len(results[0]), 3)
+        self.assertIn("유사도", results[0][0])
+
+    def test_metadata_prefilter(self):
+        """지역/지원방식 조건이 사전 필터로 적용되는지 확인"""
+        hits = self.vindex.search("상품권", k=5, cond={"지역1": ["제주"], "지역2": [], "지원방식": []})
+        self.assertEqual([h["지역"] for h in hits], ["제주 제주시"])
+        hits = self.vindex.search("상품권", k=200, cond={"지역1": [], "지역2": [], "지원방식": ["모바일"]})
+        self.assertEqual(len(hits), 70)
+        self.assertTrue(all("모바일" in h["지원방식"] for h in hits))
+        self.assertEqual(self.vindex.search("상품권", cond={"지역1": ["서울"], "지원방식": []}), [])
+
+    def test_query_embedding_cache(self):
+        """캐시에 없는 질의만 인코딩"""
+        calls = []
+
+        def fake_embed_texts(texts, batch_size=32):
+            calls.append(list(texts))
+            return np.ones((len(texts), 4), dtype="float32")
+
+        with mock.patch.object(embedding_model, "embed_texts", fake_embed_texts), \
+             mock.patch.object(embedding_model, "query_cache", embedding_model.QueryEmbeddingCache()):
+            embedding_model.embed_queries(["a", "b", "a"])
+            vectors = embedding_model.embed_queries(["b", "c"])
+        self.assertEqual(calls, [["a", "b"], ["c"]])
+        self.assertEqual(vectors.shape, (2, 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
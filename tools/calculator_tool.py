@@ -0,0 +1,71 @@
+import ast
+import operator
+import re
+from typing import Optional
+
+from langchain_core.tools import tool
+
+# 한국어 연산 표현 → 연산자
+WORD_OPERATORS = [
+    ("더하기", "+"), ("플러스", "+"), ("빼기", "-"), ("마이너스", "-"),
+    ("곱하기", "*"), ("나누기", "/"), ("×", "*"), ("÷", "/"), ("x", "*"),
+]
+UNITS = {"억": 100_000_000, "만": 10_000, "천": 1_000, "백": 100}
+
+_OPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub,
+    ast.Mult: operator.mul, ast.Div: operator.truediv,
+    ast.USub: operator.neg, ast.UAdd: operator.pos,
+}
+_NUMBER = re.compile(r"(\d+(?:\.\d+)?)\s*(억|만|천|백)?\s*원?")
+_PERCENT_OF = re.compile(r"([\d.]+)\s*의\s*([\d.]+)\s*%")
+
+
+def _eval(node):
+    if isinstance(node, ast.Expression):
+        return _eval(node.body)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _OPS:
+        return _OPS[type(node.op)](_eval(node.left), _eval(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _OPS:
+        return _OPS[type(node.op)](_eval(node.operand))
+    raise ValueError("지원하지 않는 식입니다.")
+
+
+def to_expression(query: str) -> Optional[str]:
+    """'12만원 나누기 4' → '120000/4'. 숫자 연산식으로 바꿀 수 없으면 None"""
+    text = query.replace(",", "")
+    for word, op in WORD_OPERATORS:
+        text = text.replace(word, f" {op} ")
+    text = _NUMBER.sub(lambda m: str(float(m.group(1)) * UNITS.get(m.group(2), 1)), text)
+    # "200000.0의 6%" → 200000.0 * 6 / 100
+    text = _PERCENT_OF.sub(lambda m: f"({m.group(1)} * {m.group(2)} / 100)", text)
+    expr = "".join(re.findall(r"[\d.+\-*/() ]", text)).strip()
+    if not re.search(r"\d\s*[+\-*/]\s*[\d(]", expr):
+        return None
+    return re.sub(r"\s+", "", expr)
+
+
+def calculate(query: str) -> Optional[float]:
+    """질문 속 사칙연산을 계산 (eval 없이 AST 로 안전하게). 식이 없으면 None"""
+    expr = to_expression(query)
+    if expr is None:
+        return None
+    try:
+        return _eval(ast.parse(expr, mode="eval"))
+    except (SyntaxError, ValueError, ZeroDivisionError):
+        return None
+
+
+def format_number(value: float) -> str:
+    return f"{value:,.0f}" if float(value).is_integer() else f"{value:,.2f}"
+
+
+@tool
+def calculator(query: str) -> str:
+    """금액 계산을 합니다. 예: '12만원 나누기 4', '20만원의 6%', '30000 곱하기 3'"""
+    result = calculate(query)
+    if result is None:
+        return "계산할 식을 찾지 못했습니다."
+    return f"계산 결과: {format_number(result)}"
@@ -0,0 +1,73 @@
+"""에이전트 프롬프트에 넣는 도구 결과의 압축 표기
+
+filter_coupon_data 결과를 dict 목록 그대로 넘기면 LangChain 이 JSON 으로 바꿔 scratchpad 에 넣고,
+이후 LLM 호출마다 "지역"/"지원방식"/"링크" 키와 긴 URL 을 다시 읽습니다. 대신
+
+    지원방식: M=모바일 C=카드형 P=지류형 · [#번호]=링크
+    충남: 공주시 공주페이 MC [#12] | 천안시 천안사랑카드 M [#13]
+
+처럼 지역1 별로 묶고, 지원방식은 한 글자 코드, 링크는 레코드 번호로 적습니다.
+[#번호] 는 에이전트의 최종 답변에서만 expand_refs() 로 실제 링크로 바꿉니다.
+"""
+import re
+from typing import Dict, List, Optional
+
+from tools.coupon_store import get_coupon_store
+
+SUPPORT_CODES = {"모바일": "M", "카드형": "C", "지류형": "P"}
+LEGEND = "지원방식: " + " ".join(f"{code}={name}" for name, code in SUPPORT_CODES.items()) + " · [#번호]=링크"
+REF_PATTERN = re.compile(r"\[#(\d+)\]")
+
+
+def _count(text: str) -> int:
+    from agents.conversation_memory import count_tokens
+
+    return count_tokens(text)
+
+
+def _support_code(label: str) -> str:
+    names = [s.strip() for s in label.split(",") if s.strip()]
+    return "".join(SUPPORT_CODES.get(name, name) for name in names) or "-"
+
+
+def _item(row: Dict) -> str:
+    _, _, region2 = row["지역"].partition(" ")
+    return f"{region2} {row['이름']} {_support_code(row['지원방식'])} [#{row['id']}]".strip()
+
+
+def encode_coupon_rows(rows: List[Dict], max_tokens: Optional[int] = None) -> str:
+    """CouponStore.filter(with_ids=True) 결과 → 지역별로 묶은 압축 문자열 (토큰 상한 안에서 앞에서부터)"""
+    if not rows:
+        return "검색 결과가 없습니다."
+    used = _count(LEGEND)
+    groups: Dict[str, List[str]] = {}
+    shown = 0
+    for row in rows:
+        item = _item(row)
+        cost = _count(item) + 1
+        if max_tokens is not None and used + cost > max_tokens:
+            break
+        groups.setdefault(row["지역"].partition(" ")[0], []).append(item)
+        used += cost
+        shown += 1
+
+    lines = [LEGEND]
+    lines += [f"{region1}: " + " | ".join(items) for region1, items in groups.items()]
+    if shown < len(rows):
+        lines.append(f"외 {len(rows) - shown}건은 생략했습니다.")
+    return "\n".join(lines)
+
+
+def expand_refs(text: str) -> str:
+    """최종 답변의 [#번호] → 마크다운 링크 (모르는 번호는 그대로)"""
+    if "[#" not in text:
+        return text
+    store = get_coupon_store()
+
+    def replace(m: re.Match) -> str:
+        try:
+            return f"[링크]({store.view(int(m.group(1)))['링크']})"
+        except IndexError:
+            return m.group(0)
+
+    return REF_PATTERN.sub(replace, text)
@@ -0,0 +1,249 @@
+"""지역사랑상품권 데이터의 컬럼형 바이너리 포맷
+
+JSONL 한 줄마다 들어 있는 긴 content 문장과 중첩 metadata 대신, 필터에 필요한 열만 타입이 있는 배열로 저장합니다.
+
+    지역1, 지역2      → uint16 범주 코드 (범주 이름 목록은 헤더)
+    지원방식/비지원방식 → uint8 비트마스크 (비트 순서는 헤더의 support_types)
+    이름, 링크, 지원방식 표기 → uint32 문자열 id (중복 제거한 UTF-8 문자열 표)
+
+파일은 mmap 으로 열어 배열을 복사 없이 읽고, 필터는 배열 연산(np.isin, 비트 AND)으로 처리합니다.
+
+    python -m tools.coupon_columnar build                 # JSONL → .cpn
+    python -m tools.coupon_columnar build --from-xlsm     # 스프레드시트 → .cpn
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"CPNCOL01"
+ALIGN = 8
+
+# 지원방식 비트 순서 (원본 스프레드시트 열 순서)
+SUPPORT_TYPES = ["지류형", "모바일", "카드형"]
+
+_COLUMNS = ("region1", "region2", "support", "unsupported", "name", "link", "label", "string_offsets", "string_data")
+
+
+def columnar_path(jsonl_path: str) -> str:
+    """JSONL 옆에 두는 컴파일 결과 경로"""
+    return os.path.splitext(jsonl_path)[0] + ".cpn"
+
+
+def _codes(values: List[str]) -> Tuple[List[str], np.ndarray]:
+    categories = list(dict.fromkeys(values))
+    index = {v: i for i, v in enumerate(categories)}
+    return categories, np.array([index[v] for v in values], dtype="uint16")
+
+
+class ColumnarCoupons:
+    """컬럼 배열 묶음 (파일 mmap 이든 메모리 배열이든 같은 인터페이스)"""
+
+    def __init__(self, header: Dict, arrays: Dict[str, np.ndarray], buffer=None):
+        self.header = header
+        self.arrays = arrays
+        self.count = header["count"]
+        self.region1_names: List[str] = header["region1"]
+        self.region2_names: List[str] = header["region2"]
+        self.support_types: List[str] = header["support_types"]
+        self.region1 = arrays["region1"]
+        self.region2 = arrays["region2"]
+        self.support = arrays["support"]
+        self.unsupported = arrays["unsupported"]
+        self.name = arrays["name"]
+        self.link = arrays["link"]
+        self.label = arrays["label"]
+        self._offsets = arrays["string_offsets"]
+        self._data = arrays["string_data"]
+        self._buffer = buffer            # mmap 을 열어 둔 채로 유지
+        self._strings: List[Optional[str]] = [None] * (len(self._offsets) - 1)
+        self._region1_code = {v: i for i, v in enumerate(self.region1_names)}
+        self._region2_code = {v: i for i, v in enumerate(self.region2_names)}
+        self._support_bit = {t: 1 << i for i, t in enumerate(self.support_types)}
+
+    def __len__(self) -> int:
+        return self.count
+
+    # ---------- 만들기 ----------
+    @classmethod
+    def from_records(cls, records: List[Dict], source: Optional[Dict] = None) -> "ColumnarCoupons":
+        metas = [r["metadata"] for r in records]
+        region1_names, region1 = _codes([m.get("지역1") or "" for m in metas])
+        region2_names, region2 = _codes([m.get("지역2") or "" for m in metas])
+
+        support_types = list(SUPPORT_TYPES)
+        for m in metas:
+            for t in m.get("지원방식", []) + m.get("비지원방식", []):
+                if t not in support_types:
+                    support_types.append(t)
+        if len(support_types) > 8:
+            raise ValueError(f"지원방식 종류가 8개를 넘습니다: {support_types}")
+        bits = {t: 1 << i for i, t in enumerate(support_types)}
+        support = np.array([sum(bits[t] for t in set(m.get("지원방식", []))) for m in metas], dtype="uint8")
+        unsupported = np.array([sum(bits[t] for t in set(m.get("비지원방식", []))) for m in metas], dtype="uint8")
+
+        # 이름/링크 문자열 표 (같은 문자열은 한 번만)
+        strings: Dict[str, int] = {}
+        name = np.array([strings.setdefault(m["이름"], len(strings)) for m in metas], dtype="uint32")
+        link = np.array([strings.setdefault(m["링크"], len(strings)) for m in metas], dtype="uint32")
+        # 결과의 "지원방식" 문자열은 원본 표기 순서 그대로 (비트마스크로는 순서가 사라짐)
+        label = np.array([strings.setdefault(", ".join(m.get("지원방식", [])), len(strings)) for m in metas],
+                         dtype="uint32")
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype="uint32")
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype="uint8")
+
+        header = {
+            "count": len(records),
+            "region1": region1_names,
+            "region2": region2_names,
+            "support_types": support_types,
+            "source": source or {},
+        }
+        arrays = {"region1": region1, "region2": region2, "support": support, "unsupported": unsupported,
+                  "name": name, "link": link, "label": label, "string_offsets": offsets, "string_data": data}
+        return cls(header, arrays)
+
+    def save(self, path: str):
+        """헤더(JSON) + 8바이트 정렬 배열들로 저장 (임시 파일에 쓴 뒤 교체)"""
+        arrays = {col: np.ascontiguousarray(self.arrays[col]) for col in _COLUMNS}
+        layout, offset = {}, 0
+        for col in _COLUMNS:
+            layout[col] = {"offset": offset, "dtype": arrays[col].dtype.str, "length": int(arrays[col].size)}
+            offset += -(-arrays[col].nbytes // ALIGN) * ALIGN
+        header = json.dumps({**self.header, "arrays": layout}, ensure_ascii=False).encode("utf-8")
+        prefix = MAGIC + struct.pack("<I", len(header)) + header
+        prefix += b"\0" * (-len(prefix) % ALIGN)
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(prefix)
+            for col in _COLUMNS:
+                raw = arrays[col].tobytes()
+                f.write(raw + b"\0" * (-len(raw) % ALIGN))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "ColumnarCoupons":
+        """mmap 으로 열어 배열을 복사 없이 참조"""
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if buffer[:len(MAGIC)] != MAGIC:
+            buffer.close()
+            raise ValueError(f"컬럼형 쿠폰 파일이 아닙니다: {path}")
+        (header_len,) = struct.unpack_from("<I", buffer, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(bytes(buffer[start:start + header_len]).decode("utf-8"))
+        base = start + header_len + (-(start + header_len) % ALIGN)
+        arrays = {
+            col: np.frombuffer(buffer, dtype=np.dtype(spec["dtype"]), count=spec["length"], offset=base + spec["offset"])
+            for col, spec in header.pop("arrays").items()
+        }
+        return cls(header, arrays, buffer)
+
+    # ---------- 조회 ----------
+    def string(self, i: int) -> str:
+        s = self._strings[i]
+        if s is None:
+            s = self._strings[i] = bytes(self._data[self._offsets[i]:self._offsets[i + 1]]).decode("utf-8")
+        return s
+
+    def support_mask(self, types: List[str]) -> int:
+        return sum(self._support_bit.get(t, 0) for t in set(types))
+
+    def match_ids(self, cond: Dict[str, List[str]], require_region: bool = True) -> np.ndarray:
+        """조건에 맞는 레코드 번호 (원본 순서). 지역은 지역2 우선(지역1 이 있으면 교집합), 지원방식은 모두 만족"""
+        return self.match_many([cond], require_region)[0]
+
+    def match_many(self, conds: List[Dict[str, List[str]]], require_region: bool = True) -> List[np.ndarray]:
+        """여러 조건을 한 번에: 조건마다 코드 → 참/거짓 표를 만들고 (조건 수 × 레코드 수) 마스크를 한 번에 계산"""
+        g = len(conds)
+        region1 = np.zeros((g, len(self.region1_names)), dtype=bool)
+        region2 = np.zeros((g, len(self.region2_names)), dtype=bool)
+        use_region2 = np.zeros(g, dtype=bool)
+        need_region1 = np.zeros(g, dtype=bool)
+        wanted = np.zeros(g, dtype="uint8")
+        impossible = np.zeros(g, dtype=bool)
+
+        for j, cond in enumerate(conds):
+            region1[j, [self._region1_code[r] for r in cond.get("지역1", []) if r in self._region1_code]] = True
+            region2[j, [self._region2_code[r] for r in cond.get("지역2", []) if r in self._region2_code]] = True
+            use_region2[j] = bool(cond.get("지역2"))
+            need_region1[j] = bool(cond.get("지역1"))
+            if not (use_region2[j] or need_region1[j]) and not require_region:
+                region1[j] = True   # 지역 조건이 없으면 전체
+            types = cond.get("지원방식", [])
+            impossible[j] = any(t not in self._support_bit for t in types)
+            wanted[j] = self.support_mask(types)
+
+        by_region1 = region1[:, self.region1]
+        mask = np.where(use_region2[:, None],
+                        region2[:, self.region2] & (by_region1 | ~need_region1[:, None]),
+                        by_region1)
+        if wanted.any():
+            mask &= (self.support[None, :] & wanted[:, None]) == wanted[:, None]
+        mask[impossible] = False
+        return [np.flatnonzero(row) for row in mask]
+
+    def view(self, i: int) -> Dict[str, str]:
+        """filter_jsonl_by_condition 과 같은 형태의 결과 한 줄"""
+        return {
+            "이름": self.string(int(self.name[i])),
+            "지역": f"{self.region1_names[self.region1[i]]} {self.region2_names[self.region2[i]]}",
+            "지원방식": self.string(int(self.label[i])),
+            "링크": self.string(int(self.link[i])),
+        }
+
+
+def source_stamp(path: str) -> Dict:
+    st = os.stat(path)
+    return {"path": os.path.basename(path), "mtime": st.st_mtime, "size": st.st_size}
+
+
+def load_or_compile(jsonl_path: str, path: Optional[str] = None) -> ColumnarCoupons:
+    """컴파일 결과가 원본과 같은 버전이면 mmap 으로 읽고, 아니면 JSONL 에서 다시 만들어 저장"""
+    path = path or columnar_path(jsonl_path)
+    stamp = source_stamp(jsonl_path)
+    if os.path.exists(path):
+        try:
+            table = ColumnarCoupons.load(path)
+            if table.header.get("source") == stamp:
+                return table
+        except (ValueError, OSError):
+            pass
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    table = ColumnarCoupons.from_records(records, source=stamp)
+    try:
+        table.save(path)
+    except OSError:
+        # 쓰기 불가능한 위치면 메모리에서만 사용
+        pass
+    return table
+
+
+def main():
+    from tools.coupon_store import COUPON_DATA_PATH
+
+    parser = argparse.ArgumentParser(description="지역사랑상품권 컬럼형 바이너리 빌드")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--jsonl", default=COUPON_DATA_PATH)
+    parser.add_argument("--from-xlsm", nargs="?", const="", help="스프레드시트에서 JSONL 을 다시 만든 뒤 빌드")
+    args = parser.parse_args()
+
+    if args.from_xlsm is not None:
+        from tools.vector_index_builder import COUPON_XLSM_PATH, load_xlsm_records, write_jsonl_records
+
+        write_jsonl_records(load_xlsm_records(args.from_xlsm or COUPON_XLSM_PATH), args.jsonl)
+    table = load_or_compile(args.jsonl)
+    path = columnar_path(args.jsonl)
+    print(f"✅ {len(table)}건 → {path} ({os.path.getsize(path):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
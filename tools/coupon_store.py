@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+from monitoring.tracing import traced
+from tools.coupon_columnar import ColumnarCoupons, load_or_compile
+
+COUPON_DATA_PATH = "data/지역사랑상품권_긍정_부정전처리_cleaned.jsonl"
+
+
+# ✅ 프로세스 전역 쿠폰 저장소 (컬럼형 바이너리 mmap + 비트마스크 필터)
+class CouponStore:
+    """지역사랑상품권 데이터를 컬럼형 바이너리(.cpn)로 컴파일해 mmap 으로 열고, 필터는 배열 연산으로 처리합니다.
+
+    .cpn 이 없거나 JSONL 보다 오래됐으면 다시 만들고, 원본 레코드는 records() 를 부를 때만 읽습니다.
+    """
+
+    def __init__(self, path: Optional[str] = COUPON_DATA_PATH, columnar_path: Optional[str] = None):
+        self.path = path
+        self.columnar_path = columnar_path
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self.version = 0
+        self.table: Optional[ColumnarCoupons] = None
+        self._rows: Optional[List[Dict]] = None
+        self._derived: Dict[str, object] = {}
+
+    def _set_table(self, table: ColumnarCoupons, rows: Optional[List[Dict]] = None):
+        self.table = table
+        self._rows = rows
+        self._derived = {}
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict]) -> "CouponStore":
+        """파일 없이 이미 읽어 둔 레코드로 저장소를 만듭니다 (예: 벡터 인덱스 메타데이터)."""
+        store = cls(path=None)
+        store._set_table(ColumnarCoupons.from_records(rows), rows)
+        store.version = 1
+        return store
+
+    def refresh(self) -> bool:
+        """파일 mtime이 바뀌었으면 다시 로드합니다. 다시 로드했으면 True."""
+        if self.path is None:
+            return False
+        mtime = os.stat(self.path).st_mtime
+        if mtime == self._mtime:
+            return False
+        with self._lock:
+            if mtime == self._mtime:
+                return False
+            self._set_table(load_or_compile(self.path, self.columnar_path))
+            self._mtime = mtime
+            self.version += 1
+        return True
+
+    def records(self) -> List[Dict]:
+        """원본 레코드 전체 (필터에는 필요 없으므로 처음 부를 때 JSONL 에서 읽음)"""
+        self.refresh()
+        rows = self._rows
+        if rows is None:
+            with open(self.path, "r", encoding="utf-8") as f:
+                rows = self._rows = [json.loads(line) for line in f if line.strip()]
+        return rows
+
+    def _index(self, name: str, build):
+        value = self._derived.get(name)
+        if value is None:
+            value = self._derived[name] = build()
+        return value
+
+    def _groups(self, codes, names: List[str]) -> Dict[str, Set[int]]:
+        groups: Dict[str, Set[int]] = {}
+        for i, code in enumerate(codes.tolist()):
+            groups.setdefault(names[code], set()).add(i)
+        return groups
+
+    # 이전 역색인 형태가 필요한 곳(조건 매처의 지역 사전 등)을 위한 읽기 전용 뷰
+    @property
+    def by_region1(self) -> Dict[str, Set[int]]:
+        self.refresh()
+        return self._index("by_region1", lambda: self._groups(self.table.region1, self.table.region1_names))
+
+    @property
+    def by_region2(self) -> Dict[str, Set[int]]:
+        self.refresh()
+        return self._index("by_region2", lambda: self._groups(self.table.region2, self.table.region2_names))
+
+    @property
+    def by_support(self) -> Dict[str, Set[int]]:
+        self.refresh()
+        table = self.table
+        return self._index("by_support", lambda: {
+            stype: set(np.flatnonzero(table.support & bit).tolist())
+            for stype, bit in ((t, table.support_mask([t])) for t in table.support_types)
+            if (table.support & bit).any()
+        })
+
+    @property
+    def views(self) -> List[Dict]:
+        self.refresh()
+        return self._index("views", lambda: [self.table.view(i) for i in range(len(self.table))])
+
+    def match_ids(self, cond: Dict[str, List[str]], require_region: bool = True) -> List[int]:
+        """조건에 맞는 레코드 번호 (원본 순서). require_region=False면 지역 조건이 없을 때 전체에서 고릅니다."""
+        self.refresh()
+        return self.table.match_ids(cond, require_region).tolist()
+
+    def view(self, i: int) -> Dict:
+        """레코드 번호 하나의 결과 행 (도구 결과의 [#번호] 를 링크로 펼칠 때)"""
+        self.refresh()
+        return self.table.view(i)
+
+    @traced("coupon_store.filter")
+    def filter(self, cond: Dict[str, List[str]], with_ids: bool = False) -> List[Dict]:
+        """filter_jsonl_by_condition과 같은 형태의 결과를 비트마스크 필터로 반환합니다.
+
+        with_ids=True면 각 행에 레코드 번호("id")를 붙입니다.
+        """
+        self.refresh()
+        table = self.table   # 조회 중에 다시 로드돼도 같은 테이블 기준으로
+        ids = table.match_ids(cond).tolist()
+        if with_ids:
+            return [{"id": i, **table.view(i)} for i in ids]
+        return [table.view(i) for i in ids]
+
+    @traced("coupon_store.filter_many")
+    def filter_many(self, conds: List[Dict[str, List[str]]]) -> List[List[Dict]]:
+        """여러 조건의 filter 결과를 데이터셋 한 번 훑기로 계산합니다 (일괄 질의용)."""
+        if not conds:
+            return []
+        self.refresh()
+        table = self.table
+        return [[table.view(i) for i in ids.tolist()] for ids in table.match_many(conds)]
+
+
+_stores: Dict[str, CouponStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_coupon_store(path: str = COUPON_DATA_PATH) -> CouponStore:
+    """경로별 프로세스 전역 CouponStore (Streamlit 세션 간 공유)"""
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.setdefault(path, CouponStore(path))
+    return store
@@ -0,0 +1,160 @@
+import argparse
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+
+MODEL_NAME = os.getenv("MODEL_NAME", "nlpai-lab/KURE-v1")
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "32"))
+
+# 질의 인코더 백엔드: torch(SentenceTransformer) / onnx(int8 동적 양자화, export_onnx 로 생성)
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch")
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "data/kure_onnx_int8")
+ONNX_MAX_LENGTH = int(os.getenv("ONNX_MAX_LENGTH", "128"))
+
+_model = None
+_model_lock = threading.Lock()
+
+
+# ✅ ONNX Runtime int8 인코더 (SentenceTransformer.encode 와 같은 호출 형식)
+class OnnxEncoder:
+    """KURE(XLM-R) 의 CLS 풀링 + L2 정규화를 onnxruntime 으로 재현합니다."""
+
+    def __init__(self, model_dir: str = ONNX_MODEL_DIR, max_length: int = ONNX_MAX_LENGTH):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(os.path.join(model_dir, "model_int8.onnx"), options,
+                                            providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.max_length = max_length
+
+    def encode(self, texts: List[str], batch_size: int = EMBED_BATCH_SIZE,
+               normalize_embeddings: bool = True, convert_to_numpy: bool = True,
+               show_progress_bar: bool = False) -> np.ndarray:
+        out = []
+        for start in range(0, len(texts), batch_size):
+            batch = self.tokenizer(texts[start:start + batch_size], padding=True, truncation=True,
+                                   max_length=self.max_length, return_tensors="np")
+            feed = {k: v.astype("int64") for k, v in batch.items() if k in self.input_names}
+            hidden = self.session.run(None, feed)[0]
+            out.append(hidden[:, 0])  # CLS 풀링
+        vectors = np.concatenate(out).astype("float32")
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True).clip(min=1e-12)
+        return vectors
+
+
+def export_onnx(output_dir: str = ONNX_MODEL_DIR, model_name: str = MODEL_NAME) -> str:
+    """KURE 인코더를 ONNX 로 내보내고 가중치를 int8 로 동적 양자화합니다."""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+    sample = tokenizer(["워밍업"], return_tensors="pt")
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    torch.onnx.export(
+        model, (sample["input_ids"], sample["attention_mask"]), fp32_path,
+        input_names=["input_ids", "attention_mask"], output_names=["last_hidden_state"],
+        dynamic_axes={"input_ids": {0: "batch", 1: "seq"}, "attention_mask": {0: "batch", 1: "seq"},
+                      "last_hidden_state": {0: "batch", 1: "seq"}},
+        opset_version=17,
+    )
+    int8_path = os.path.join(output_dir, "model_int8.onnx")
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    os.remove(fp32_path)
+    tokenizer.save_pretrained(output_dir)
+    return int8_path
+
+
+def load_encoder(backend: str = EMBED_BACKEND):
+    """백엔드별 인코더 생성 (워밍업 포함)"""
+    if backend == "onnx":
+        model = OnnxEncoder()
+    elif backend == "torch":
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(MODEL_NAME, device="cpu")
+    else:
+        raise ValueError(f"알 수 없는 임베딩 백엔드: {backend}")
+    # 첫 질의 지연을 없애기 위한 워밍업
+    model.encode(["워밍업"], normalize_embeddings=True)
+    return model
+
+
+# ✅ 임베딩 모델은 프로세스당 한 번만 로드
+def get_embedding_model():
+    """KURE-v1 인코더 (EMBED_BACKEND 에 따라 torch / onnx, 최초 호출 시 로드 후 워밍업)"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = load_encoder()
+    return _model
+
+
+def embed_texts(texts: List[str], batch_size: int = EMBED_BATCH_SIZE) -> np.ndarray:
+    """문장 목록을 배치 단위로 정규화 임베딩 (float32, shape=(n, dim))"""
+    if not texts:
+        return np.zeros((0, 0), dtype="float32")
+    vectors = get_embedding_model().encode(
+        texts,
+        batch_size=batch_size,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+        show_progress_bar=False
+    )
+    return np.ascontiguousarray(vectors, dtype="float32")
+
+
+class QueryEmbeddingCache:
+    """반복 질의용 LRU 임베딩 캐시"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vec = self._items.get(text)
+            if vec is not None:
+                self._items.move_to_end(text)
+            return vec
+
+    def put(self, text: str, vec: np.ndarray):
+        with self._lock:
+            self._items[text] = vec
+            self._items.move_to_end(text)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+
+query_cache = QueryEmbeddingCache()
+
+
+def embed_queries(queries: List[str], batch_size: int = EMBED_BATCH_SIZE) -> np.ndarray:
+    """캐시에 없는 질의만 모아서 한 번에 임베딩합니다."""
+    cached = [query_cache.get(q) for q in queries]
+    missing = list(dict.fromkeys(q for q, v in zip(queries, cached) if v is None))
+    fresh = {}
+    if missing:
+        for q, vec in zip(missing, embed_texts(missing, batch_size)):
+            query_cache.put(q, vec)
+            fresh[q] = vec
+    return np.stack([v if v is not None else fresh[q] for q, v in zip(queries, cached)])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KURE 인코더 ONNX int8 내보내기")
+    parser.add_argument("--output", default=ONNX_MODEL_DIR)
+    args = parser.parse_args()
+    print(export_onnx(args.output))
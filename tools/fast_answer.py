@@ -0,0 +1,69 @@
+from typing import Dict, List, Optional
+
+from monitoring.tracing import traced
+from tools.coupon_store import get_coupon_store
+from tools.filter_tool import FILLER_WORDS, PARTICLES, extract_conditions, split_words, strip_particle
+from tools.query_classifier import QueryType, keyword_classify
+
+MAX_FAST_ROWS = 30
+
+
+def _residual_words(query: str, spans) -> List[str]:
+    """조건 구간을 지운 뒤 남는 단어"""
+    chars = list(query)
+    for span in spans:
+        chars[span.start:span.end] = [" "] * (span.end - span.start)
+    words = []
+    for token in split_words("".join(chars)):
+        if token in FILLER_WORDS or strip_particle(token) in FILLER_WORDS:
+            continue
+        # "모바일만" → 조건 뒤에 조사만 남은 경우
+        if token in PARTICLES:
+            continue
+        words.append(token)
+    return words
+
+
+def render_results(cond: Dict[str, List[str]], results: List[Dict]) -> str:
+    """필터 결과를 템플릿 응답으로 변환"""
+    regions = ", ".join(cond.get("지역2") or cond.get("지역1"))
+    stypes = ", ".join(cond.get("지원방식", []))
+    target = f"**{regions}**" + (f" 지역의 **{stypes}** 지원" if stypes else " 지역의")
+
+    if not results:
+        return f"{target} 지역사랑상품권을 찾지 못했습니다."
+
+    lines = [f"{target} 지역사랑상품권은 총 {len(results)}곳입니다.", ""]
+    for r in results[:MAX_FAST_ROWS]:
+        lines.append(f"- {r['지역']} — [{r['이름']}]({r['링크']}) ({r['지원방식'] or '지원방식 정보 없음'})")
+    if len(results) > MAX_FAST_ROWS:
+        lines.append(f"- 외 {len(results) - MAX_FAST_ROWS}곳")
+    return "\n".join(lines)
+
+
+def fast_conditions(query: str) -> Optional[Dict[str, List[str]]]:
+    """단순 '지역 + 지원방식' 조회면 그 조건을, 애매하면 None을 반환합니다."""
+    # 임베딩 모델을 부르지 않는 키워드 검사 (빠른 경로는 1ms 이내 유지)
+    if keyword_classify(query).query_type != QueryType.INTERNAL:
+        return None
+
+    spans = extract_conditions(query)
+    cond: Dict[str, List[str]] = {"지원방식": [], "지역1": [], "지역2": []}
+    for span in spans:
+        cond[span.field].extend(v for v in span.values if v not in cond[span.field])
+
+    if not (cond["지역1"] or cond["지역2"]):
+        return None
+    if _residual_words(query, spans):
+        return None
+    return cond
+
+
+# ✅ 규칙 기반 빠른 응답 (LLM 호출 없이)
+@traced()
+def try_fast_answer(query: str) -> Optional[str]:
+    """단순 '지역 + 지원방식' 조회면 템플릿 응답을, 애매하면 None을 반환합니다."""
+    cond = fast_conditions(query)
+    if cond is None:
+        return None
+    return render_results(cond, get_coupon_store().filter(cond))
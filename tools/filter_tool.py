@@ -1,45 +1,192 @@
 import json
 import re
-from typing import List, Dict
+import threading
+from typing import Dict, List, NamedTuple, Optional, Pattern, Tuple
 
-# ✅ 규칙 기반 질문 파서
-from typing import Dict, List
+from monitoring.tracing import traced
+from tools.coupon_store import get_coupon_store
+
+SUPPORT_TYPES = ["모바일", "카드형", "지류형"]
+
+# 도 단위 통칭 → 지역1 묶음
+PROVINCES = {
+    "경상도": ["경북", "경남", "대구", "부산", "울산"],
+    "충청도": ["충북", "충남", "대전", "세종"],
+    "전라도": ["전북", "전남", "광주"],
+    "경기도": ["경기", "인천"],
+    "강원도": ["강원"]
+}
+
+# 시도 정식 명칭 → 지역1
+PROVINCE_FULL_NAMES = {
+    "서울특별시": "서울", "부산광역시": "부산", "대구광역시": "대구", "인천광역시": "인천",
+    "광주광역시": "광주", "대전광역시": "대전", "울산광역시": "울산", "세종특별자치시": "세종",
+    "강원특별자치도": "강원", "충청북도": "충북", "충청남도": "충남",
+    "전라북도": "전북", "전북특별자치도": "전북", "전라남도": "전남",
+    "경상북도": "경북", "경상남도": "경남", "제주특별자치도": "제주", "제주도": "제주"
+}
+
+# 시도 전체를 대상으로 하는 지역2 값 (예: 지역2가 "경기도"인 도 단위 상품권)
+_PROVINCE_SUFFIXES = ("도", "광역시", "특별시", "특별자치시", "특별자치도")
+
+
+# 조건 외에 남아도 되는 단어 (빠른 경로에서 이외의 단어가 남으면 에이전트로 넘김)
+FILLER_WORDS = {
+    "상품권", "지역상품권", "지역사랑상품권", "지역화폐", "화폐", "지역", "페이",
+    "알려줘", "알려주세요", "알려줄래", "보여줘", "보여주세요", "찾아줘", "찾아주세요", "말해줘",
+    "되는", "되는거", "되는곳", "지원", "지원되는", "지원하는", "사용", "사용가능한", "쓸", "수", "있는",
+    "가능한", "뭐", "뭐야", "뭐있어", "뭐가", "있어", "어디", "어떤", "목록", "리스트", "전체", "모든",
+    "곳", "것", "거", "종류", "정보", "좀", "중", "및", "또는"
+}
+
+# 단어 끝 조사/어미
+PARTICLES = ("에서는", "에서", "으로", "이랑", "에는", "은", "는", "이", "가", "을", "를",
+             "의", "에", "도", "만", "과", "와", "랑", "로", "요")
+_WORD_SPLIT = re.compile(r"[\s,.!?~·/]+")
+_HANGUL_RUN = re.compile(r"[가-힣]*")
+
+
+def strip_particle(token: str) -> str:
+    """단어 끝의 조사 하나를 뗍니다."""
+    for p in PARTICLES:
+        if token.endswith(p) and len(token) > len(p):
+            return token[:-len(p)]
+    return token
+
+
+def split_words(text: str) -> List[str]:
+    """공백/문장부호 기준 단어 목록"""
+    return [w for w in _WORD_SPLIT.split(text) if w]
+
+
+class ConditionSpan(NamedTuple):
+    """질문 안에서 찾은 조건 하나 (위치, 원문, 필드, 값)"""
+    start: int
+    end: int
+    text: str
+    field: str
+    values: Tuple[str, ...]
+
+
+# ✅ 어휘 사전 → 접두사 트리 정규식 (한 번의 스캔으로 모든 조건 추출)
+def _trie_pattern(words: List[str]) -> str:
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        is_end = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # 더 긴 어휘를 먼저 시도하도록 greedy optional
+        return "(?:" + body + ")?" if is_end else body
+
+    return build(trie)
 
-def parse_conditions(query: str) -> Dict[str, List[str]]:
-    support_types = ["모바일", "카드형", "지류형"]
 
-    provinces = {
-        "경상도": ["경북", "경남", "대구", "부산", "울산"],
-        "충청도": ["충북", "충남", "대전", "세종"],
-        "전라도": ["전북", "전남", "광주"],
-        "경기도": ["경기", "인천"],
-        "강원도": ["강원"]
-    }
+class ConditionMatcher:
+    """지원방식 / 도 통칭 / 시도 / 시군구 어휘를 하나의 정규식으로 컴파일한 매처"""
 
-    # 전체 시도 (provinces의 값 + 서울, 제주 등 누락된 광역시 보완)
-    all_regions = list(set(sum(provinces.values(), []))) + ["서울", "제주"]
+    def __init__(self, region2_names: List[str]):
+        self.vocab: Dict[str, Tuple[str, Tuple[str, ...]]] = {}
 
-    cond = {"지원방식": [], "지역1": []}
+        for stype in SUPPORT_TYPES:
+            self.vocab[stype] = ("지원방식", (stype,))
 
-    # ✅ 지원방식 추출
-    for stype in support_types:
-        if stype in query:
-            cond["지원방식"].append(stype)
+        region1_names = set(sum(PROVINCES.values(), [])) | {"서울", "제주"}
+        region1_names |= set(PROVINCE_FULL_NAMES.values())
 
-    # ✅ 도 단위 명칭이 포함된 경우
-    for pname, subs in provinces.items():
-        if pname in query:
-            cond["지역1"].extend(subs)
+        # 시군구명: 정식 명칭과 "시/군" 을 뗀 약칭 (시도명과 겹치거나 한 글자면 제외)
+        for name in sorted(set(region2_names)):
+            if not name or name.endswith(_PROVINCE_SUFFIXES):
+                continue
+            self.vocab.setdefault(name, ("지역2", (name,)))
+            stem = name[:-1]
+            if name[-1] in "시군" and len(stem) >= 2 and stem not in region1_names:
+                self.vocab.setdefault(stem, ("지역2", (name,)))
 
-    # ✅ 시도 직접 언급된 경우
-    for r in all_regions:
-        if r in query:
-            cond["지역1"].append(r)
+        # 시도는 시군구보다 우선
+        for r in region1_names:
+            self.vocab[r] = ("지역1", (r,))
+        for full, r in PROVINCE_FULL_NAMES.items():
+            self.vocab[full] = ("지역1", (r,))
+            # 광역/특별시는 "부산시", "세종시" 처럼도 씀 (경기 광주시와 겹치는 "광주시"는 시군구 그대로)
+            alias = r + "시"
+            if full.endswith("시") and alias not in region2_names:
+                self.vocab[alias] = ("지역1", (r,))
+        for pname, subs in PROVINCES.items():
+            self.vocab[pname] = ("지역1", tuple(subs))
 
-    # ✅ 중복 제거
-    cond["지역1"] = list(set(cond["지역1"]))
+        self.pattern: Pattern = re.compile(_trie_pattern(list(self.vocab)))
 
-    return cond
+    def extract(self, query: str) -> List[ConditionSpan]:
+        """질문에서 조건 구간을 한 번의 스캔으로 추출합니다."""
+        matches = list(self.pattern.finditer(query))
+        starts = {m.start() for m in matches}
+        ends = {m.end() for m in matches}
+        spans = []
+        for m in matches:
+            # ✅ 더 긴 단어 속에 묻힌 어휘는 버림 ("강남구" 의 "남구", "강동구" 의 "동구")
+            if not _at_word_start(query, m.start(), ends) or not _at_word_end(query, m.end(), starts):
+                continue
+            field, values = self.vocab[m.group()]
+            spans.append(ConditionSpan(m.start(), m.end(), m.group(), field, values))
+        return spans
+
+
+def _is_hangul(ch: str) -> bool:
+    return "가" <= ch <= "힣"
+
+
+def _at_word_start(query: str, start: int, ends: set) -> bool:
+    """단어 첫머리이거나 바로 앞이 다른 어휘로 끝나는 경우 ("경기도카드형")"""
+    return start == 0 or not _is_hangul(query[start - 1]) or start in ends
+
+
+def _at_word_end(query: str, end: int, starts: set) -> bool:
+    """뒤에 조사/상품권 같은 군말만 붙었거나, 바로 다른 어휘가 이어지는 경우"""
+    rest = _HANGUL_RUN.match(query, end).group()
+    return (not rest or rest in PARTICLES or end in starts
+            or rest in FILLER_WORDS or strip_particle(rest) in FILLER_WORDS)
+
+
+_matcher: Optional[ConditionMatcher] = None
+_matcher_version = -1
+_matcher_lock = threading.Lock()
+
+
+def get_condition_matcher() -> ConditionMatcher:
+    """데이터셋 버전별로 한 번만 컴파일되는 전역 매처"""
+    global _matcher, _matcher_version
+    store = get_coupon_store()
+    store.refresh()
+    if _matcher is None or _matcher_version != store.version:
+        with _matcher_lock:
+            if _matcher is None or _matcher_version != store.version:
+                _matcher = ConditionMatcher(list(store.by_region2))
+                _matcher_version = store.version
+    return _matcher
+
+
+def extract_conditions(query: str) -> List[ConditionSpan]:
+    """질문에서 찾은 조건 구간 목록"""
+    return get_condition_matcher().extract(query)
+
+
+# ✅ 규칙 기반 질문 파서
+@traced()
+def parse_conditions(query: str) -> Dict[str, List[str]]:
+    cond: Dict[str, List[str]] = {"지원방식": [], "지역1": [], "지역2": []}
+    for span in extract_conditions(query):
+        cond[span.field].extend(span.values)
+
+    # ✅ 중복 제거 (등장 순서 유지)
+    return {k: list(dict.fromkeys(v)) for k, v in cond.items()}
 
 # ✅ JSONL 불러오기
 def load_jsonl(path: str) -> List[Dict]:
@@ -47,13 +194,22 @@ def load_jsonl(path: str) -> List[Dict]:
         return [json.loads(line) for line in f]
 
 
+def _region_match(meta: Dict, cond: Dict[str, List[str]]) -> bool:
+    region1 = cond.get("지역1", [])
+    region2 = cond.get("지역2", [])
+    if region2:
+        return meta.get("지역2") in region2 and (not region1 or meta.get("지역1") in region1)
+    return meta.get("지역1") in region1
+
+
 # ✅ 조건 기반 필터링
+@traced()
 def filter_jsonl_by_condition(data: List[Dict], cond: Dict[str, List[str]]) -> List[Dict]:
     result = []
     for row in data:
         meta = row["metadata"]
         if all(t in meta.get("지원방식", []) for t in cond.get("지원방식", [])) and \
-           meta.get("지역1") in cond.get("지역1", []):
+           _region_match(meta, cond):
             result.append({
                 "이름": meta["이름"],
                 "지역": f"{meta['지역1']} {meta['지역2']}",
@@ -0,0 +1,123 @@
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import requests
+
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", "data/geocode_cache.jsonl")
+KAKAO_REST_API_KEY = os.getenv("KAKAO_REST_API_KEY")
+
+Coord = Tuple[float, float]  # (위도, 경도)
+
+
+# ✅ 주소 → 좌표 파일 캐시 (JSONL append-only)
+class GeocodeCache:
+    """주소별 좌표를 JSONL 파일에 누적 저장합니다. 찾지 못한 주소도 None으로 기록해 다시 묻지 않습니다."""
+
+    def __init__(self, path: str = GEOCODE_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.coords: Dict[str, Optional[Coord]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    row = json.loads(line)
+                    lat, lon = row.get("lat"), row.get("lon")
+                    self.coords[row["address"]] = (lat, lon) if lat is not None else None
+
+    def __contains__(self, address: str) -> bool:
+        return address in self.coords
+
+    def get(self, address: str) -> Optional[Coord]:
+        return self.coords.get(address)
+
+    def put(self, address: str, coord: Optional[Coord]):
+        with self._lock:
+            self.coords[address] = coord
+            row = {"address": address, "lat": coord[0] if coord else None, "lon": coord[1] if coord else None}
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+class KakaoGeocoder:
+    """카카오 로컬 API 지오코더 (주소 검색 후 실패하면 키워드 검색)"""
+
+    ADDRESS_URL = "https://dapi.kakao.com/v2/local/search/address.json"
+    KEYWORD_URL = "https://dapi.kakao.com/v2/local/search/keyword.json"
+
+    def __init__(self, api_key: Optional[str] = KAKAO_REST_API_KEY, timeout: float = 3.0):
+        if not api_key:
+            raise ValueError("KAKAO_REST_API_KEY 가 설정되지 않았습니다.")
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"KakaoAK {api_key}"
+        self.timeout = timeout
+
+    def _first(self, url: str, query: str) -> Optional[Coord]:
+        response = self.session.get(url, params={"query": query, "size": 1}, timeout=self.timeout)
+        response.raise_for_status()
+        documents = response.json().get("documents", [])
+        if not documents:
+            return None
+        return float(documents[0]["y"]), float(documents[0]["x"])
+
+    def geocode(self, address: str) -> Optional[Coord]:
+        return self._first(self.ADDRESS_URL, address) or self._first(self.KEYWORD_URL, address)
+
+
+class CachedGeocoder:
+    """파일 캐시를 먼저 보고, 없을 때만 실제 지오코더를 호출합니다."""
+
+    def __init__(self, cache: GeocodeCache, backend=None):
+        self.cache = cache
+        self.backend = backend
+
+    def geocode(self, address: str) -> Optional[Coord]:
+        if address in self.cache:
+            return self.cache.get(address)
+        if self.backend is None:
+            return None
+        coord = self.backend.geocode(address)
+        self.cache.put(address, coord)
+        return coord
+
+
+def default_backend():
+    """설정된 API 키에 맞는 지오코더 (없으면 None → 캐시만 사용)"""
+    return KakaoGeocoder() if KAKAO_REST_API_KEY else None
+
+
+# ✅ 오프라인 지오코딩 단계
+def geocode_addresses(addresses: Iterable[str], geocoder: CachedGeocoder,
+                      delay: float = 0.05, limit: Optional[int] = None) -> int:
+    """캐시에 없는 주소만 지오코딩해 캐시에 저장합니다. 새로 처리한 주소 수를 반환합니다."""
+    done = 0
+    for address in dict.fromkeys(a for a in addresses if a):
+        if address in geocoder.cache:
+            continue
+        if limit is not None and done >= limit:
+            break
+        try:
+            geocoder.geocode(address)
+        except requests.RequestException as e:
+            print(f"⚠️ {address}: {e}")
+            time.sleep(1.0)
+            continue
+        done += 1
+        time.sleep(delay)
+    return done
+
+
+if __name__ == "__main__":
+    # 사용법: python -m tools.geocoder [최대건수]
+    from tools.merchant_store import get_merchant_store
+
+    max_count = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    df = get_merchant_store().df
+    addresses = [r or j for r, j in zip(df["도로명주소"], df["지번주소"])]
+    count = geocode_addresses(addresses, CachedGeocoder(GeocodeCache(), default_backend()), limit=max_count)
+    print(f"✅ 새 주소 {count}건 지오코딩 → {GEOCODE_CACHE_PATH}")
@@ -0,0 +1,327 @@
+"""LLM 호출 게이트웨이 (토큰/비용 기록 + 턴별 예산)
+
+에이전트의 ChatOpenAI(LangChain 콜백)와 요약용 OpenAI 클라이언트 호출이 모두 여기를 지나며,
+호출마다 prompt/completion 토큰, 지연, 추정 비용을 PerformanceMonitor 로 보냅니다.
+
+턴마다 budget_scope() 로 토큰/시간 예산을 두고, 예산을 넘으면 다음 LLM 호출 전에 LLMBudgetExceeded 를 냅니다.
+에이전트 도구 결과는 limit_tool_outputs() 로 감싸 프롬프트에 들어가기 전에 토큰 상한 안으로 줄이고
+(문자열은 truncate_text, 목록은 truncate_rows), filter_coupon_data 는 압축 표기 단계에서 같은 상한을 씁니다.
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from monitoring.performance_monitor import performance_monitor
+from monitoring.tracing import current_trace_id, span
+
+logger = logging.getLogger(__name__)
+
+LLM_TURN_TOKEN_BUDGET = int(os.getenv("LLM_TURN_TOKEN_BUDGET", "16000"))      # 한 턴의 prompt+completion 합
+LLM_TURN_TIME_BUDGET = float(os.getenv("LLM_TURN_TIME_BUDGET", "60"))         # 초
+LLM_TOOL_OUTPUT_TOKENS = int(os.getenv("LLM_TOOL_OUTPUT_TOKENS", "1500"))     # 도구 결과 하나의 상한
+
+# 1M 토큰당 USD (입력, 출력). 날짜가 붙은 모델명은 가장 긴 접두사로 찾음
+MODEL_PRICING = {
+    "gpt-4": (30.0, 60.0),
+    "gpt-4-turbo": (10.0, 30.0),
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+    "gpt-3.5-turbo": (0.5, 1.5),
+}
+
+# 메트릭 종류 (metrics_store 에서 purpose 별로 나눠 집계)
+LLM_METRICS = ("llm_latency", "llm_prompt_tokens", "llm_completion_tokens", "llm_cost_usd")
+TURN_TOKENS_METRIC = "llm_turn_tokens"
+
+
+class LLMBudgetExceeded(RuntimeError):
+    """턴의 토큰/시간 예산을 넘어 더 이상 LLM 을 부르지 않음"""
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prices = None
+    for name in sorted(MODEL_PRICING, key=len, reverse=True):
+        if model.startswith(name):
+            prices = MODEL_PRICING[name]
+            break
+    if prices is None:
+        return 0.0
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+def _count(text: str) -> int:
+    from agents.conversation_memory import count_tokens
+
+    return count_tokens(text)
+
+
+# ✅ 턴별 예산
+class TurnBudget:
+    """한 턴 동안 쓴 토큰과 경과 시간. 스레드/태스크로 복사된 컨텍스트에서도 같은 객체를 공유합니다."""
+
+    def __init__(self, max_tokens: int = LLM_TURN_TOKEN_BUDGET, max_seconds: float = LLM_TURN_TIME_BUDGET):
+        self.max_tokens = max_tokens
+        self.max_seconds = max_seconds
+        self.started = time.perf_counter()
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def used_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def remaining_tokens(self) -> int:
+        return self.max_tokens - self.used_tokens
+
+    @property
+    def remaining_seconds(self) -> float:
+        return self.max_seconds - (time.perf_counter() - self.started)
+
+    def check(self, prompt_tokens: int = 0):
+        """다음 호출의 프롬프트까지 예산 안에 들어오는지 확인"""
+        if self.remaining_seconds <= 0:
+            raise LLMBudgetExceeded(f"턴 시간 예산 {self.max_seconds:g}초를 넘었습니다.")
+        if prompt_tokens > self.remaining_tokens:
+            raise LLMBudgetExceeded(
+                f"턴 토큰 예산을 넘습니다 (사용 {self.used_tokens} + 프롬프트 {prompt_tokens} > {self.max_tokens})")
+
+    def add(self, prompt_tokens: int, completion_tokens: int, cost_usd: float):
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.cost_usd += cost_usd
+            self.calls += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"calls": self.calls, "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens, "cost_usd": round(self.cost_usd, 6)}
+
+
+_budget: contextvars.ContextVar[Optional[TurnBudget]] = contextvars.ContextVar("llm_turn_budget", default=None)
+
+
+@contextmanager
+def budget_scope(max_tokens: int = LLM_TURN_TOKEN_BUDGET, max_seconds: float = LLM_TURN_TIME_BUDGET):
+    """이 블록 안의 LLM 호출이 예산 하나를 나눠 씀. 끝나면 턴 전체 토큰을 기록"""
+    budget = TurnBudget(max_tokens, max_seconds)
+    token = _budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget.reset(token)
+        if budget.calls:
+            performance_monitor.log_metric(TURN_TOKENS_METRIC, budget.used_tokens,
+                                           {"purpose": "turn", "trace_id": current_trace_id(), **budget.to_dict()})
+
+
+def current_budget() -> Optional[TurnBudget]:
+    return _budget.get()
+
+
+# ✅ 호출 기록
+def record_llm_call(model: str, purpose: str, prompt_tokens: int, completion_tokens: int,
+                    latency: float, estimated: bool = False) -> float:
+    """호출 하나의 토큰/지연/비용을 메트릭과 현재 턴 예산에 반영. 추정 비용(USD)을 돌려줍니다."""
+    cost = estimate_cost(model, prompt_tokens, completion_tokens)
+    budget = _budget.get()
+    if budget is not None:
+        budget.add(prompt_tokens, completion_tokens, cost)
+    meta = {"purpose": purpose, "model": model, "estimated": estimated, "trace_id": current_trace_id()}
+    for metric, value in zip(LLM_METRICS, (latency, prompt_tokens, completion_tokens, cost)):
+        performance_monitor.log_metric(metric, value, meta)
+    return cost
+
+
+def _check_budget(prompt_tokens: int, purpose: str):
+    budget = _budget.get()
+    if budget is None:
+        return
+    try:
+        budget.check(prompt_tokens)
+    except LLMBudgetExceeded as e:
+        performance_monitor.log_metric("errors", str(e), {"function": f"llm:{purpose}",
+                                                          "error_type": "LLMBudgetExceeded"})
+        raise
+
+
+def chat_completion(messages: List[Dict[str, str]], model: str, purpose: str, **kwargs):
+    """OpenAI 클라이언트 chat.completions.create 를 예산 확인/기록과 함께 호출"""
+    from tools.resources import get_openai_client
+
+    prompt = "\n".join(m["content"] for m in messages)
+    _check_budget(_count(prompt), purpose)
+    budget = _budget.get()
+    if budget is not None:
+        kwargs.setdefault("timeout", max(1.0, budget.remaining_seconds))
+
+    start = time.perf_counter()
+    with span("llm", model=model, purpose=purpose) as s:
+        response = get_openai_client().chat.completions.create(model=model, messages=messages, **kwargs)
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            prompt_tokens, completion_tokens, estimated = usage.prompt_tokens, usage.completion_tokens, False
+        else:
+            content = response.choices[0].message.content or ""
+            prompt_tokens, completion_tokens, estimated = _count(prompt), _count(content), True
+        s.set(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    record_llm_call(model, purpose, prompt_tokens, completion_tokens, time.perf_counter() - start, estimated)
+    return response
+
+
+def token_usage(response) -> Dict[str, int]:
+    """LLMResult 에서 prompt/completion 토큰 수 추출 (스트리밍이면 usage_metadata)"""
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return {
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0),
+        }
+    for generations in response.generations:
+        for gen in generations:
+            meta = getattr(getattr(gen, "message", None), "usage_metadata", None)
+            if meta:
+                return {
+                    "prompt_tokens": meta.get("input_tokens", 0),
+                    "completion_tokens": meta.get("output_tokens", 0),
+                }
+    return {}
+
+
+def model_name(serialized: Optional[Dict[str, Any]], kwargs: Dict[str, Any]) -> str:
+    params = kwargs.get("invocation_params") or {}
+    return params.get("model_name") or params.get("model") or (serialized or {}).get("name", "llm")
+
+
+# ✅ LangChain 채팅 모델 호출을 게이트웨이로 (에이전트 LLM 에 붙이는 콜백)
+class LLMGatewayCallbackHandler(BaseCallbackHandler):
+    """호출 전 예산 확인(넘으면 실행 중단), 호출 후 토큰/지연/비용 기록"""
+
+    run_inline = True     # 예산 contextvar 를 호출한 컨텍스트에서 읽도록
+    raise_error = True    # LLMBudgetExceeded 로 에이전트 실행을 멈춤
+
+    def __init__(self, purpose: str = "agent"):
+        self.purpose = purpose
+        self._calls: Dict[UUID, tuple] = {}   # run_id → (모델, 프롬프트, 시작 시각)
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID, model: str, prompt: str):
+        _check_budget(_count(prompt), self.purpose)
+        with self._lock:
+            self._calls[run_id] = (model, prompt, time.perf_counter())
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        prompt = "\n".join(_message_text(m) for batch in messages for m in batch)
+        self._start(run_id, model_name(serialized, kwargs), prompt)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, model_name(serialized, kwargs), "\n".join(prompts))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            call = self._calls.pop(run_id, None)
+        if call is None:
+            return
+        model, prompt, start = call
+        usage = token_usage(response)
+        estimated = not usage
+        if estimated:
+            completion = "".join(g.text for gens in response.generations for g in gens)
+            usage = {"prompt_tokens": _count(prompt), "completion_tokens": _count(completion)}
+        record_llm_call(model, self.purpose, usage["prompt_tokens"], usage["completion_tokens"],
+                        time.perf_counter() - start, estimated)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            self._calls.pop(run_id, None)
+
+
+def _message_text(message) -> str:
+    """토큰 추정용 메시지 내용 (도구 호출 인자 포함)"""
+    text = str(message.content)
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        text += json.dumps([c.get("args") for c in tool_calls], ensure_ascii=False)
+    return text
+
+
+# ✅ 도구 결과 줄이기 (프롬프트에 들어가기 전에)
+def tool_output_limit() -> int:
+    """도구 결과 하나에 쓸 토큰 상한 (턴 예산이 얼마 안 남았으면 남은 양의 절반까지)"""
+    budget = _budget.get()
+    if budget is None:
+        return LLM_TOOL_OUTPUT_TOKENS
+    return max(0, min(LLM_TOOL_OUTPUT_TOKENS, budget.remaining_tokens // 2))
+
+
+def truncate_rows(rows: List[Dict], max_tokens: Optional[int] = None, max_rows: Optional[int] = None) -> List[Dict]:
+    """앞에서부터 토큰 상한 안에 들어가는 행만 남기고, 잘랐으면 남은 개수를 마지막 행으로 알림"""
+    limit = tool_output_limit() if max_tokens is None else max_tokens
+    kept, used = [], 0
+    for row in rows[:max_rows] if max_rows else rows:
+        cost = _count(json.dumps(row, ensure_ascii=False, default=str))
+        if used + cost > limit:
+            break
+        kept.append(row)
+        used += cost
+    if len(kept) < len(rows):
+        kept.append({"note": f"외 {len(rows) - len(kept)}건은 생략했습니다."})
+    return kept
+
+
+def truncate_text(text: str, max_tokens: Optional[int] = None) -> str:
+    """토큰 상한을 넘으면 줄 단위로 자름"""
+    limit = tool_output_limit() if max_tokens is None else max_tokens
+    if _count(text) <= limit:
+        return text
+    lines, used = [], 0
+    for line in text.splitlines():
+        cost = _count(line) + 1
+        if used + cost > limit:
+            break
+        lines.append(line)
+        used += cost
+    return "\n".join(lines) + "\n… (길이 제한으로 생략)"
+
+
+def limit_tool_output(output: Any, max_tokens: Optional[int] = None) -> Any:
+    """도구 결과 하나를 상한 안으로 (문자열은 줄 단위, 목록은 행 단위, dict 는 안의 목록을 나눠서)"""
+    limit = tool_output_limit() if max_tokens is None else max_tokens
+    if isinstance(output, str):
+        return truncate_text(output, limit)
+    if isinstance(output, list):
+        return truncate_rows(output, limit)
+    if isinstance(output, dict):
+        if _count(json.dumps(output, ensure_ascii=False, default=str)) <= limit:
+            return output
+        lists = [k for k, v in output.items() if isinstance(v, list)]
+        rest = {k: v for k, v in output.items() if k not in lists}
+        share = max(0, limit - _count(json.dumps(rest, ensure_ascii=False, default=str))) // max(1, len(lists))
+        # 턴 캐시에 든 원본은 그대로 두고 새 dict 로
+        return {k: truncate_rows(v, share) if k in lists else v for k, v in output.items()}
+    return output
+
+
+def _limited(func: Callable) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return limit_tool_output(func(*args, **kwargs))
+
+    return wrapper
+
+
+def limit_tool_outputs(tools: List) -> List:
+    """에이전트 도구마다 결과에 limit_tool_output 을 거는 사본 (원래 도구 객체는 그대로)"""
+    return [t.model_copy(update={"func": _limited(t.func)}) if getattr(t, "func", None) else t for t in tools]
@@ -1,24 +1,35 @@
-from openai import OpenAI
-import os
-from dotenv import load_dotenv
+from tools.llm_cache import make_cache_key, summary_cache
+from tools.llm_gateway import chat_completion
 
-load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=OPENAI_API_KEY)
+SUMMARY_MODEL = "gpt-4o"
+SUMMARY_SYSTEM_PROMPT = "당신은 지역화폐 정보를 요약하는 전문가입니다."
+SUMMARY_PROMPT_TEMPLATE = """다음은 지역상품권 리스트입니다. 중요한 지역/지원방식 특성을 요약해줘. 100자 이내 요약:
+{content}
+"""
 
 # ✅ 결과 요약
 def summarize_results(results: list) -> str:
-    content = "\n".join([f"{r['지역']} - {r['이름']} ({r['지원방식']})" for r in results[:20]])
-    prompt = f"""다음은 지역상품권 리스트입니다. 중요한 지역/지원방식 특성을 요약해줘. 100자 이내 요약:
-{content}
-"""
+    rows = results[:20]
+
+    # 같은 결과 집합이면 캐시된 요약을 재사용 (temperature=0)
+    key = make_cache_key(SUMMARY_MODEL, SUMMARY_SYSTEM_PROMPT + SUMMARY_PROMPT_TEMPLATE, rows)
+    cached = summary_cache.get(key)
+    if cached is not None:
+        return cached
+
+    content = "\n".join([f"{r['지역']} - {r['이름']} ({r['지원방식']})" for r in rows])
+    prompt = SUMMARY_PROMPT_TEMPLATE.format(content=content)
 
-    response = client.chat.completions.create(
-        model="gpt-4o",
+    # 토큰/비용 기록과 턴 예산 확인은 게이트웨이에서
+    response = chat_completion(
         messages=[
-            {"role": "system", "content": "당신은 지역화폐 정보를 요약하는 전문가입니다."},
+            {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
             {"role": "user", "content": prompt}
         ],
+        model=SUMMARY_MODEL,
+        purpose="summary",
         temperature=0
     )
-    return response.choices[0].message.content.strip()
+    summary = response.choices[0].message.content.strip()
+    summary_cache.put(key, summary)
+    return summary
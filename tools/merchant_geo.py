@@ -0,0 +1,236 @@
+import math
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.tools import tool
+
+from tools.geocoder import CachedGeocoder, Coord, GeocodeCache, default_backend
+from tools.merchant_store import MerchantStore, get_merchant_store
+from tools.turn_cache import memoize_per_turn
+
+EARTH_RADIUS_M = 6371000.0
+METERS_PER_DEG_LAT = 111320.0
+DEFAULT_RADIUS_M = 1000.0
+MAX_AUTO_RADIUS_M = 5000.0
+
+_DISTANCE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(km|킬로미터|킬로|m|미터)", re.IGNORECASE)
+_COORD_PATTERN = re.compile(r"(-?\d{1,2}\.\d+)\s*,\s*(-?\d{1,3}\.\d+)")
+
+
+def haversine_m(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """한 점에서 여러 점까지의 거리 (미터)"""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+# ✅ 격자 기반 공간 색인
+class GridIndex:
+    """위경도를 고정 크기 격자로 나눠, 주변 칸만 보고 반경/k-최근접 검색합니다."""
+
+    def __init__(self, lats: np.ndarray, lons: np.ndarray, cell_deg: float = 0.005):
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.cell_deg = cell_deg
+        rows = np.floor(self.lats / cell_deg).astype(np.int64)
+        cols = np.floor(self.lons / cell_deg).astype(np.int64)
+
+        self.cells: Dict[Tuple[int, int], np.ndarray] = {}
+        if len(rows):
+            order = np.lexsort((cols, rows))
+            keys = np.stack([rows[order], cols[order]], axis=1)
+            starts = np.flatnonzero(np.any(np.diff(keys, axis=0) != 0, axis=1)) + 1
+            for chunk in np.split(order, starts):
+                self.cells[(int(rows[chunk[0]]), int(cols[chunk[0]]))] = chunk
+            self.row_range = (int(rows.min()), int(rows.max()))
+            self.col_range = (int(cols.min()), int(cols.max()))
+
+    def __len__(self) -> int:
+        return len(self.lats)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg))
+
+    def _gather(self, r0: int, c0: int, dr: int, dc: int) -> np.ndarray:
+        (rlo, rhi), (clo, chi) = self.row_range, self.col_range
+        chunks = [self.cells[(r, c)]
+                  for r in range(max(r0 - dr, rlo), min(r0 + dr, rhi) + 1)
+                  for c in range(max(c0 - dc, clo), min(c0 + dc, chi) + 1)
+                  if (r, c) in self.cells]
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+
+    def _cell_meters(self, lat: float) -> Tuple[float, float]:
+        height = self.cell_deg * METERS_PER_DEG_LAT
+        width = height * max(math.cos(math.radians(lat)), 1e-6)
+        return height, width
+
+    def radius(self, lat: float, lon: float, radius_m: float) -> Tuple[np.ndarray, np.ndarray]:
+        """반경 안의 점 (가까운 순)"""
+        if not self.cells:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        height, width = self._cell_meters(lat)
+        r0, c0 = self._cell(lat, lon)
+        ids = self._gather(r0, c0, math.ceil(radius_m / height), math.ceil(radius_m / width))
+        dists = haversine_m(lat, lon, self.lats[ids], self.lons[ids])
+        keep = dists <= radius_m
+        ids, dists = ids[keep], dists[keep]
+        order = np.argsort(dists, kind="stable")
+        return ids[order], dists[order]
+
+    def _ring(self, r0: int, c0: int, ring: int) -> np.ndarray:
+        """중심에서 ring 칸 떨어진 테두리 칸들만 (점이 있는 행/열 범위로 잘라서)"""
+        if ring == 0:
+            return self.cells.get((r0, c0), np.empty(0, dtype=np.int64))
+        (rlo, rhi), (clo, chi) = self.row_range, self.col_range
+        keys = []
+        for r in (r0 - ring, r0 + ring):
+            if rlo <= r <= rhi:
+                keys += [(r, c) for c in range(max(c0 - ring, clo), min(c0 + ring, chi) + 1)]
+        for c in (c0 - ring, c0 + ring):
+            if clo <= c <= chi:
+                keys += [(r, c) for r in range(max(r0 - ring + 1, rlo), min(r0 + ring - 1, rhi) + 1)]
+        chunks = [self.cells[key] for key in keys if key in self.cells]
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+
+    def knn(self, lat: float, lon: float, k: int,
+            max_radius_m: float = MAX_AUTO_RADIUS_M) -> Tuple[np.ndarray, np.ndarray]:
+        """max_radius_m 안에서 가장 가까운 k개 (격자 고리를 한 겹씩 넓혀 가며 확정)"""
+        if not self.cells or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        height, width = self._cell_meters(lat)
+        r0, c0 = self._cell(lat, lon)
+        # 최대 반경이 닿는 고리까지, 그리고 점이 있는 범위를 벗어나면 더 볼 필요 없음
+        max_ring = min(
+            max(math.ceil(max_radius_m / height), math.ceil(max_radius_m / width)),
+            max(abs(r0 - self.row_range[0]), abs(r0 - self.row_range[1]),
+                abs(c0 - self.col_range[0]), abs(c0 - self.col_range[1])),
+        )
+        ids = np.empty(0, dtype=np.int64)
+        dists = np.empty(0)
+        for ring in range(max_ring + 1):
+            new_ids = self._ring(r0, c0, ring)
+            if len(new_ids):
+                ids = np.concatenate([ids, new_ids])
+                dists = np.concatenate([dists, haversine_m(lat, lon, self.lats[new_ids], self.lons[new_ids])])
+            # 고리 안쪽 반경보다 k번째 거리가 가까우면 확정
+            if len(ids) >= k and np.partition(dists, k - 1)[k - 1] <= ring * min(height, width):
+                break
+        keep = dists <= max_radius_m
+        ids, dists = ids[keep], dists[keep]
+        order = np.argsort(dists, kind="stable")[:k]
+        return ids[order], dists[order]
+
+
+# ✅ 가맹점 좌표 색인 + 기준 위치 해석
+class MerchantGeoIndex:
+    """지오코딩 캐시의 좌표로 가맹점 격자 색인을 만들고 근처 가맹점을 찾습니다."""
+
+    def __init__(self, store: MerchantStore, geocoder: CachedGeocoder):
+        self.store = store
+        self.geocoder = geocoder
+        df = store.df
+        addresses = [r or j for r, j in zip(df["도로명주소"], df["지번주소"])]
+        merchant_ids, lats, lons = [], [], []
+        for i, address in enumerate(addresses):
+            coord = geocoder.cache.get(address)
+            if coord is not None:
+                merchant_ids.append(i)
+                lats.append(coord[0])
+                lons.append(coord[1])
+        self.merchant_ids = np.asarray(merchant_ids, dtype=np.int64)
+        self.grid = GridIndex(np.asarray(lats), np.asarray(lons))
+
+    def resolve_anchor(self, text: str) -> Optional[Coord]:
+        """기준 위치: 지오코딩 캐시 → 같은 이름의 가맹점 좌표 → 지오코더"""
+        if text in self.geocoder.cache:
+            return self.geocoder.cache.get(text)
+        located = np.intersect1d(self.store.text_search(text), self.merchant_ids)
+        if len(located):
+            pos = int(np.searchsorted(self.merchant_ids, located[0]))
+            return float(self.grid.lats[pos]), float(self.grid.lons[pos])
+        return self.geocoder.geocode(text)
+
+    def nearby(self, lat: float, lon: float, cond: Dict[str, List[str]], k: int = 10,
+               radius_m: Optional[float] = None) -> List[Dict]:
+        """조건(시군구/지역화폐/업종)에 맞는 근처 가맹점. 반경이 없으면 k-최근접."""
+        filters = {f: v for f, v in cond.items() if f != "검색어" and v}
+        if not filters and radius_m is None:
+            pos, dists = self.grid.knn(lat, lon, k)
+            ids = self.merchant_ids[pos]
+        else:
+            allowed = self.store.match_ids(filters) if filters else None
+            search_radius = radius_m or DEFAULT_RADIUS_M
+            while True:
+                pos, dists = self.grid.radius(lat, lon, search_radius)
+                ids = self.merchant_ids[pos]
+                if allowed is not None:
+                    keep = np.isin(ids, allowed)
+                    ids, dists = ids[keep], dists[keep]
+                # 반경을 지정하지 않았으면 k개가 찰 때까지 넓힘
+                if radius_m is not None or len(ids) >= k or search_radius >= MAX_AUTO_RADIUS_M:
+                    break
+                search_radius *= 2
+
+        rows = self.store.rows(ids, limit=k)
+        for row, dist in zip(rows, dists[:k]):
+            row["거리m"] = int(round(float(dist)))
+        return rows
+
+    def search(self, query: str, k: int = 10) -> Dict:
+        """'익산역 근처 500m 음식점' 같은 질문 처리"""
+        anchor: Optional[Coord] = None
+        m = _COORD_PATTERN.search(query)
+        if m:
+            anchor = float(m.group(1)), float(m.group(2))
+            query = query[:m.start()] + " " + query[m.end():]
+
+        radius_m = None
+        m = _DISTANCE_PATTERN.search(query)
+        if m:
+            value = float(m.group(1))
+            radius_m = value * 1000 if m.group(2).lower() in ("km", "킬로미터", "킬로") else value
+            query = query[:m.start()] + " " + query[m.end():]
+
+        cond = self.store.parse_query(query)
+        anchor_text = " ".join(cond["검색어"])
+        if anchor is None:
+            if not anchor_text:
+                return {"error": "기준 위치(예: 익산역, 주소, 위도,경도)를 찾지 못했습니다."}
+            anchor = self.resolve_anchor(anchor_text)
+            if anchor is None:
+                return {"error": f"'{anchor_text}' 위치를 찾지 못했습니다."}
+
+        return {
+            "기준": anchor_text or f"{anchor[0]},{anchor[1]}",
+            "좌표": anchor,
+            "반경m": radius_m,
+            "가맹점": self.nearby(anchor[0], anchor[1], cond, k=k, radius_m=radius_m)
+        }
+
+
+_geo_index: Optional[MerchantGeoIndex] = None
+_geo_index_lock = threading.Lock()
+
+
+def get_merchant_geo_index() -> MerchantGeoIndex:
+    """프로세스 전역 가맹점 공간 색인"""
+    global _geo_index
+    if _geo_index is None:
+        with _geo_index_lock:
+            if _geo_index is None:
+                geocoder = CachedGeocoder(GeocodeCache(), default_backend())
+                _geo_index = MerchantGeoIndex(get_merchant_store(), geocoder)
+    return _geo_index
+
+
+@tool
+@memoize_per_turn
+def nearby_merchants(query: str) -> dict:
+    """기준 위치 근처의 지역화폐 가맹점을 가까운 순으로 찾습니다. 예: '익산역 근처 음식점', '군산시청 500m 카페', '35.94,126.95 근처 약국'"""
+    try:
+        return get_merchant_geo_index().search(query)
+    except Exception as e:
+        return {"error": str(e)}
@@ -0,0 +1,277 @@
+import glob
+import os
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from langchain_core.tools import tool
+
+from tools.filter_tool import FILLER_WORDS, split_words, strip_particle
+from tools.turn_cache import memoize_per_turn
+
+MERCHANT_CSV_DIR = "docs/create_csv/data"
+MERCHANT_STORE_PATH = os.getenv("MERCHANT_STORE_PATH", "data/merchants.parquet")
+
+# 원본 CSV 컬럼 → 저장 컬럼
+COLUMNS = {
+    "가맹점명": "가맹점명",
+    "사용가능지역화폐": "지역화폐",
+    "시도명": "시도명",
+    "시군구명": "시군구명",
+    "소재지도로명주소": "도로명주소",
+    "소재지지번주소": "지번주소",
+    "업종명": "업종명",
+    "주요상품": "주요상품",
+    "전화번호": "전화번호",
+    "데이터기준일자": "기준일자"
+}
+CATEGORY_COLUMNS = ["지역화폐", "시도명", "시군구명", "업종명", "업종분류"]
+# 업종분류 규칙이 바뀌면 올려서 저장된 Parquet 을 다시 만들게 함
+SCHEMA_VERSION = 2
+
+# 지역마다 제각각인 업종명을 묶는 대분류
+CATEGORY_KEYWORDS = {
+    "음식점": ["음식", "식당", "한식", "중식", "일식", "양식", "분식", "치킨", "주점", "카페", "커피", "제과", "식음료", "요식"],
+    "마트/소매": ["마트", "슈퍼", "편의점", "소매", "유통", "식자재", "잡화", "농산물", "수산물", "정육"],
+    "병원/약국": ["병원", "의원", "약국", "치과", "의료", "보건"],
+    "미용": ["미용", "이용", "헤어", "네일", "피부"],
+    "교육": ["학원", "교육", "서점", "문구"],
+    "숙박": ["숙박", "모텔", "호텔", "펜션", "민박"],
+    "주유/차량": ["주유", "연료", "자동차", "정비", "세차"]
+}
+# 질문에만 나오는 업종 표현
+CATEGORY_ALIASES = {"맛집": "음식점", "밥집": "음식점", "술집": "음식점", "빵집": "음식점"}
+
+MERCHANT_FILLER_WORDS = FILLER_WORDS | {
+    "가맹점", "가게", "매장", "사용처", "결제", "카드", "근처", "주변", "되나요", "돼", "있나요", "쓸수"
+}
+
+
+def _read_csv(path: str) -> pd.DataFrame:
+    """파일마다 다른 인코딩(UTF-8 BOM / CP949)을 처리해 읽습니다."""
+    for encoding in ("utf-8-sig", "cp949"):
+        try:
+            return pd.read_csv(path, encoding=encoding, dtype=str)
+        except UnicodeDecodeError:
+            continue
+    raise ValueError(f"CSV 인코딩을 알 수 없습니다: {path}")
+
+
+def _classify_business(name: str) -> str:
+    return _business_category(name) or "기타"
+
+
+def _business_category(text: str) -> Optional[str]:
+    return CATEGORY_ALIASES.get(text) or next(
+        (c for c, keywords in CATEGORY_KEYWORDS.items() if any(k in text for k in keywords)), None)
+
+
+# ✅ CSV → 정규화된 컬럼형 테이블
+def build_merchant_table(csv_dir: str = MERCHANT_CSV_DIR) -> pd.DataFrame:
+    """가맹점 CSV들을 하나의 정규화된 DataFrame(범주형 컬럼)으로 합칩니다."""
+    frames = []
+    for path in sorted(glob.glob(os.path.join(csv_dir, "*.csv"))):
+        df = _read_csv(path).rename(columns=str.strip)
+        frames.append(df[list(COLUMNS)].rename(columns=COLUMNS))
+    df = pd.concat(frames, ignore_index=True).fillna("")
+    for col in df.columns:
+        df[col] = df[col].str.strip()
+    df = df[df["가맹점명"] != ""].drop_duplicates().reset_index(drop=True)
+
+    # 업종명이 비어 있거나 "개인서비스업" 처럼 대분류를 알 수 없으면 주요상품 / 가맹점명으로 추정
+    df["업종분류"] = [
+        _business_category(business) or _classify_business(f"{product} {name}")
+        for business, product, name in zip(df["업종명"], df["주요상품"], df["가맹점명"])
+    ]
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype("category")
+    df.attrs["schema_version"] = SCHEMA_VERSION
+    return df
+
+
+def _bigrams(text: str) -> Iterable[str]:
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def _normalize_text(text: str) -> str:
+    return text.replace(" ", "").lower()
+
+
+# ✅ 가맹점 검색 엔진 (시군구/업종/지역화폐 색인 + 이름·주소 bigram 색인)
+class MerchantStore:
+    """정규화된 가맹점 테이블 위에 범주 색인과 n-gram 색인을 만들어 조건 검색합니다."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.by_region = {k: v for k, v in df.groupby("시군구명", observed=True).indices.items()}
+        self.by_currency = {k: v for k, v in df.groupby("지역화폐", observed=True).indices.items()}
+        self.by_business = {k: v for k, v in df.groupby("업종분류", observed=True).indices.items()}
+
+        # 이름 + 주소 검색용 텍스트와 bigram 역색인
+        self.texts = np.array([
+            _normalize_text(f"{n} {r} {j}")
+            for n, r, j in zip(df["가맹점명"], df["도로명주소"], df["지번주소"])
+        ], dtype=object)
+        postings: Dict[str, List[int]] = {}
+        for i, text in enumerate(self.texts):
+            for gram in _bigrams(text):
+                postings.setdefault(gram, []).append(i)
+        self.ngram_index = {g: np.asarray(ids, dtype=np.int32) for g, ids in postings.items()}
+
+        # 질문 해석용 어휘
+        self.region_aliases: Dict[str, str] = {}
+        for name in self.by_region:
+            self.region_aliases[name] = name
+            if name[-1] in "시군" and len(name) > 2:
+                self.region_aliases[name[:-1]] = name
+        self.currencies = list(self.by_currency)
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def text_search(self, term: str) -> np.ndarray:
+        """이름/주소에 term 이 들어간 행 번호"""
+        term = _normalize_text(term)
+        if len(term) < 2:
+            candidates = np.arange(len(self.texts))
+        else:
+            ids: Optional[np.ndarray] = None
+            for gram in sorted(_bigrams(term), key=lambda g: len(self.ngram_index.get(g, ()))):
+                posting = self.ngram_index.get(gram)
+                if posting is None:
+                    return np.empty(0, dtype=np.int32)
+                ids = posting if ids is None else np.intersect1d(ids, posting, assume_unique=True)
+                if len(ids) == 0:
+                    return ids
+            candidates = ids
+        # bigram 교집합은 후보일 뿐이므로 실제 포함 여부 확인
+        return np.asarray([i for i in candidates if term in self.texts[i]], dtype=np.int32)
+
+    def parse_query(self, query: str) -> Dict[str, List[str]]:
+        """질문을 시군구 / 지역화폐 / 업종 / 검색어로 나눕니다."""
+        cond: Dict[str, List[str]] = {"시군구명": [], "지역화폐": [], "업종분류": [], "업종어": [], "검색어": []}
+        for word in split_words(query):
+            token = strip_particle(word)
+            if word in MERCHANT_FILLER_WORDS or token in MERCHANT_FILLER_WORDS:
+                continue
+            if token in self.region_aliases:
+                cond["시군구명"].append(self.region_aliases[token])
+                continue
+            currencies = [c for c in self.currencies if len(token) >= 2 and token in c]
+            if currencies:
+                cond["지역화폐"].extend(currencies)
+                continue
+            category = _business_category(token)
+            if category:
+                # "구구식당", "미용실" 은 업종이면서 이름 검색어 → 업종어로 두고 업종분류와 합집합
+                cond["업종분류"].append(category)
+                cond["업종어"].append(token)
+                continue
+            cond["검색어"].append(token)
+        return {k: list(dict.fromkeys(v)) for k, v in cond.items()}
+
+    def match_ids(self, cond: Dict[str, List[str]]) -> np.ndarray:
+        """조건에 맞는 행 번호 (같은 필드는 합집합, 필드끼리는 교집합)
+
+        업종은 업종분류와 업종어 이름/주소 검색의 합집합이며, 이름에 업종어가 들어간 가게를 앞에 둡니다.
+        """
+        ids: Optional[np.ndarray] = None
+        for field, index in (("시군구명", self.by_region), ("지역화폐", self.by_currency),
+                             ("업종분류", self.by_business)):
+            values = cond.get(field, [])
+            if not values:
+                continue
+            field_ids = np.unique(np.concatenate(
+                [index.get(v, np.empty(0, dtype=np.int64)) for v in values]))
+            if field == "업종분류":
+                field_ids = np.union1d(field_ids, self._term_ids(cond.get("업종어", [])))
+            ids = field_ids if ids is None else np.intersect1d(ids, field_ids, assume_unique=True)
+        for term in cond.get("검색어", []):
+            term_ids = self.text_search(term)
+            ids = term_ids if ids is None else np.intersect1d(ids, term_ids, assume_unique=True)
+        if ids is None:
+            return np.empty(0, dtype=np.int64)
+        named = np.isin(ids, self._term_ids(cond.get("업종어", [])))
+        return np.concatenate([ids[named], ids[~named]])
+
+    def _term_ids(self, terms: List[str]) -> np.ndarray:
+        if not terms:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate([self.text_search(t) for t in terms]))
+
+    def rows(self, ids: np.ndarray, limit: int = 20) -> List[Dict]:
+        sub = self.df.iloc[ids[:limit]]
+        return [{
+            "가맹점명": r["가맹점명"],
+            "지역화폐": r["지역화폐"],
+            "주소": r["도로명주소"] or r["지번주소"],
+            "업종명": r["업종명"],
+            "전화번호": r["전화번호"]
+        } for r in sub.to_dict("records")]
+
+    def search(self, query: str, limit: int = 20) -> Dict:
+        cond = self.parse_query(query)
+        ids = self.match_ids(cond)
+        return {"조건": cond, "총개수": int(len(ids)), "가맹점": self.rows(ids, limit)}
+
+
+def _is_stale(path: str, csv_dir: str) -> bool:
+    if not os.path.exists(path):
+        return True
+    built = os.path.getmtime(path)
+    return any(os.path.getmtime(p) > built for p in glob.glob(os.path.join(csv_dir, "*.csv")))
+
+
+def build_merchant_store(path: str = MERCHANT_STORE_PATH, csv_dir: str = MERCHANT_CSV_DIR) -> pd.DataFrame:
+    """CSV를 정규화해 Parquet으로 저장합니다."""
+    df = build_merchant_table(csv_dir)
+    tmp_path = path + ".tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return df
+
+
+def load_merchant_store(path: str = MERCHANT_STORE_PATH, csv_dir: str = MERCHANT_CSV_DIR) -> MerchantStore:
+    """Parquet이 최신이면 읽고, 아니면 CSV에서 다시 만듭니다."""
+    df = None if _is_stale(path, csv_dir) else pd.read_parquet(path)
+    # 업종분류 규칙이 바뀐 뒤의 예전 Parquet 도 다시 만듦
+    if df is None or df.attrs.get("schema_version") != SCHEMA_VERSION:
+        try:
+            df = build_merchant_store(path, csv_dir)
+        except (ImportError, OSError):
+            # Parquet 엔진이 없거나 쓰기 불가능한 환경이면 메모리에서만 사용
+            df = build_merchant_table(csv_dir)
+    return MerchantStore(df)
+
+
+_merchant_store: Optional[MerchantStore] = None
+_merchant_store_lock = threading.Lock()
+
+
+def get_merchant_store() -> MerchantStore:
+    """프로세스 전역 가맹점 저장소 (세션 간 공유)"""
+    global _merchant_store
+    if _merchant_store is None:
+        with _merchant_store_lock:
+            if _merchant_store is None:
+                _merchant_store = load_merchant_store()
+    return _merchant_store
+
+
+@tool
+@memoize_per_turn
+def merchant_search(query: str) -> dict:
+    """지역화폐 가맹점을 검색합니다. 시군구, 지역화폐 이름, 업종, 가게 이름/주소로 찾습니다. 예: '익산 다이로움카드 되는 음식점'"""
+    try:
+        return get_merchant_store().search(query)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+if __name__ == "__main__":
+    # 사용법: python -m tools.merchant_store build
+    if len(sys.argv) > 1 and sys.argv[1] == "build":
+        table = build_merchant_store()
+        print(f"✅ 가맹점 {len(table)}건 → {MERCHANT_STORE_PATH}")
@@ -1,36 +1,241 @@
 # tools/naver_search_tool.py
-import requests
-from langchain_core.tools import tool
+import asyncio
+import concurrent.futures
 import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from langchain_core.tools import tool
+
+from monitoring.tracing import span
+from tools.filter_tool import PARTICLES, extract_conditions, split_words
+from tools.turn_cache import memoize_per_turn
 
 NAVER_CLIENT_ID = os.getenv("NAVER_CLIENT_ID")
 NAVER_CLIENT_SECRET = os.getenv("NAVER_CLIENT_SECRET")
+NAVER_LOCAL_URL = "https://openapi.naver.com/v1/search/local.json"
+# 재시도 대기 상한 (Retry-After 가 더 길어도 도구 호출 제한 시간 안에 끝나도록)
+MAX_RETRY_DELAY = 4.0
 
-@tool
-def naver_local_search(query: str) -> str:
-    """지역 기반 정보(맛집, 관광 등)를 검색합니다. 예: '대전 맛집', '충북 관광지'"""
-    url = "https://openapi.naver.com/v1/search/local.json"
-    headers = {
-        "X-Naver-Client-Id": NAVER_CLIENT_ID,
-        "X-Naver-Client-Secret": NAVER_CLIENT_SECRET,
-    }
-    params = {
-        "query": query,
-        "display": 5,
-        "start": 1,
-        "sort": "random"
-    }
-
-    response = requests.get(url, headers=headers, params=params)
-    items = response.json().get("items", [])
-
-    if not items:
-        return "검색 결과가 없습니다."
 
+# ✅ 비동기 네이버 지역검색 클라이언트 (연결 풀 + TTL 캐시 + 백오프)
+class NaverLocalClient:
+    """httpx.AsyncClient 하나를 재사용하고, 질의별 TTL 캐시와 429/5xx 재시도를 적용합니다."""
+
+    def __init__(self, client_id: Optional[str] = NAVER_CLIENT_ID,
+                 client_secret: Optional[str] = NAVER_CLIENT_SECRET,
+                 base_url: str = NAVER_LOCAL_URL, timeout: float = 3.0,
+                 cache_ttl: float = 600.0, cache_size: int = 1024,
+                 max_retries: int = 3, max_concurrency: int = 5):
+        self.base_url = base_url
+        self.headers = {
+            "X-Naver-Client-Id": client_id or "",
+            "X-Naver-Client-Secret": client_secret or "",
+        }
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self._cache: "OrderedDict[Tuple[str, int], Tuple[float, List[Dict]]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, int], asyncio.Future] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_concurrency * 2,
+                                    max_keepalive_connections=self.max_concurrency),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    def _cached(self, key) -> Optional[List[Dict]]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires, items = entry
+        if expires < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return items
+
+    def _store(self, key, items: List[Dict]):
+        self._cache[key] = (time.monotonic() + self.cache_ttl, items)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    def _retry_delay(response: Optional[httpx.Response], attempt: int) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(MAX_RETRY_DELAY, max(0.0, float(retry_after)))
+                except ValueError:
+                    pass
+        return min(MAX_RETRY_DELAY, 0.25 * (2 ** attempt)) * (0.5 + random.random() / 2)
+
+    async def _fetch(self, query: str, display: int) -> List[Dict]:
+        client = self._http()
+        params = {"query": query, "display": display, "start": 1, "sort": "random"}
+        for attempt in range(self.max_retries + 1):
+            last = attempt == self.max_retries
+            try:
+                async with self._semaphore:
+                    response = await client.get(self.base_url, params=params)
+            except httpx.TransportError:
+                if last:
+                    raise
+                await asyncio.sleep(self._retry_delay(None, attempt))
+                continue
+
+            # 429(호출 한도) / 5xx 는 Retry-After 또는 지수 백오프 후 재시도
+            if response.status_code == 429 or response.status_code >= 500:
+                if last:
+                    response.raise_for_status()
+                await asyncio.sleep(self._retry_delay(response, attempt))
+                continue
+            response.raise_for_status()
+            return response.json().get("items", [])
+        return []
+
+    async def search(self, query: str, display: int = 5) -> List[Dict]:
+        """질의 하나 검색 (캐시 → 진행 중인 같은 요청 공유 → 실제 요청)"""
+        key = (query, display)
+        items = self._cached(key)
+        if items is not None:
+            return items
+        if key in self._inflight:
+            # 기다리던 쪽 하나가 취소돼도 공유 future 는 그대로 (다른 대기자/요청 주인에게 영향 없음)
+            return await asyncio.shield(self._inflight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            items = await self._fetch(query, display)
+            self._store(key, items)
+            if not future.done():
+                future.set_result(items)
+            return items
+        except asyncio.CancelledError:
+            # 요청 주인이 제한 시간으로 취소되면 같은 요청을 기다리던 쪽도 함께 끝냄
+            future.cancel()
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+                # 기다리는 쪽이 없으면 "never retrieved" 경고가 나지 않도록 소비
+                future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def search_many(self, queries: List[str], display: int = 5) -> Dict[str, List[Dict]]:
+        """여러 질의를 동시에 검색 (지역별 fan-out)"""
+        results = await asyncio.gather(*(self.search(q, display) for q in queries), return_exceptions=True)
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors and len(errors) == len(results):
+            raise errors[0]
+        # 일부 지역만 실패하면 나머지 결과는 살림
+        return {q: ([] if isinstance(r, BaseException) else r) for q, r in zip(queries, results)}
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# ✅ 동기 코드(Streamlit, LangChain tool)에서 쓰기 위한 전용 이벤트 루프
+class _BackgroundLoop:
+    """연결 풀이 이벤트 루프에 묶여 있으므로, 루프 하나를 스레드에 띄워 계속 재사용합니다."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="naver-search-loop", daemon=True)
+        self.thread.start()
+
+    def run(self, coro, timeout: Optional[float] = None):
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            # 제한 시간이 지나면 루프에 남은 요청/재시도 대기도 취소
+            future.cancel()
+            raise
+
+
+_loop: Optional[_BackgroundLoop] = None
+_client: Optional[NaverLocalClient] = None
+_client_lock = threading.Lock()
+
+
+def get_naver_client() -> Tuple[NaverLocalClient, _BackgroundLoop]:
+    """프로세스 전역 클라이언트와 전용 루프"""
+    global _loop, _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _loop = _BackgroundLoop()
+                _client = NaverLocalClient()
+    return _client, _loop
+
+
+def split_region_queries(query: str) -> List[str]:
+    """'익산, 군산 맛집' → ['익산 맛집', '군산 맛집'] (같은 단위 지역이 둘 이상일 때만 나눔)"""
+    spans = extract_conditions(query)
+    fanout = []
+    for field in ("지역2", "지역1"):
+        fanout = [s for s in spans if s.field == field]
+        if len(fanout) >= 2:
+            break
+    if len(fanout) < 2:
+        return [query]
+
+    chars = list(query)
+    for span in fanout:
+        chars[span.start:span.end] = [" "] * (span.end - span.start)
+    # 지역 사이에 남은 접속 조사("이랑", "및" 등)는 버림
+    keyword = " ".join(w for w in split_words("".join(chars)) if w not in PARTICLES and w != "및")
+    return list(dict.fromkeys(f"{span.text} {keyword}".strip() for span in fanout))
+
+
+def _format_items(items: List[Dict]) -> str:
     result = ""
     for i, item in enumerate(items, 1):
         result += f"{i}. {item['title'].replace('<b>', '').replace('</b>', '')}\n"
         result += f"   📍 {item['address']}\n"
         result += f"   🔗 {item['link']}\n\n"
-
     return result
+
+
+@tool
+@memoize_per_turn
+def naver_local_search(query: str) -> str:
+    """지역 기반 정보(맛집, 관광 등)를 검색합니다. 예: '대전 맛집', '충북 관광지', '익산, 군산 맛집'"""
+    client, loop = get_naver_client()
+    queries = split_region_queries(query)
+    # 백그라운드 루프 스레드에서는 현재 스팬을 알 수 없으므로 호출하는 쪽에서 감쌈
+    with span("naver_local_search", queries=len(queries)) as s:
+        try:
+            results = loop.run(client.search_many(queries), timeout=client.timeout * (client.max_retries + 2))
+        except Exception as e:
+            s.error = f"{type(e).__name__}: {e}"
+            return f"검색 중 오류가 발생했습니다: {str(e)}"
+        s.set(items=sum(len(items) for items in results.values()))
+
+    if not any(results.values()):
+        return "검색 결과가 없습니다."
+    if len(queries) == 1:
+        return _format_items(results[queries[0]])
+    return "".join(f"[{q}]\n" + (_format_items(items) or "검색 결과가 없습니다.\n\n")
+                   for q, items in results.items())
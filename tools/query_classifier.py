@@ -1,5 +1,20 @@
-from typing import Literal
-from langchain_core.pydantic_v1 import BaseModel
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Literal, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+from monitoring.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+CLASSIFIER_HEAD_PATH = os.getenv("CLASSIFIER_HEAD_PATH", "data/query_classifier_head.npz")
+RESULT_CACHE_SIZE = 4096
 
 class QueryType(str):
     INTERNAL = "internal_search"
@@ -7,18 +22,57 @@ class QueryType(str):
     CALC = "calculator"
     ETC = "etc"
 
+LABELS = [QueryType.INTERNAL, QueryType.EXTERNAL, QueryType.CALC, QueryType.ETC]
+
 class QueryClassification(BaseModel):
     query: str
     query_type: Literal["internal_search", "external_search", "calculator", "etc"]
+    confidence: float = 1.0
+    method: Literal["embedding", "keyword"] = "keyword"
 
-def classify_query(query: str) -> QueryClassification:
+
+# ✅ 분류기 학습용 예시 질문 (라벨별)
+TRAINING_EXAMPLES: Dict[str, List[str]] = {
+    QueryType.INTERNAL: [
+        "충남 모바일 상품권 알려줘", "경기도 카드형 지역화폐", "전북 익산 지역사랑상품권",
+        "강원도 지류형 되는 곳", "부산에서 쓸 수 있는 상품권 종류", "세종 지역화폐 알려줘",
+        "모바일로 살 수 있는 지역화폐가 뭐가 있어?", "청주 상품권 카드로 돼?",
+        "대전 온통대전 모바일 지원해?", "충청도 상품권 정리해줘", "지역사랑상품권 지원방식 알려줘",
+        "익산 다이로움카드 되는 음식점", "군산 가맹점 알려줘", "수원 지역화폐 가맹점 어디야",
+        "종이 상품권 되는 지역 어디야", "상품권 링크 알려줘", "경상도 지역화폐 목록",
+        "제주 탐나는전 사용처", "전남 순천 상품권 구매 방법", "지류형 상품권 파는 시군",
+    ],
+    QueryType.EXTERNAL: [
+        "대전 맛집 추천해줘", "익산, 군산 맛집", "충북 관광지 알려줘", "강릉 카페 추천",
+        "전주 한옥마을 근처 명소", "부산 가볼 만한 곳", "여수 밤바다 근처 술집",
+        "경주 숙소 추천", "제주도 가족 여행 코스", "속초 회 맛있는 집",
+        "춘천 닭갈비 유명한 곳", "서울 데이트 코스 검색", "광주 주말에 갈 만한 곳",
+        "대구 빵집 추천", "통영 여행지", "인천 차이나타운 맛집",
+    ],
+    QueryType.CALC: [
+        "10만원 충전하면 10% 할인이면 얼마야", "5만원에 7% 적립되면 얼마", "30000 곱하기 3",
+        "12만원 나누기 4", "10만원 상품권 3장 사면 총 얼마", "20만원의 6% 계산해줘",
+        "50000 더하기 25000", "100000 빼기 15000", "할인 받으면 실제로 얼마 내?",
+        "한 달에 30만원씩 쓰면 일 년에 얼마", "8% 캐시백이면 50만원에 얼마 돌려받아",
+        "3만원 곱하기 12 계산",
+    ],
+    QueryType.ETC: [
+        "안녕", "고마워", "너는 누구야?", "오늘 날씨 어때", "뭘 할 수 있어?",
+        "도움말", "ㅋㅋㅋ", "잘 가", "심심해", "이름이 뭐야", "대동여지갑이 뭐야",
+        "사용법 알려줘",
+    ],
+}
+
+
+# ✅ 키워드 규칙 (임베딩 모델이 없을 때의 폴백, 빠른 경로의 사전 검사)
+def keyword_classify(query: str) -> QueryClassification:
     query = query.strip().lower()
 
     # 내부 DB 질의 판단 (ex. 상품권, 지역, 모바일, 카드형 등)
-    if any(keyword in query for keyword in ["상품권", "화폐", "카드형", "모바일", "지역"]):
+    if any(keyword in query for keyword in ["상품권", "화폐", "카드형", "지류형", "모바일", "지역"]):
         return QueryClassification(query=query, query_type=QueryType.INTERNAL)
 
-    # 계산 요청 (향후 대응)
+    # 계산 요청
     if any(keyword in query for keyword in ["계산", "얼마", "합", "나누기", "곱하기"]):
         return QueryClassification(query=query, query_type=QueryType.CALC)
 
@@ -28,3 +82,167 @@ def classify_query(query: str) -> QueryClassification:
 
     # 그 외 기타
     return QueryClassification(query=query, query_type=QueryType.ETC)
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    z = logits - logits.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+def _fit_softmax(x: np.ndarray, y: np.ndarray, n_classes: int, l2: float = 1e-3,
+                 lr: float = 0.5, epochs: int = 300):
+    """임베딩 위의 선형 softmax 헤드 (전체 배치 경사하강)"""
+    w = np.zeros((x.shape[1], n_classes), dtype="float64")
+    b = np.zeros(n_classes, dtype="float64")
+    onehot = np.eye(n_classes)[y]
+    for _ in range(epochs):
+        grad = (_softmax(x @ w + b) - onehot) / len(x)
+        w -= lr * (x.T @ grad + l2 * w)
+        b -= lr * grad.sum(axis=0)
+    return w, b
+
+
+def _fit_temperature(logits: np.ndarray, y: np.ndarray) -> float:
+    """교차검증 logit 의 NLL 을 최소로 하는 온도 (신뢰도 보정)"""
+    best_t, best_nll = 1.0, np.inf
+    for t in np.exp(np.linspace(np.log(0.05), np.log(20), 120)):
+        probs = _softmax(logits / t)
+        nll = -np.log(probs[np.arange(len(y)), y] + 1e-12).mean()
+        if nll < best_nll:
+            best_t, best_nll = float(t), nll
+    return best_t
+
+
+def examples_fingerprint(examples: Dict[str, List[str]], model_name: str) -> str:
+    payload = json.dumps([model_name, examples], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+# ✅ 임베딩 + 선형 헤드 분류기 (보정된 신뢰도, 배치 API, 결과 캐시)
+class EmbeddingQueryClassifier:
+    """예시 질문 임베딩으로 softmax 헤드를 학습하고, k-fold 로 온도를 맞춰 신뢰도를 보정합니다."""
+
+    def __init__(self, embed_fn: Callable[[List[str]], np.ndarray],
+                 examples: Dict[str, List[str]] = TRAINING_EXAMPLES,
+                 head_path: Optional[str] = None, model_name: str = "",
+                 cache_size: int = RESULT_CACHE_SIZE, folds: int = 4):
+        self.embed_fn = embed_fn
+        self.labels = [label for label in LABELS if examples.get(label)]
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, QueryClassification]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        fingerprint = examples_fingerprint(examples, model_name)
+        if not self._load_head(head_path, fingerprint):
+            self._train(examples, folds)
+            self._save_head(head_path, fingerprint)
+
+    def _train(self, examples: Dict[str, List[str]], folds: int):
+        texts = [t for label in self.labels for t in examples[label]]
+        y = np.array([i for i, label in enumerate(self.labels) for _ in examples[label]])
+        x = np.asarray(self.embed_fn(texts), dtype="float64")
+
+        # 교차검증 logit 으로 온도 보정 (학습 데이터에 과신하지 않도록)
+        order = np.random.default_rng(0).permutation(len(y))
+        oof = np.zeros((len(y), len(self.labels)))
+        for k in range(folds):
+            test = order[k::folds]
+            train = np.setdiff1d(order, test)
+            w, b = _fit_softmax(x[train], y[train], len(self.labels))
+            oof[test] = x[test] @ w + b
+        self.temperature = _fit_temperature(oof, y)
+        self.weights, self.bias = _fit_softmax(x, y, len(self.labels))
+
+    def _load_head(self, path: Optional[str], fingerprint: str) -> bool:
+        if not path or not os.path.exists(path):
+            return False
+        data = np.load(path, allow_pickle=False)
+        if str(data["fingerprint"]) != fingerprint:
+            return False
+        self.weights, self.bias = data["weights"], data["bias"]
+        self.temperature = float(data["temperature"])
+        self.labels = [str(label) for label in data["labels"]]
+        return True
+
+    def _save_head(self, path: Optional[str], fingerprint: str):
+        if not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp_path = path + ".tmp.npz"
+            np.savez(tmp_path, weights=self.weights, bias=self.bias, temperature=self.temperature,
+                     labels=np.array(self.labels), fingerprint=fingerprint)
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.warning("분류기 헤드를 저장하지 못했습니다: %s", path)
+
+    def predict_proba(self, queries: List[str]) -> np.ndarray:
+        x = np.asarray(self.embed_fn(queries), dtype="float64")
+        return _softmax((x @ self.weights + self.bias) / self.temperature)
+
+    def classify_batch(self, queries: List[str]) -> List[QueryClassification]:
+        """캐시에 없는 질의만 모아서 한 번에 임베딩/분류합니다."""
+        keys = [q.strip().lower() for q in queries]
+        with self._lock:
+            results = {k: self._cache[k] for k in keys if k in self._cache}
+            for k in results:
+                self._cache.move_to_end(k)
+        missing = [k for k in dict.fromkeys(keys) if k not in results]
+        if missing:
+            probs = self.predict_proba(missing)
+            best = probs.argmax(axis=1)
+            fresh = {
+                k: QueryClassification(query=k, query_type=self.labels[i],
+                                       confidence=round(float(p[i]), 4), method="embedding")
+                for k, p, i in zip(missing, probs, best)
+            }
+            results.update(fresh)
+            with self._lock:
+                self._cache.update(fresh)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return [results[k] for k in keys]
+
+    def classify(self, query: str) -> QueryClassification:
+        return self.classify_batch([query])[0]
+
+
+_classifier: Optional[EmbeddingQueryClassifier] = None
+_classifier_failed = False
+_classifier_lock = threading.Lock()
+
+
+def get_query_classifier() -> Optional[EmbeddingQueryClassifier]:
+    """KURE 임베딩 분류기 (모델을 쓸 수 없는 환경이면 None → 키워드 규칙 사용)"""
+    global _classifier, _classifier_failed
+    if _classifier is None and not _classifier_failed:
+        with _classifier_lock:
+            if _classifier is None and not _classifier_failed:
+                try:
+                    from tools.embedding_model import MODEL_NAME, embed_queries
+
+                    _classifier = EmbeddingQueryClassifier(
+                        embed_queries, head_path=CLASSIFIER_HEAD_PATH, model_name=MODEL_NAME
+                    )
+                except (ImportError, OSError) as e:
+                    logger.warning("임베딩 분류기를 쓸 수 없어 키워드 규칙으로 분류합니다: %s", e)
+                    _classifier_failed = True
+    return _classifier
+
+
+@traced()
+def classify_queries(queries: List[str]) -> List[QueryClassification]:
+    """배치 분류"""
+    classifier = get_query_classifier()
+    if classifier is None:
+        return [keyword_classify(q) for q in queries]
+    return classifier.classify_batch(queries)
+
+
+@traced()
+def classify_query(query: str) -> QueryClassification:
+    classifier = get_query_classifier()
+    if classifier is None:
+        return keyword_classify(query)
+    return classifier.classify(query)
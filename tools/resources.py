@@ -0,0 +1,64 @@
+import os
+import threading
+from functools import wraps
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_resources = {}
+_resources_lock = threading.RLock()
+
+
+# ✅ 프로세스 전역 리소스 캐시 (st.cache_resource 와 같은 역할, Streamlit 없이도 동작)
+def cached_resource(fn):
+    """인자 없는 팩토리를 처음 호출할 때 한 번만 실행하고, 이후 모든 세션이 같은 객체를 공유합니다."""
+    key = f"{fn.__module__}.{fn.__qualname__}"
+
+    @wraps(fn)
+    def wrapper():
+        try:
+            return _resources[key]
+        except KeyError:
+            pass
+        with _resources_lock:
+            if key not in _resources:
+                _resources[key] = fn()
+            return _resources[key]
+
+    wrapper.clear = lambda: _resources.pop(key, None)
+    # 테스트/벤치마크에서 가짜 객체로 바꿔 끼울 때
+    wrapper.set = lambda value: _resources.__setitem__(key, value)
+    return wrapper
+
+
+def get_openai_api_key() -> str:
+    """환경변수 → Streamlit secrets 순으로 OpenAI API 키를 찾습니다."""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if api_key:
+        return api_key
+    import streamlit as st
+
+    return st.secrets["OPENAI_API_KEY"]
+
+
+@cached_resource
+def get_openai_client():
+    """요약 등에 쓰는 OpenAI 클라이언트 (연결 풀 공유)"""
+    from openai import OpenAI
+
+    return OpenAI(api_key=get_openai_api_key())
+
+
+@cached_resource
+def get_chat_llm():
+    """에이전트용 ChatOpenAI"""
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model="gpt-4",
+        temperature=0,
+        streaming=True,
+        stream_usage=True,  # 스트리밍에서도 토큰 사용량 받기 (트레이싱)
+        api_key=get_openai_api_key()
+    )
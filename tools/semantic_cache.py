@@ -0,0 +1,241 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from monitoring.tracing import traced
+from tools.coupon_store import get_coupon_store
+from tools.filter_tool import FILLER_WORDS, parse_conditions, split_words, strip_particle
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "1") != "0"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))   # 코사인 유사도
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", str(6 * 3600)))       # 초
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "2048"))
+
+
+def normalize_query(query: str) -> str:
+    """대소문자/공백/문장부호/군더더기 말("알려줘" 등)을 정리한 질문"""
+    words = []
+    for token in split_words(query.lower()):
+        if token in FILLER_WORDS or strip_particle(token) in FILLER_WORDS:
+            continue
+        words.append(token)
+    return " ".join(words)
+
+
+# 부정 표현: "모바일 안 되는" 과 "모바일 되는" 은 한 단어 차이라 임베딩이 거의 같으므로 캐시하지 않음
+NEGATION_WORDS = {"안", "못", "없는", "없음", "말고", "제외", "빼고", "불가", "불가능한"}
+_NEGATION_PREFIXES = ("안되", "안돼", "못", "없", "제외", "빼고", "말고")
+
+
+def has_negation(query: str) -> bool:
+    """질문에 부정/제외 표현이 있는지"""
+    for token in split_words(query):
+        if strip_particle(token) in NEGATION_WORDS or token.startswith(_NEGATION_PREFIXES):
+            return True
+    return False
+
+
+def condition_key(cond: Dict[str, List[str]]) -> str:
+    """parse_conditions 결과 → 순서와 무관한 키 (지역이 다르면 절대 같은 칸에 들어가지 않음)"""
+    return json.dumps({k: sorted(v) for k, v in sorted(cond.items())}, ensure_ascii=False)
+
+
+class CacheHit(NamedTuple):
+    output: str
+    similarity: float
+    query: str          # 캐시에 저장될 때의 원래 질문
+
+
+class _Entry:
+    __slots__ = ("query", "normalized", "cond_key", "vector", "output", "created")
+
+    def __init__(self, query, normalized, cond_key, vector, output):
+        self.query = query
+        self.normalized = normalized
+        self.cond_key = cond_key
+        self.vector = vector
+        self.output = output
+        self.created = time.time()
+
+
+# ✅ 의미 기반 응답 캐시 (조건 키로 나눈 작은 코사인 인덱스)
+class SemanticResponseCache:
+    """표현만 다른 같은 질문이면 에이전트를 다시 부르지 않고 이전 답변을 돌려줍니다.
+
+    parse_conditions 결과가 같은 항목끼리만 비교하고, 그 안에서 정규화 질문 임베딩의
+    코사인 유사도가 threshold 이상이면 적중입니다. 데이터셋이 바뀌면(CouponStore.version) 전부 비웁니다.
+    부정/제외 표현("안 되는", "말고")이 있는 질문은 조회도 저장도 하지 않습니다.
+    """
+
+    def __init__(self, embed_fn: Optional[Callable[[List[str]], np.ndarray]] = None,
+                 threshold: float = SEMANTIC_CACHE_THRESHOLD, ttl: float = SEMANTIC_CACHE_TTL,
+                 max_items: int = SEMANTIC_CACHE_SIZE,
+                 version_fn: Optional[Callable[[], int]] = None):
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_items = max_items
+        self.version_fn = version_fn or _dataset_version
+        self.enabled = True
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()   # (조건 키, 정규화 질문) → 항목, LRU 순
+        self._groups: Dict[str, Dict[str, _Entry]] = {}                          # 조건 키 → 정규화 질문 → 항목
+        self._matrices: Dict[str, Tuple[List[_Entry], np.ndarray]] = {}          # 조건 키 → 임베딩 행렬 (지연 생성)
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "skipped": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        if self.embed_fn is None:
+            return None
+        try:
+            vector = np.asarray(self.embed_fn([text])[0], dtype="float32")
+        except (ImportError, OSError) as e:
+            # 임베딩 모델이 없는 환경이면 정규화 문자열 일치만 사용
+            logger.warning("의미 캐시 임베딩을 쓸 수 없어 문자열 일치만 사용합니다: %s", e)
+            self.embed_fn = None
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _check_version(self):
+        version = self.version_fn()
+        if version != self._version:
+            self._clear()
+            self._version = version
+
+    def _clear(self):
+        self._entries.clear()
+        self._groups.clear()
+        self._matrices.clear()
+
+    def _remove(self, key: Tuple[str, str]):
+        cond_key, normalized = key
+        self._entries.pop(key, None)
+        group = self._groups.get(cond_key, {})
+        group.pop(normalized, None)
+        if not group:
+            self._groups.pop(cond_key, None)
+        self._matrices.pop(cond_key, None)   # 다음 조회 때 다시 만듦
+
+    def _matrix(self, cond_key: str) -> Tuple[List[_Entry], Optional[np.ndarray]]:
+        cached = self._matrices.get(cond_key)
+        if cached is None:
+            entries = [e for e in self._groups.get(cond_key, {}).values() if e.vector is not None]
+            if not entries:
+                return [], None
+            cached = self._matrices[cond_key] = (entries, np.stack([e.vector for e in entries]))
+        return cached
+
+    def _expired(self, entry: _Entry) -> bool:
+        return time.time() - entry.created > self.ttl
+
+    def lookup(self, query: str, cond: Optional[Dict[str, List[str]]] = None) -> Optional[CacheHit]:
+        if not self.enabled:
+            return None
+        if has_negation(query):
+            with self._lock:
+                self.stats["skipped"] += 1
+            return None
+        normalized = normalize_query(query)
+        cond_key = condition_key(cond if cond is not None else parse_conditions(query))
+        with self._lock:
+            self._check_version()
+            # 1) 정규화 문자열이 같으면 임베딩 없이 적중
+            entry = self._entries.get((cond_key, normalized))
+            if entry is not None and self._expired(entry):
+                self._remove((cond_key, normalized))
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end((cond_key, normalized))
+                self.stats["exact_hits"] += 1
+                return CacheHit(entry.output, 1.0, entry.query)
+            has_candidates = cond_key in self._groups
+
+        # 2) 같은 조건 키 안에서 코사인 유사도 (후보가 없으면 임베딩도 생략)
+        vector = self._embed(normalized) if has_candidates else None
+        if vector is None:
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+        with self._lock:
+            entries, matrix = self._matrix(cond_key)
+            if matrix is not None:
+                scores = matrix @ vector
+                for i in np.argsort(-scores):
+                    if scores[i] < self.threshold:
+                        break
+                    entry = entries[i]
+                    key = (cond_key, entry.normalized)
+                    if self._entries.get(key) is not entry:
+                        continue
+                    if self._expired(entry):
+                        self._remove(key)
+                        continue
+                    self._entries.move_to_end(key)
+                    self.stats["semantic_hits"] += 1
+                    return CacheHit(entry.output, round(float(scores[i]), 4), entry.query)
+            self.stats["misses"] += 1
+        return None
+
+    def store(self, query: str, output: str, cond: Optional[Dict[str, List[str]]] = None):
+        if not self.enabled or not output or has_negation(query):
+            return
+        normalized = normalize_query(query)
+        cond_key = condition_key(cond if cond is not None else parse_conditions(query))
+        vector = self._embed(normalized)
+        with self._lock:
+            self._check_version()
+            key = (cond_key, normalized)
+            entry = _Entry(query, normalized, cond_key, vector, output)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._groups.setdefault(cond_key, {})[normalized] = entry
+            self._matrices.pop(cond_key, None)
+            while len(self._entries) > self.max_items:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+
+def _dataset_version() -> int:
+    store = get_coupon_store()
+    store.refresh()
+    return store.version
+
+
+_semantic_cache: Optional[SemanticResponseCache] = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticResponseCache:
+    """프로세스 전역 의미 캐시 (질문 임베딩은 KURE, embed_queries 의 LRU 를 분류기와 함께 씀)"""
+    global _semantic_cache
+    if _semantic_cache is None:
+        with _semantic_cache_lock:
+            if _semantic_cache is None:
+                def embed(texts: List[str]) -> np.ndarray:
+                    from tools.embedding_model import embed_queries
+
+                    return embed_queries(texts)
+
+                _semantic_cache = SemanticResponseCache(embed)
+                _semantic_cache.enabled = SEMANTIC_CACHE_ENABLED
+    return _semantic_cache
+
+
+@traced("semantic_cache.lookup")
+def lookup_cached_answer(query: str, cond: Dict[str, List[str]]) -> Optional[CacheHit]:
+    return get_semantic_cache().lookup(query, cond)
@@ -0,0 +1,71 @@
+import contextvars
+import json
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Dict, Optional, Tuple
+
+_current: contextvars.ContextVar[Optional["TurnCache"]] = contextvars.ContextVar("turn_cache", default=None)
+
+
+# ✅ 한 턴 안에서만 유효한 도구 결과 메모
+class TurnCache:
+    """(함수, 인자) → 결과. 같은 호출이 동시에 들어오면 먼저 시작한 쪽의 결과를 기다려 함께 씁니다."""
+
+    def __init__(self):
+        self._futures: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get_or_compute(self, key: Tuple[str, str], compute):
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = self._futures[key] = Future()
+                self.stats["misses"] += 1
+            else:
+                self.stats["hits"] += 1
+        if not owner:
+            return future.result()
+        try:
+            result = compute()
+        except BaseException as e:
+            # 실패한 호출은 메모하지 않음 (기다리던 쪽에는 같은 예외 전달)
+            with self._lock:
+                self._futures.pop(key, None)
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result
+
+
+@contextmanager
+def turn_scope():
+    """이 블록 안(스레드/태스크로 복사된 컨텍스트 포함)의 memoize_per_turn 호출이 결과를 공유"""
+    cache = TurnCache()
+    token = _current.set(cache)
+    try:
+        yield cache
+    finally:
+        _current.reset(token)
+
+
+def current_turn_cache() -> Optional[TurnCache]:
+    return _current.get()
+
+
+def memoize_per_turn(fn):
+    """turn_scope 안에서는 같은 인자의 호출을 한 번만 실행 (밖에서는 그대로 호출)"""
+    name = f"{fn.__module__}.{fn.__qualname__}"
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs) -> Any:
+        cache = _current.get()
+        if cache is None:
+            return fn(*args, **kwargs)
+        key = (name, json.dumps([args, kwargs], ensure_ascii=False, sort_keys=True, default=str))
+        return cache.get_or_compute(key, lambda: fn(*args, **kwargs))
+
+    return wrapper
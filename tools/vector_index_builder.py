@@ -0,0 +1,279 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from tools.coupon_store import COUPON_DATA_PATH
+from tools.vector_search_tool import (INDEX_TYPES, MANIFEST_NAME, VECTOR_DB_PATH, index_filename,
+                                      read_manifest)
+
+HNSW_M = int(os.getenv("HNSW_M", "32"))
+PQ_SUBVECTOR_DIM = int(os.getenv("PQ_SUBVECTOR_DIM", "16"))  # PQ 서브벡터 하나의 차원
+
+COUPON_XLSM_PATH = "data/지역사랑상품권_현황_link.xlsm"
+
+# 지원방식 → 원본 스프레드시트 열 이름 (순서가 JSONL 문장 순서)
+SUPPORT_COLUMNS = {
+    "지류형": "지류형 지원여부",
+    "모바일": "모바일 지원여부",
+    "카드형": "카드형 지원여부",
+}
+
+
+# ✅ 원본 데이터 → JSONL 레코드
+def make_record(region1: str, region2: str, name: str, supported: List[str], link: str) -> Dict:
+    """전처리 JSONL 과 같은 문장 템플릿/메타데이터 형식으로 레코드 생성"""
+    supported = [t for t in SUPPORT_COLUMNS if t in supported]
+    unsupported = [t for t in SUPPORT_COLUMNS if t not in supported]
+    sentence = f"{region1} {region2}에서는 \"{name}\"이 제공되며, "
+    if supported and unsupported:
+        sentence += f"{', '.join(supported)}은 지원되며 그리고 {', '.join(unsupported)}은 지원되지 않습니다."
+    elif supported:
+        sentence += f"{', '.join(supported)}은 지원되며."
+    else:
+        sentence += f"{', '.join(unsupported)}은 지원되지 않습니다."
+    return {
+        "content": f"{sentence} [자세히 보기]({link})",
+        "metadata": {
+            "지역1": region1,
+            "지역2": region2,
+            "이름": name,
+            "지원방식": supported,
+            "비지원방식": unsupported,
+            "링크": link,
+        },
+    }
+
+
+def load_xlsm_records(path: str = COUPON_XLSM_PATH) -> List[Dict]:
+    """지역사랑상품권_현황_link.xlsm 첫 시트를 레코드로 변환 (openpyxl 필요)"""
+    import pandas as pd
+
+    df = pd.read_excel(path, sheet_name=0, dtype=str).fillna("")
+    records = []
+    for values in df.to_dict("records"):
+        if not values.get("이름", "").strip():
+            continue
+        supported = [t for t, col in SUPPORT_COLUMNS.items() if values.get(col, "").strip()]
+        records.append(make_record(
+            values["지역1"].strip(), values["지역2"].strip(), values["이름"].strip(),
+            supported, values.get("url주소", "").strip(),
+        ))
+    return records
+
+
+def load_jsonl_records(path: str = COUPON_DATA_PATH) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_jsonl_records(records: List[Dict], path: str = COUPON_DATA_PATH):
+    """JSONL 원자적 교체 (CouponStore 는 mtime 으로 다시 읽음)"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, path)
+
+
+# ✅ 레코드 식별자 / 내용 해시
+def record_id(record: Dict) -> int:
+    """(지역1, 지역2, 이름) 기준 안정적인 int64 id (행 순서가 바뀌어도 유지)"""
+    meta = record["metadata"]
+    key = f"{meta['지역1']}\t{meta['지역2']}\t{meta['이름']}".encode("utf-8")
+    return int.from_bytes(hashlib.sha1(key).digest()[:8], "big") & 0x7FFF_FFFF_FFFF_FFFF
+
+
+def record_hash(record: Dict) -> str:
+    """임베딩 대상 문장의 해시 (바뀌면 다시 임베딩)"""
+    return hashlib.sha256(record["content"].encode("utf-8")).hexdigest()[:16]
+
+
+# ✅ 인덱스 종류별 생성 (모두 IDMap2 로 감싸 레코드 id 유지)
+def make_index(index_type: str, vectors: np.ndarray, ids: np.ndarray):
+    """벡터/레코드 id 로 학습·적재까지 끝난 인덱스"""
+    import faiss
+
+    n, d = vectors.shape
+    if index_type == "flat":
+        base = faiss.IndexFlatIP(d)
+    elif index_type == "sq8":
+        base = faiss.IndexScalarQuantizer(d, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+    elif index_type == "hnsw":
+        base = faiss.IndexHNSWFlat(d, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+    elif index_type == "ivfpq":
+        nlist = max(1, min(int(4 * np.sqrt(n)), n // 39))
+        m = d // PQ_SUBVECTOR_DIM if d % PQ_SUBVECTOR_DIM == 0 else 1
+        # 코드북 학습에 센트로이드당 충분한 샘플이 없으면 비트 수를 줄임
+        nbits = 8 if n >= 39 * 256 else max(4, min(8, int(np.log2(max(n // 39, 16)))))
+        base = faiss.IndexIVFPQ(faiss.IndexFlatIP(d), d, nlist, m, nbits, faiss.METRIC_INNER_PRODUCT)
+    else:
+        raise ValueError(f"알 수 없는 인덱스 종류: {index_type}")
+    index = faiss.IndexIDMap2(base)
+    if not index.is_trained:
+        index.train(vectors)
+    index.add_with_ids(vectors, ids)
+    return index
+
+
+def stored_vectors(index):
+    """flat 인덱스에서 (벡터, id) 복원. IDMap 이 아니면(예전 IndexFlatIP) id 는 저장 순서"""
+    import faiss
+
+    # downcast 결과는 메모리를 소유하지 않으므로 원래 index 참조를 살려 둔 채로 씀
+    typed = faiss.downcast_index(index)
+    if isinstance(typed, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        ids = faiss.vector_to_array(typed.id_map).astype("int64")
+        vectors = faiss.downcast_index(typed.index).reconstruct_n(0, typed.ntotal)
+    else:
+        ids = np.arange(typed.ntotal, dtype="int64")
+        vectors = typed.reconstruct_n(0, typed.ntotal)
+    return vectors, ids
+
+
+def _write_db(db_path: str, index, docs: List[Dict], manifest: Dict, variants: Optional[Dict] = None):
+    """새 디렉터리에 전부 쓴 뒤 rename 으로 교체 (읽는 쪽이 반쯤 쓴 파일을 보지 않도록)"""
+    import faiss
+
+    parent = os.path.dirname(os.path.abspath(db_path))
+    staging = os.path.join(parent, f".{os.path.basename(db_path)}.staging-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    faiss.write_index(index, os.path.join(staging, index_filename("flat")))
+    for index_type, variant in (variants or {}).items():
+        faiss.write_index(variant, os.path.join(staging, index_filename(index_type)))
+    with open(os.path.join(staging, "index.pkl"), "wb") as f:
+        pickle.dump(docs, f)
+    with open(os.path.join(staging, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+    backup = None
+    if os.path.exists(db_path):
+        backup = os.path.join(parent, f".{os.path.basename(db_path)}.old-{os.getpid()}")
+        os.replace(db_path, backup)
+    os.replace(staging, db_path)
+    if backup:
+        shutil.rmtree(backup, ignore_errors=True)
+
+
+def _load_existing(db_path: str, model_name: str):
+    """증분 갱신이 가능한 기존 인덱스(IDMap + manifest, 같은 모델)면 돌려주고, 아니면 None"""
+    import faiss
+
+    manifest = read_manifest(db_path)
+    if manifest is None or manifest.get("model") != model_name:
+        return None, None
+    index = faiss.read_index(os.path.join(db_path, index_filename("flat")))
+    if not isinstance(index, faiss.IndexIDMap2):
+        return None, None
+    return index, manifest
+
+
+# ✅ 증분 빌드
+def build_index(records: List[Dict], db_path: str = VECTOR_DB_PATH,
+                embed_fn: Optional[Callable[[List[str]], np.ndarray]] = None,
+                model_name: Optional[str] = None, batch_size: Optional[int] = None,
+                source: str = "", full: bool = False, variants: List[str] = ()) -> Dict:
+    """새로 추가/변경된 레코드만 임베딩해 인덱스를 갱신하고 manifest 를 돌려줍니다.
+
+    variants 로 지정한 압축 인덱스(sq8/hnsw/ivfpq)는 flat 인덱스에 저장된 벡터로 다시 만듭니다 (재임베딩 없음).
+    """
+    import faiss
+
+    if embed_fn is None or model_name is None:
+        from tools.embedding_model import EMBED_BATCH_SIZE, MODEL_NAME, embed_texts
+
+        model_name = model_name or MODEL_NAME
+        size = batch_size or EMBED_BATCH_SIZE
+        embed_fn = embed_fn or (lambda texts: embed_texts(texts, batch_size=size))
+
+    ids = [record_id(r) for r in records]
+    if len(set(ids)) != len(ids):
+        raise ValueError("(지역1, 지역2, 이름)이 중복된 레코드가 있습니다.")
+    hashes = {i: record_hash(r) for i, r in zip(ids, records)}
+
+    previous = read_manifest(db_path)
+    index, manifest = (None, None) if full else _load_existing(db_path, model_name)
+    old_hashes = {int(k): v for k, v in manifest["records"].items()} if manifest else {}
+
+    removed = [i for i in old_hashes if i not in hashes]
+    changed = [i for i in ids if i in old_hashes and old_hashes[i] != hashes[i]]
+    added = [i for i in ids if i not in old_hashes]
+
+    to_embed = changed + added
+    by_id = dict(zip(ids, records))
+    vectors = None
+    if to_embed:
+        vectors = np.ascontiguousarray(embed_fn([by_id[i]["content"] for i in to_embed]), dtype="float32")
+        faiss.normalize_L2(vectors)
+    if index is None:
+        if vectors is None:
+            raise ValueError("인덱싱할 레코드가 없습니다.")
+        index = faiss.IndexIDMap2(faiss.IndexFlatIP(vectors.shape[1]))
+
+    if removed or changed:
+        index.remove_ids(np.asarray(removed + changed, dtype="int64"))
+    if to_embed:
+        index.add_with_ids(vectors, np.asarray(to_embed, dtype="int64"))
+
+    built_variants = {}
+    if variants:
+        all_vectors, all_ids = stored_vectors(index)
+        for index_type in variants:
+            if index_type != "flat":
+                built_variants[index_type] = make_index(index_type, all_vectors, all_ids)
+
+    new_manifest = {
+        "version": (previous["version"] + 1) if previous else 1,
+        "model": model_name,
+        "dim": int(index.d),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "source": source,
+        "count": int(index.ntotal),
+        "variants": sorted(built_variants),
+        "stats": {"added": len(added), "changed": len(changed), "removed": len(removed),
+                  "unchanged": len(ids) - len(added) - len(changed)},
+        # 검색 결과 id → docs 위치 매핑용 (docs 와 같은 순서)
+        "ids": [str(i) for i in ids],
+        "records": {str(i): h for i, h in hashes.items()},
+    }
+    _write_db(db_path, index, records, new_manifest, built_variants)
+    return new_manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="지역사랑상품권 FAISS 인덱스 증분 빌드")
+    parser.add_argument("--from-xlsm", nargs="?", const=COUPON_XLSM_PATH,
+                        help="스프레드시트에서 JSONL 을 다시 만든 뒤 빌드")
+    parser.add_argument("--jsonl", default=COUPON_DATA_PATH)
+    parser.add_argument("--db", default=VECTOR_DB_PATH)
+    parser.add_argument("--batch-size", type=int, default=None, help="임베딩 배치 크기 (기본 EMBED_BATCH_SIZE)")
+    parser.add_argument("--full", action="store_true", help="기존 인덱스를 무시하고 전부 다시 임베딩")
+    parser.add_argument("--variants", default="", help=f"함께 만들 압축 인덱스 (쉼표 구분: {', '.join(INDEX_TYPES[1:])})")
+    args = parser.parse_args()
+
+    if args.from_xlsm:
+        records = load_xlsm_records(args.from_xlsm)
+        write_jsonl_records(records, args.jsonl)
+        source = args.from_xlsm
+    else:
+        records = load_jsonl_records(args.jsonl)
+        source = args.jsonl
+
+    variants = [v.strip() for v in args.variants.split(",") if v.strip()]
+    manifest = build_index(records, args.db, batch_size=args.batch_size, source=source, full=args.full,
+                           variants=variants)
+    stats = manifest["stats"]
+    print(f"✅ v{manifest['version']} {manifest['count']}건 → {args.db} "
+          f"(추가 {stats['added']}, 변경 {stats['changed']}, 삭제 {stats['removed']}, 유지 {stats['unchanged']})")
+
+
+if __name__ == "__main__":
+    # 사용법: python -m tools.vector_index_builder [--from-xlsm] [--batch-size 16] [--full]
+    main()
@@ -0,0 +1,189 @@
+import json
+import logging
+import os
+import pickle
+import threading
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from langchain_core.tools import tool
+
+from tools.coupon_store import CouponStore
+from tools.embedding_model import embed_queries
+from tools.filter_tool import parse_conditions
+from tools.turn_cache import memoize_per_turn
+
+VECTOR_DB_PATH = os.getenv("VECTOR_DB_PATH", "data/faiss_coupon_db")
+MANIFEST_NAME = "manifest.json"
+
+# 인덱스 종류: flat(정확, float32) / sq8(int8 스칼라 양자화) / hnsw(그래프) / ivfpq(역색인 + PQ 압축)
+INDEX_TYPES = ("flat", "sq8", "hnsw", "ivfpq")
+VECTOR_INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "flat")
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "8"))
+
+logger = logging.getLogger(__name__)
+
+
+def index_filename(index_type: str) -> str:
+    """flat 은 증분 빌드의 기준 인덱스(index.faiss), 나머지는 파생 인덱스"""
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"알 수 없는 인덱스 종류: {index_type} (가능: {', '.join(INDEX_TYPES)})")
+    return "index.faiss" if index_type == "flat" else f"index.{index_type}.faiss"
+
+
+def base_index(index):
+    """IDMap 으로 감싼 인덱스의 실제 구현"""
+    import faiss
+
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        return faiss.downcast_index(index.index)
+    return faiss.downcast_index(index)
+
+
+def configure_index(index):
+    """종류별 검색 파라미터 기본값 (HNSW efSearch, IVF nprobe)"""
+    import faiss
+
+    base = base_index(index)
+    if isinstance(base, faiss.IndexHNSW):
+        base.hnsw.efSearch = HNSW_EF_SEARCH
+    elif isinstance(base, faiss.IndexIVF):
+        base.nprobe = min(IVF_NPROBE, base.nlist)
+    return index
+
+
+def selector_params(index, selector):
+    """IDSelector 를 인덱스 종류에 맞는 SearchParameters 로 감쌈"""
+    import faiss
+
+    base = base_index(index)
+    if isinstance(base, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=max(HNSW_EF_SEARCH, base.hnsw.efSearch))
+    if isinstance(base, faiss.IndexIVF):
+        # 사전 필터로 후보가 적으므로 모든 리스트를 훑어 재현율을 유지
+        return faiss.SearchParametersIVF(sel=selector, nprobe=base.nlist)
+    return faiss.SearchParameters(sel=selector)
+
+
+def _read_index(path: str):
+    """가능하면 메모리 맵으로 인덱스를 엽니다."""
+    import faiss
+
+    try:
+        return faiss.read_index(path, faiss.IO_FLAG_MMAP)
+    except RuntimeError:
+        return faiss.read_index(path)
+
+
+def read_manifest(db_path: str = VECTOR_DB_PATH) -> Optional[Dict]:
+    """증분 빌드(tools/vector_index_builder.py)가 남긴 manifest"""
+    path = os.path.join(db_path, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ✅ FAISS 인덱스 + 메타데이터 (프로세스당 한 번 로드)
+class CouponVectorIndex:
+    """index.faiss / index.pkl 을 읽어 메타데이터 사전 필터와 함께 벡터 검색합니다."""
+
+    def __init__(self, db_path: str = VECTOR_DB_PATH,
+                 embed_fn: Callable[[List[str]], np.ndarray] = embed_queries,
+                 index_type: str = VECTOR_INDEX_TYPE):
+        self.db_path = db_path
+        self.embed_fn = embed_fn
+        path = os.path.join(db_path, index_filename(index_type))
+        if not os.path.exists(path):
+            logger.warning("%s 인덱스가 없어 flat 인덱스를 사용합니다: %s", index_type, path)
+            index_type, path = "flat", os.path.join(db_path, index_filename("flat"))
+        self.index_type = index_type
+        self.index = configure_index(_read_index(path))
+        with open(os.path.join(db_path, "index.pkl"), "rb") as f:
+            self.docs: List[Dict] = pickle.load(f)
+        self.meta = CouponStore.from_rows(self.docs)
+
+        # 증분 빌드 인덱스(manifest.json)는 레코드별 고정 id, 예전 인덱스는 id == docs 순서
+        self.manifest = read_manifest(db_path)
+        if self.manifest:
+            self.ids = np.asarray([int(i) for i in self.manifest["ids"]], dtype="int64")
+        else:
+            self.ids = np.arange(len(self.docs), dtype="int64")
+        self.positions = {int(i): pos for pos, i in enumerate(self.ids)}
+        self.version = self.manifest["version"] if self.manifest else 0
+
+    def _search_params(self, cond: Optional[Dict[str, List[str]]]):
+        """조건이 있으면 해당 id만 검색하도록 IDSelector 구성"""
+        if not cond or not any(cond.values()):
+            return None, self.index.ntotal
+        ids = self.meta.match_ids(cond, require_region=False)
+        if not ids:
+            return None, 0
+        import faiss
+
+        selector = faiss.IDSelectorBatch(self.ids[np.asarray(ids, dtype="int64")])
+        return selector_params(self.index, selector), len(ids)
+
+    def search_batch(self, queries: List[str], k: int = 5,
+                     cond: Optional[Dict[str, List[str]]] = None) -> List[List[Dict]]:
+        """여러 질의를 한 번에 임베딩/검색합니다."""
+        params, n_candidates = self._search_params(cond)
+        k = min(k, n_candidates)
+        if not queries or k == 0:
+            return [[] for _ in queries]
+
+        vectors = self.embed_fn(queries)
+        scores, ids = self.index.search(vectors, k, params=params)
+
+        results = []
+        for row_scores, row_ids in zip(scores, ids):
+            hits = []
+            for score, i in zip(row_scores, row_ids):
+                pos = self.positions.get(int(i))
+                if pos is None:
+                    continue
+                hit = dict(self.meta.views[pos])
+                hit["유사도"] = round(float(score), 4)
+                hits.append(hit)
+            results.append(hits)
+        return results
+
+    def search(self, query: str, k: int = 5,
+               cond: Optional[Dict[str, List[str]]] = None) -> List[Dict]:
+        return self.search_batch([query], k, cond)[0]
+
+
+_vector_index: Optional[CouponVectorIndex] = None
+_vector_index_mtime = 0.0
+_vector_index_lock = threading.Lock()
+
+
+def _manifest_mtime(db_path: str = VECTOR_DB_PATH) -> float:
+    try:
+        return os.path.getmtime(os.path.join(db_path, MANIFEST_NAME))
+    except OSError:
+        return 0.0
+
+
+def get_vector_index() -> CouponVectorIndex:
+    """프로세스 전역 벡터 인덱스 (빌드로 manifest 가 바뀌면 다시 로드)"""
+    global _vector_index, _vector_index_mtime
+    mtime = _manifest_mtime()
+    if _vector_index is None or mtime != _vector_index_mtime:
+        with _vector_index_lock:
+            if _vector_index is None or mtime != _vector_index_mtime:
+                _vector_index = CouponVectorIndex()
+                _vector_index_mtime = mtime
+    return _vector_index
+
+
+@tool
+@memoize_per_turn
+def vector_search(query: str) -> List[dict]:
+    """자연어 질문과 의미가 가까운 지역사랑상품권을 벡터 검색합니다. 질문 속 지역/지원방식 조건은 먼저 필터로 적용합니다."""
+    try:
+        cond = parse_conditions(query)
+        return get_vector_index().search(query, k=5, cond=cond)
+    except Exception as e:
+        return [{"error": str(e)}]